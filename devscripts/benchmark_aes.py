@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import time
+
+from yt_dlp import aes
+from yt_dlp.dependencies import Cryptodome, cryptography
+
+
+def backends():
+    if Cryptodome.AES:
+        yield 'pycryptodomex', lambda data, key, iv: Cryptodome.AES.new(key, Cryptodome.AES.MODE_CBC, iv).decrypt(data)
+    if cryptography:
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+        def decrypt(data, key, iv):
+            decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+            return decryptor.update(data) + decryptor.finalize()
+        yield 'cryptography', decrypt
+    if aes._load_libcrypto():
+        yield 'openssl', lambda data, key, iv: aes._openssl_decrypt('cbc', data, key, iv)
+    yield 'native', aes._aes_cbc_decrypt_native
+
+
+def block_by_block(data, key, iv):
+    # The block cipher of the list based API, for comparison
+    expanded_key = aes.key_expansion(list(key))
+    decrypted, previous = [], list(iv)
+    for i in range(0, len(data), aes.BLOCK_SIZE_BYTES):
+        block = list(data[i:i + aes.BLOCK_SIZE_BYTES])
+        decrypted += aes.xor(aes.aes_decrypt(block, expanded_key), previous)
+        previous = block
+    return bytes(decrypted)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the AES-CBC decryption of HLS fragments')
+    parser.add_argument(
+        '--size', type=int, default=1024, help='Size of the fragment in KiB (default: %(default)s)')
+    parser.add_argument(
+        '--native-size', type=int, default=64,
+        help='Size of the fragment in KiB for the native implementations (default: %(default)s)')
+    parser.add_argument('--runs', type=int, default=5, help='Number of runs of each benchmark (default: %(default)s)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    key, iv = os.urandom(16), os.urandom(16)
+    print(f'Selected backend: {aes._AES_BACKEND}')
+
+    expected = None
+    for name, func in (*backends(), ('native (block by block)', block_by_block)):
+        size = (args.native_size if name.startswith('native') else args.size) * 1024
+        data = os.urandom(size) if expected is None else expected[0][:size]
+        best = None
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            result = func(data, key, iv)
+            elapsed = time.perf_counter() - start
+            best = min(best or elapsed, elapsed)
+        if expected is None:
+            expected = data, result
+        assert result == expected[1][:size], f'{name} decrypted the data incorrectly'
+        print(f'  {name:<24}{size / 2**20 / best:10.2f}MiB/s')
+
+
+if __name__ == '__main__':
+    main()
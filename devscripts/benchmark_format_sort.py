@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import itertools
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.extractor.generic import GenericIE
+from yt_dlp.utils import FormatSorter, float_or_none
+
+TESTDATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test', 'testdata')
+
+SORT_SPECS = {
+    'default': [],
+    'long -S': ['+hasaud', 'lang', 'res~1080', 'fps:30', 'vcodec:vp9', 'acodec:opus', 'hdr:10', 'channels',
+                'proto:m3u8', '+size', 'br', 'asr', 'vext', 'aext', 'source', 'id'],
+}
+
+
+def youtube_like_formats(count):
+    # Resembles the formats of a YouTube video with all its clients
+    vcodecs = ('avc1.640028', 'vp09.00.40.08', 'vp09.02.51.10.01.09.16.09.00', 'av01.0.08M.08', 'none')
+    acodecs = ('mp4a.40.2', 'opus', 'ec-3', 'none')
+    protocols = ('https', 'm3u8_native', 'http_dash_segments')
+    heights = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+    for index, (vcodec, acodec, protocol, height) in zip(range(count), itertools.cycle(
+            itertools.product(vcodecs, acodecs, protocols, heights))):
+        yield {
+            'format_id': f'{index}-{protocol}',
+            'url': f'https://example.com/videoplayback/{index}',
+            'ext': 'webm' if vcodec.startswith('vp') or acodec == 'opus' else 'mp4',
+            'protocol': protocol,
+            'vcodec': vcodec,
+            'acodec': acodec,
+            'height': None if vcodec == 'none' else height,
+            'width': None if vcodec == 'none' else height * 16 // 9,
+            'fps': None if vcodec == 'none' else (30, 60)[index % 2],
+            'dynamic_range': 'HDR10' if vcodec.startswith('vp09.02') else 'SDR',
+            'tbr': height * (index % 7 + 1),
+            'filesize': height * 100_000 if index % 3 else None,
+            'audio_channels': None if acodec == 'none' else (2, 6)[index % 2],
+            'language_preference': (-1, 10)[index % 4 == 0],
+            'quality': index % 5,
+            'source_preference': -1,
+        }
+
+
+def recorded_formats():
+    with YoutubeDL({'quiet': True}) as ydl:
+        ie = GenericIE(ydl)
+        for name in sorted(os.listdir(os.path.join(TESTDATA_DIR, 'm3u8'))):
+            with open(os.path.join(TESTDATA_DIR, 'm3u8', name), encoding='utf-8') as f:
+                yield name, ie._parse_m3u8_formats_and_subtitles(
+                    f.read(), 'https://example.com/master.m3u8', video_id=name)[0]
+        for name in sorted(os.listdir(os.path.join(TESTDATA_DIR, 'mpd'))):
+            with open(os.path.join(TESTDATA_DIR, 'mpd', name), encoding='utf-8') as f:
+                yield name, ie._parse_mpd_formats_and_subtitles(
+                    ie._parse_xml(f.read(), name), mpd_base_url='https://example.com', mpd_url='https://example.com/manifest.mpd')[0]
+
+
+def reference_preference(sorter, format_):
+    # The preference as it was calculated before the sort order was compiled,
+    # resolving the settings of every field for every format
+    def field_preference(field):
+        setting = lambda key, f=field: sorter._get_field_setting(f, key)
+        type_ = setting('type')
+        get_value = lambda f: format_.get(sorter._get_field_setting(f, 'field'))
+        if type_ == 'multiple':
+            type_ = 'field'
+            value = setting('function')(get_value(f) for f in setting('field'))
+        else:
+            value = get_value(field)
+        reverse, closest, limit = setting('reverse'), setting('closest'), setting('limit')
+        if type_ == 'extractor':
+            maximum = setting('max')
+            if value is None or (maximum is not None and value >= maximum):
+                value = -1
+        elif type_ == 'boolean':
+            in_list, not_in_list = setting('in_list'), setting('not_in_list')
+            value = 0 if ((in_list is None or value in in_list) and (not_in_list is None or value not in not_in_list)) else -1
+        elif type_ == 'ordered':
+            value = sorter._resolve_field_value(field, value, True)
+        val_num = float_or_none(value, default=setting('default'))
+        is_num = setting('convert') != 'string' and val_num is not None
+        if is_num:
+            value = val_num
+        return ((-10, 0) if value is None
+                else (1, value, 0) if not is_num
+                else (0, -abs(value - limit), value - limit if reverse else limit - value) if closest
+                else (0, value, 0) if not reverse and (limit is None or value <= limit)
+                else (0, -value, 0) if limit is None or (reverse and value == limit) or value > limit
+                else (-1, value, 0))
+
+    sorter._fill_sorting_fields(format_)
+    return tuple(map(field_preference, sorter._order))
+
+
+def measure(func, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = min(best or elapsed, elapsed)
+    return best, result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark sorting the formats of a video')
+    parser.add_argument(
+        '-n', '--formats', type=int, default=180,
+        help='Number of formats of the YouTube-like format list (default: %(default)s)')
+    parser.add_argument('--runs', type=int, default=20, help='Number of runs of each benchmark (default: %(default)s)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    format_lists = [*recorded_formats(), ('youtube-like', list(youtube_like_formats(args.formats)))]
+
+    for spec_name, format_sort in SORT_SPECS.items():
+        ydl = YoutubeDL({'quiet': True, 'format_sort': format_sort})
+        compile_time, sorter = measure(lambda: FormatSorter(ydl, []), args.runs)
+        print(f'Sort order "{spec_name}" ({len(sorter._order)} fields, compiled in {compile_time * 1e6:.0f}us):')
+        for name, formats in format_lists:
+            reference_time, expected = measure(
+                lambda: sorted(formats, key=lambda f: reference_preference(sorter, f)), args.runs)
+            compiled_time, result = measure(
+                lambda: sorted(formats, key=FormatSorter(ydl, []).calculate_preference), args.runs)
+            assert result == expected, f'The formats of {name} were sorted differently'
+            print(f'  {name:<36}{len(formats):5} formats {reference_time * 1000:9.2f}ms -> '
+                  f'{compiled_time * 1000:7.2f}ms ({reference_time / compiled_time:.1f}x faster)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import http.server
+import multiprocessing
+import re
+import tempfile
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.utils import format_bytes, parse_bytes
+
+
+class HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        data = self.server.data
+        start, end = 0, len(data) - 1
+        mobj = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range') or '')
+        if mobj:
+            start = int(mobj.group(1))
+            end = min(int(mobj.group(2) or end), end)
+        self.send_response(206 if mobj else 200)
+        self.send_header('Content-Type', 'video/mp4')
+        if mobj:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        view = memoryview(data)
+        for pos in range(start, end + 1, 1 << 20):
+            self.wfile.write(view[pos:min(pos + (1 << 20), end + 1)])
+
+
+def serve(size, port_queue):
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPRequestHandler)
+    httpd.data = os.urandom(size)
+    port_queue.put(httpd.server_address[1])
+    httpd.serve_forever()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the throughput of the native HTTP downloader')
+    parser.add_argument(
+        '-s', '--size', default='512M', type=parse_bytes, help='Size of the file to download (default: %(default)s)')
+    parser.add_argument(
+        '-N', '--connections', type=int, nargs='*', default=[1, 4],
+        help='Numbers of connections to benchmark (default: %(default)s)')
+    parser.add_argument(
+        '--buffer-size', type=parse_bytes, default=1024, help='Initial download buffer size (default: %(default)s)')
+    parser.add_argument('--runs', type=int, default=3, help='Number of runs of each benchmark (default: %(default)s)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # Serve from another process so that the server does not compete for the GIL
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(args.size, port_queue), daemon=True)
+    server.start()
+    url = f'http://127.0.0.1:{port_queue.get()}/file'
+
+    print(f'Downloading {format_bytes(args.size)} from a local server')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, 'file.mp4')
+        for connections in args.connections:
+            params = {
+                'quiet': True,
+                'noprogress': True,
+                'buffersize': args.buffer_size,
+                'http_connections': connections,
+            }
+            best = None
+            for _ in range(args.runs):
+                with YoutubeDL(params) as ydl:
+                    start = time.perf_counter()
+                    assert HttpFD(ydl, params).real_download(filename, {'url': url})
+                    elapsed = time.perf_counter() - start
+                assert os.path.getsize(filename) == args.size
+                os.remove(filename)
+                best = min(best or elapsed, elapsed)
+            print(f'  {connections} connection(s): {args.size / best / 2**20:8.1f} MiB/s'
+                  f' ({args.size * 8 / best / 1e9:.2f} Gbit/s)')
+    server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import time
+import tracemalloc
+
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.hls import HlsFD
+from yt_dlp.extractor.generic import GenericIE
+from yt_dlp.m3u8 import parse_m3u8
+
+MANIFEST_URL = 'https://example.com/hls/media.m3u8'
+
+
+def make_media_playlist(segments, discontinuity_every, key_every):
+    lines = [
+        '#EXTM3U', '#EXT-X-VERSION:6', '#EXT-X-TARGETDURATION:6', '#EXT-X-MEDIA-SEQUENCE:0',
+        '#EXT-X-PLAYLIST-TYPE:VOD', '#EXT-X-MAP:URI="init.mp4",BYTERANGE="720@0"']
+    for index in range(segments):
+        if index and not index % discontinuity_every:
+            lines.append('#EXT-X-DISCONTINUITY')
+        if not index % key_every:
+            lines.append(f'#EXT-X-KEY:METHOD=AES-128,URI="https://example.com/keys/{index}",IV=0x{index:032x}')
+        lines.extend((
+            '#EXTINF:6.006,',
+            f'#EXT-X-BYTERANGE:1048576@{720 + index * 1048576}',
+            f'segments/{index // discontinuity_every}/media.mp4'))
+    lines.append('#EXT-X-ENDLIST')
+    return '\n'.join(lines) + '\n'
+
+
+def make_master_playlist(variants):
+    lines = ['#EXTM3U', '#EXT-X-INDEPENDENT-SEGMENTS']
+    for index in range(variants):
+        lines.append(
+            f'#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="audio-{index % 8}",NAME="Audio {index}",'
+            f'LANGUAGE="en",DEFAULT=NO,AUTOSELECT=YES,URI="audio/{index}.m3u8"')
+    for index in range(variants):
+        lines.append(
+            f'#EXT-X-STREAM-INF:BANDWIDTH={100000 * (index + 1)},AVERAGE-BANDWIDTH={90000 * (index + 1)},'
+            f'CODECS="avc1.640028,mp4a.40.2",RESOLUTION={16 * (index + 1)}x{9 * (index + 1)},'
+            f'FRAME-RATE=29.970,AUDIO="audio-{index % 8}"')
+        lines.append(f'video/{index}.m3u8')
+    return '\n'.join(lines) + '\n'
+
+
+def measure(func, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = min(best or elapsed, elapsed)
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark parsing large M3U8 playlists')
+    parser.add_argument(
+        '-n', '--segments', type=int, nargs='*', default=[1_000, 20_000, 100_000],
+        help='Numbers of segments of the media playlists (default: %(default)s)')
+    parser.add_argument(
+        '--variants', type=int, default=200, help='Number of variants of the master playlist (default: %(default)s)')
+    parser.add_argument(
+        '--discontinuity-every', type=int, default=500, metavar='N',
+        help='Add a discontinuity every N segments (default: %(default)s)')
+    parser.add_argument(
+        '--key-every', type=int, default=1000, metavar='N',
+        help='Rotate the encryption key every N segments (default: %(default)s)')
+    parser.add_argument('--runs', type=int, default=5, help='Number of runs of each benchmark (default: %(default)s)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with YoutubeDL({'quiet': True, 'hls_split_discontinuity': True}) as ydl:
+        fd = HlsFD(ydl, {})
+        ie = GenericIE(ydl)
+        info_dict = {'url': MANIFEST_URL}
+
+        def report(name, func):
+            best, peak, result = measure(func, args.runs)
+            print(f'  {name:<32}{best * 1000:9.1f}ms {peak / 2**20:8.1f}MiB peak  ({len(result)} items)')
+
+        for segments in args.segments:
+            doc = make_media_playlist(segments, args.discontinuity_every, args.key_every)
+            print(f'Media playlist with {segments} segments ({len(doc) / 2**20:.1f}MiB):')
+            report('parse_m3u8', lambda: parse_m3u8(doc).segments)
+            report('HlsFD fragments', lambda: fd._build_fragments(parse_m3u8(doc), MANIFEST_URL, info_dict))
+            report('HlsFD fragments (discontinuity)', lambda: fd._build_fragments(
+                parse_m3u8(doc), MANIFEST_URL, info_dict, format_index=1))
+            report('extractor formats', lambda: ie._parse_m3u8_formats_and_subtitles(
+                doc, MANIFEST_URL, video_id='benchmark')[0])
+
+        # The media playlists of the variants would have to be downloaded to split them
+        ydl.params['hls_split_discontinuity'] = False
+        doc = make_master_playlist(args.variants)
+        print(f'Master playlist with {args.variants} variants:')
+        report('extractor formats', lambda: ie._parse_m3u8_formats_and_subtitles(
+            doc, MANIFEST_URL, video_id='benchmark')[0])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import json
+import time
+
+from yt_dlp.utils import int_or_none, parse_count, parse_duration, url_or_none
+from yt_dlp.utils.traversal import compile_traversal, traverse_obj
+
+# The paths that are used to walk the renderers of a YouTube tab, as in extractor/youtube/_tab.py
+GRID_PATH = (
+    'contents', 'twoColumnBrowseResultsRenderer', 'tabs', ..., 'tabRenderer', 'content',
+    'richGridRenderer', 'contents', ..., 'richItemRenderer', 'content', 'videoRenderer', {dict})
+RENDERER_PATHS = [
+    (('videoId', {str}),),
+    (('title', ('simpleText', ('runs', ..., 'text')), {str}, any),),
+    (('lengthText', 'simpleText', {parse_duration}),),
+    (('viewCountText', 'simpleText', {parse_count}),),
+    (('navigationEndpoint', 'commandMetadata', 'webCommandMetadata', 'url', {str}),),
+    (('ownerText', 'runs', ..., 'navigationEndpoint', 'browseEndpoint', 'browseId', {str}, any),),
+    (('badges', ..., 'metadataBadgeRenderer', 'style', {str}),),
+    (('upcomingEventData', 'startTime'), ('publishedTimeText', 'simpleText')),
+    (('thumbnail', 'thumbnails', ..., {
+        'url': ('url', {url_or_none}),
+        'width': ('width', {int_or_none}),
+        'height': ('height', {int_or_none}),
+    }),),
+]
+
+
+def initial_data(count):
+    # Resembles the ytInitialData of the videos tab of a channel
+    return {
+        'contents': {'twoColumnBrowseResultsRenderer': {'tabs': [
+            {'tabRenderer': {'title': 'Home', 'selected': False}},
+            {'tabRenderer': {'title': 'Videos', 'selected': True, 'content': {'richGridRenderer': {'contents': [
+                {'richItemRenderer': {'content': {'videoRenderer': {
+                    'videoId': f'video{index:06d}',
+                    'title': {'runs': [{'text': f'Video {index}'}]},
+                    'lengthText': {'simpleText': f'{index % 60}:{index % 60:02d}'},
+                    'viewCountText': {'simpleText': f'{index * 1000:,} views'},
+                    'publishedTimeText': {'simpleText': f'{index % 12 + 1} months ago'},
+                    'navigationEndpoint': {'commandMetadata': {'webCommandMetadata': {'url': f'/watch?v=video{index:06d}'}}},
+                    'ownerText': {'runs': [{'text': 'Channel', 'navigationEndpoint': {'browseEndpoint': {'browseId': 'UC0123456789'}}}]},
+                    'badges': [{'metadataBadgeRenderer': {'style': 'BADGE_STYLE_TYPE_SIMPLE'}}] if index % 3 == 0 else [],
+                    'thumbnail': {'thumbnails': [
+                        {'url': f'https://i.ytimg.com/vi/video{index:06d}/{name}.jpg', 'width': width, 'height': width * 9 // 16}
+                        for name, width in (('default', 168), ('mqdefault', 320), ('hqdefault', 480), ('maxresdefault', 1280))]},
+                }}}}
+                for index in range(count)
+            ]}}}},
+        ]}},
+    }
+
+
+def find_renderers(obj, name):
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if key == name and isinstance(value, dict):
+                yield value
+            else:
+                yield from find_renderers(value, name)
+    elif isinstance(obj, list):
+        for value in obj:
+            yield from find_renderers(value, name)
+
+
+def measure(func, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = min(best or elapsed, elapsed)
+    return best, result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark traversing the renderers of a YouTube page')
+    parser.add_argument(
+        'data', nargs='?', metavar='FILE',
+        help='JSON file of a recorded ytInitialData. By default, a channel tab of --videos videos is generated')
+    parser.add_argument(
+        '-n', '--videos', type=int, default=300,
+        help='Number of videos in the generated initial data (default: %(default)s)')
+    parser.add_argument('--runs', type=int, default=10, help='Number of runs of each benchmark (default: %(default)s)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.data:
+        with open(args.data, encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = initial_data(args.videos)
+    renderers = list(find_renderers(data, 'videoRenderer'))
+    print(f'{len(renderers)} video renderers, {len(RENDERER_PATHS) * len(renderers) + 1} traversals per run')
+
+    compiled_grid = compile_traversal(GRID_PATH)
+    compiled_paths = [compile_traversal(*paths) for paths in RENDERER_PATHS]
+    benchmarks = {
+        'compiled for every call': lambda: (
+            compile_traversal(GRID_PATH)(data),
+            [[compile_traversal(*paths)(renderer) for paths in RENDERER_PATHS] for renderer in renderers]),
+        'traverse_obj': lambda: (
+            traverse_obj(data, GRID_PATH),
+            [[traverse_obj(renderer, *paths) for paths in RENDERER_PATHS] for renderer in renderers]),
+        'compile_traversal': lambda: (
+            compiled_grid(data),
+            [[traverse(renderer) for traverse in compiled_paths] for renderer in renderers]),
+    }
+
+    expected = None
+    for name, func in benchmarks.items():
+        elapsed, result = measure(func, args.runs)
+        if expected is None:
+            expected, reference_time = result, elapsed
+        assert result == expected, f'{name} traversed the renderers differently'
+        print(f'  {name:<28}{elapsed * 1000:9.2f}ms ({reference_time / elapsed:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
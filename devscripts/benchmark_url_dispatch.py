@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import itertools
+import time
+
+from test.helper import gettestcases
+from yt_dlp.extractor import gen_extractor_classes
+from yt_dlp.extractor._url_index import ExtractorDispatcher, get_extractor_index
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark resolving URLs to extractors')
+    parser.add_argument(
+        '-n', '--count', type=int, default=100_000, help='Number of URLs to resolve (default: %(default)s)')
+    parser.add_argument(
+        '--linear-sample', type=int, default=2_000, metavar='COUNT',
+        help='Only resolve this many URLs with the linear scan and extrapolate (default: %(default)s)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    ies = {ie.ie_key(): ie for ie in gen_extractor_classes()}
+    urls = list(itertools.islice(itertools.cycle(
+        tc['url'] for tc in gettestcases(include_onlymatching=True)), args.count))
+
+    def linear(url):
+        return next(ie_key for ie_key, ie in ies.items() if ie.suitable(url))
+
+    start = time.perf_counter()
+    dispatcher = ExtractorDispatcher(ies, get_extractor_index())
+    print(f'Loading the index took {time.perf_counter() - start:.2f}s')
+
+    def indexed(url):
+        return next(ie_key for ie_key in dispatcher.candidates(url) if ies[ie_key].suitable(url))
+
+    sample = urls[:args.linear_sample]
+    start = time.perf_counter()
+    expected = list(map(linear, sample))
+    linear_time = (time.perf_counter() - start) * len(urls) / len(sample)
+
+    start = time.perf_counter()
+    results = list(map(indexed, urls))
+    indexed_time = time.perf_counter() - start
+
+    assert results[:len(sample)] == expected, 'The index resolved some URLs differently'
+    print(f'Resolving {len(urls)} URLs with {len(ies)} extractors:')
+    print(f'  linear scan: {linear_time:8.2f}s' + (' (extrapolated)' if len(sample) < len(urls) else ''))
+    print(f'  index:       {indexed_time:8.2f}s ({linear_time / indexed_time:.1f}x faster)')
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,7 @@
 
 from devscripts.utils import get_filename_args, read_file, write_file
 from yt_dlp.extractor import import_extractors
+from yt_dlp.extractor._url_index import ExtractorIndex
 from yt_dlp.extractor.common import InfoExtractor, SearchInfoExtractor
 from yt_dlp.globals import extractors
 
@@ -76,6 +77,7 @@ def build_ies(ies, bases, attr_base):
             names.append(ie.__name__)
 
     yield '\n_CLASS_LOOKUP = {%s}' % ', '.join(f'{name!r}: {name}' for name in names)
+    yield f'\n_URL_INDEX = {ExtractorIndex.build(ies).to_data()!r}'
 
 
 def sort_ies(ies, ignored_bases):
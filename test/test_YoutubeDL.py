@@ -13,14 +13,21 @@
 
 import contextlib
 import copy
+import http.server
+import io
 import json
+import tempfile
+import threading
+import time
 
-from test.helper import FakeYDL, assertRegexpMatches, try_rm
+from test.helper import FakeYDL, assertRegexpMatches, http_server_port, try_rm
 from yt_dlp import YoutubeDL
 from yt_dlp.extractor.common import InfoExtractor
 from yt_dlp.postprocessor.common import PostProcessor
 from yt_dlp.utils import (
+    DownloadError,
     ExtractorError,
+    FormatSorter,
     LazyList,
     OnDemandPagedList,
     int_or_none,
@@ -265,6 +272,17 @@ def test_format_selection_by_vcodec_sort(self):
         downloaded = ydl.downloaded_info_dicts[0]
         self.assertEqual(downloaded['format_id'], 'vp9-sdr-format')
 
+    def test_format_sorter_instances(self):
+        formats = [
+            {'format_id': 'low', 'height': 360, 'vcodec': 'vp9', 'acodec': 'none', 'url': TEST_URL},
+            {'format_id': 'high', 'height': 1080, 'vcodec': 'avc1', 'acodec': 'none', 'url': TEST_URL},
+        ]
+        sorter = FormatSorter(YDL({'format_sort': ['+res']}), [])
+        # The sort order is resolved when the sorter is created, so other sorters do not change it
+        FormatSorter(YDL({'format_sort': ['res', 'vcodec:vp9']}), [])
+        self.assertEqual(max(formats, key=sorter.calculate_preference)['format_id'], 'low')
+        self.assertEqual(max(formats, key=FormatSorter(YDL({}), []).calculate_preference)['format_id'], 'high')
+
     def test_format_selection_string_ops(self):
         formats = [
             {'format_id': 'abc-cba', 'ext': 'mp4', 'url': TEST_URL},
@@ -369,6 +387,66 @@ def test_format_not_available(self):
         ydl = YDL({'format': 'best[height>360]'})
         self.assertRaises(ExtractorError, ydl.process_ie_result, info_dict.copy())
 
+    def test_check_formats(self):
+        requests = []
+
+        class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                requests.append((self.path, self.headers.get('Range')))
+                if not self.path.startswith('/ok/'):
+                    self.send_error(404)
+                    return
+                self.send_response(206)
+                self.send_header('Content-Length', '1024')
+                self.end_headers()
+                self.wfile.write(b'\0' * 1024)
+
+        httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPTestRequestHandler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        self.addCleanup(httpd.server_close)
+        self.addCleanup(httpd.shutdown)
+        base_url = f'http://127.0.0.1:{http_server_port(httpd)}'
+
+        def get_formats():
+            return [
+                {'format_id': 'low', 'quality': 1, 'url': f'{base_url}/ok/low'},
+                {'format_id': 'medium', 'quality': 2, 'url': f'{base_url}/ok/medium'},
+                {'format_id': 'high', 'quality': 3, 'url': f'{base_url}/missing/high'},
+                {'format_id': 'hls', 'quality': 4, 'url': f'{base_url}/hls.m3u8', 'protocol': 'm3u8_native'},
+                {'format_id': 'best', 'quality': 5, 'url': f'{base_url}/missing/best'},
+            ]
+
+        ydl = YDL({'format': 'best', 'check_formats': 'selected', 'concurrent_format_checks': 3})
+        with patch.object(ydl, 'dl', return_value=(False, None)) as dl:
+            ydl.process_ie_result(_make_result(get_formats()))
+        # The first working format in the selection order is chosen,
+        # and only the formats that are not served over plain HTTP are test downloaded
+        self.assertEqual(ydl.downloaded_info_dicts[0]['format_id'], 'medium')
+        self.assertEqual([info['format_id'] for (_, info), _ in dl.call_args_list], ['hls'])
+        self.assertEqual(
+            [msg for msg in ydl.msgs if msg.startswith('[info] Testing format')],
+            ['[info] Testing format best', '[info] Testing format hls',
+             '[info] Testing format high', '[info] Testing format medium'])
+        self.assertTrue(requests)
+        self.assertEqual({range_ for _, range_ in requests}, {'bytes=0-1023'})
+        self.assertTrue({'/missing/best', '/missing/high', '/ok/medium'} <= {path for path, _ in requests})
+
+        # The results are cached by URL. The probe of the unneeded format may have been cancelled
+        requests.clear()
+        with patch.object(ydl, 'dl', return_value=(False, None)):
+            ydl.process_ie_result(_make_result(get_formats()))
+        self.assertEqual(ydl.downloaded_info_dicts[1]['format_id'], 'medium')
+        self.assertLessEqual({path for path, _ in requests}, {'/ok/low'})
+
+        # Any error of the probe fails the format, as with a test download
+        for error in (OSError(), ValueError(), DownloadError('error')):
+            with patch.object(ydl, 'urlopen', side_effect=error):
+                self.assertFalse(ydl._probe_format({'format_id': 'low', 'url': f'{base_url}/ok/low'}))
+        ydl.close()
+
     def test_format_selection_issue_10083(self):
         # See https://github.com/ytdl-org/youtube-dl/issues/10083
         formats = [
@@ -857,6 +935,22 @@ def gen():
         test('%(title3)s', ('foo/bar\\test', 'foo⧸bar⧹test'))
         test('folder/%(title3)s', ('folder/foo/bar\\test', f'folder{os.path.sep}foo⧸bar⧹test'))
 
+    def test_compile_outtmpl(self):
+        parts, top_level_keys = YoutubeDL._compile_outtmpl('%(title)s [%(id,display_id)s] %(formats.0.height)d%%')
+        self.assertIs(YoutubeDL._compile_outtmpl('%(title)s [%(id,display_id)s] %(formats.0.height)d%%')[0], parts)
+        self.assertEqual(top_level_keys, {'title', 'id', 'display_id', 'formats'})
+        self.assertEqual(parts[2], ' [')
+        self.assertEqual(parts[-1], '%%')
+        # Templates using the whole info_dict need all of it
+        self.assertIsNone(YoutubeDL._compile_outtmpl('%()j')[1])
+        self.assertIsNone(YoutubeDL._compile_outtmpl('%(.{id,title})j')[1])
+
+        # Only the used fields are copied, but the internal ones are still hidden and generated
+        ydl = FakeYDL()
+        info = {'id': '1', 'duration': 61, '__postprocessors': ['pp']}
+        self.assertEqual(ydl.evaluate_outtmpl('%(id)s %(__postprocessors)s %(duration_string)s', info), '1 NA 1:01')
+        self.assertEqual(json.loads(ydl.evaluate_outtmpl('%()j', info))['duration_string'], '1:01')
+
     def test_format_note(self):
         ydl = YoutubeDL()
         self.assertEqual(ydl._format_note({}), '')
@@ -1212,6 +1306,166 @@ def _real_extract(self, url):
         self.assertEqual(downloaded['extractor'], 'Video')
         self.assertEqual(downloaded['extractor_key'], 'Video')
 
+    def test_concurrent_extractions(self):
+        extracted = []
+
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                extracted.append((video_id, threading.current_thread().name))
+                time.sleep(0.01 * (int(video_id) % 3))
+                if video_id == '4':
+                    raise ExtractorError('foo', expected=True)
+                return {
+                    'id': video_id,
+                    'title': f'Video {video_id}',
+                    'formats': [{'format_id': 'default', 'url': TEST_URL}],
+                }
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+
+            def _real_extract(self, url):
+                return self.playlist_result(
+                    self.url_result(f'video:{i}', VideoIE, str(i)) for i in range(10))
+
+        def get_downloaded_ids(params):
+            extracted.clear()
+            ydl = YDL({'ignoreerrors': True, 'download_archive': {'video 6'}, **params})
+            ydl.report_error = lambda *_, **__: None
+            ydl.add_info_extractor(VideoIE(ydl))
+            ydl.add_info_extractor(PlaylistIE(ydl))
+            ydl.extract_info('playlist:')
+            ydl.close()
+            return [info['id'] for info in ydl.downloaded_info_dicts]
+
+        expected = ['0', '1', '2', '3', '5', '7', '8', '9']
+        self.assertEqual(get_downloaded_ids({}), expected)
+        for params in ({}, {'lazy_playlist': True}):
+            self.assertEqual(get_downloaded_ids({'concurrent_extractions': 3, **params}), expected)
+            self.assertEqual(sorted(video_id for video_id, _ in extracted), ['0', '1', '2', '3', '4', '5', '7', '8', '9'])
+            self.assertTrue(all(thread.startswith('yt-dlp-extract') for _, thread in extracted))
+
+        self.assertEqual(get_downloaded_ids({'concurrent_extractions': 3, 'playlist_items': '2:5'}), ['1', '2', '3'])
+        self.assertEqual(sorted(video_id for video_id, _ in extracted), ['1', '2', '3', '4'])
+
+    def test_incremental_playlist(self):
+        fetched_pages = []
+        playlist = []
+
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                return {
+                    'id': video_id,
+                    'title': f'Video {video_id}',
+                    'formats': [{'format_id': 'default', 'url': TEST_URL}],
+                }
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+
+            def _real_extract(self, url):
+                def get_page(pagenum):
+                    fetched_pages.append(pagenum)
+                    for video_id in playlist[pagenum * 3:pagenum * 3 + 3]:
+                        yield self.url_result(f'video:{video_id}', VideoIE, str(video_id))
+                return self.playlist_result(OnDemandPagedList(get_page, 3), 'channel')
+
+        def get_downloaded_ids(params):
+            fetched_pages.clear()
+            ydl = YDL({'incremental_playlist': True, **params})
+            ydl.add_info_extractor(VideoIE(ydl))
+            ydl.add_info_extractor(PlaylistIE(ydl))
+            ydl.extract_info('playlist:')
+            ydl.close()
+            return [info['id'] for info in ydl.downloaded_info_dicts]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Without an archive, the IDs of the processed entries are cached
+            playlist[:] = range(10, 2, -1)
+            self.assertEqual(len(get_downloaded_ids({'cachedir': tmpdir})), 8)
+            self.assertEqual(fetched_pages, [0, 1, 2])
+            playlist[:] = range(12, 2, -1)
+            self.assertEqual(get_downloaded_ids({'cachedir': tmpdir}), [str(i) for i in range(12, 6, -1)])
+            self.assertEqual(fetched_pages, [0, 1])
+            playlist[:] = range(20, 2, -1)
+            self.assertEqual(len(get_downloaded_ids({'cachedir': tmpdir})), 12)
+            self.assertEqual(fetched_pages, [0, 1, 2, 3])
+            # Every page is fetched without the option
+            self.assertEqual(len(get_downloaded_ids({'cachedir': tmpdir, 'incremental_playlist': False})), 18)
+            self.assertEqual(fetched_pages, [0, 1, 2, 3, 4, 5, 6])
+
+        playlist[:] = range(10, 2, -1)
+        archive = {f'video {i}' for i in range(3, 10)}
+        self.assertEqual(get_downloaded_ids({'download_archive': archive}), ['10'])
+        self.assertEqual(fetched_pages, [0, 1])
+
+    def test_stream_json(self):
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                if video_id == '3':
+                    raise ExtractorError('foo', expected=True)
+                return {
+                    'id': video_id,
+                    'title': f'Video {video_id}',
+                    'formats': [{'format_id': 'default', 'url': TEST_URL}],
+                }
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:(?P<id>\w+)'
+
+            def _real_extract(self, url):
+                playlist_id = self._match_id(url)
+                if playlist_id == 'nested':
+                    ids = (1, 2)
+                    return self.playlist_result(
+                        (self.url_result(f'video:{i}', VideoIE) for i in ids), playlist_id, 'Nested')
+                return self.playlist_result([
+                    self.url_result('video:0', VideoIE),
+                    self.url_result('playlist:nested', PlaylistIE),
+                    self.url_result('video:3', VideoIE),
+                    self.url_result('video:4', VideoIE),
+                ], playlist_id, 'Outer')
+
+        def get_json(params):
+            with tempfile.TemporaryDirectory() as tmpdir, contextlib.redirect_stdout(io.StringIO()) as stdout:
+                ydl = YDL({
+                    'dump_single_json': True,
+                    'writeinfojson': True,
+                    'clean_infojson': False,
+                    'allow_playlist_files': True,
+                    'ignoreerrors': True,
+                    'outtmpl': {'default': os.path.join(tmpdir, '%(id)s.%(ext)s')},
+                    **params,
+                })
+                ydl.trouble = lambda *_, **__: None
+                ydl.add_info_extractor(VideoIE(ydl))
+                ydl.add_info_extractor(PlaylistIE(ydl))
+                YoutubeDL.download(ydl, ['playlist:outer'])
+                with open(os.path.join(tmpdir, 'outer.info.json'), encoding='utf-8') as f:
+                    infojson = json.load(f)
+                self.assertEqual(sorted(os.listdir(tmpdir)), ['nested.info.json', 'outer.info.json'])
+            lines = stdout.getvalue().splitlines()
+            self.assertEqual(len(lines), 1)
+            dumped = json.loads(lines[0])
+            for info in (dumped, infojson):
+                info.pop('epoch')
+            return dumped, infojson
+
+        expected_json, expected_infojson = get_json({})
+        self.assertEqual(
+            traverse_obj(expected_json, ('entries', ..., ('id', ('entries', ..., 'id')))), ['0', 'nested', '1', '2', '4'])
+        self.assertIsNone(expected_json['entries'][2])
+        self.assertEqual(get_json({'stream_json': True}), (expected_json, expected_infojson))
+
     def test_header_cookies(self):
         from http.cookiejar import Cookie
 
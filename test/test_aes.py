@@ -11,6 +11,9 @@
 import base64
 
 from yt_dlp.aes import (
+    _aes_cbc_decrypt_native,
+    _load_libcrypto,
+    _openssl_decrypt,
     aes_cbc_decrypt,
     aes_cbc_decrypt_bytes,
     aes_cbc_encrypt,
@@ -26,7 +29,6 @@
     key_expansion,
     pad_block,
 )
-from yt_dlp.dependencies import Cryptodome
 
 # the encrypted data can be generate with 'devscripts/generate_aes_testdata.py'
 
@@ -47,9 +49,8 @@ def test_cbc_decrypt(self):
         data = b'\x97\x92+\xe5\x0b\xc3\x18\x91ky9m&\xb3\xb5@\xe6\x27\xc2\x96.\xc8u\x88\xab9-[\x9e|\xf1\xcd'
         decrypted = bytes(aes_cbc_decrypt(list(data), self.key, self.iv))
         self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
-        if Cryptodome.AES:
-            decrypted = aes_cbc_decrypt_bytes(data, bytes(self.key), bytes(self.iv))
-            self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
+        decrypted = aes_cbc_decrypt_bytes(data, bytes(self.key), bytes(self.iv))
+        self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
 
     def test_cbc_encrypt(self):
         data = list(self.secret_msg)
@@ -77,10 +78,9 @@ def test_gcm_decrypt(self):
         decrypted = bytes(aes_gcm_decrypt_and_verify(
             list(data), self.key, list(authentication_tag), self.iv[:12]))
         self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
-        if Cryptodome.AES:
-            decrypted = aes_gcm_decrypt_and_verify_bytes(
-                data, bytes(self.key), authentication_tag, bytes(self.iv[:12]))
-            self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
+        decrypted = aes_gcm_decrypt_and_verify_bytes(
+            data, bytes(self.key), authentication_tag, bytes(self.iv[:12]))
+        self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
 
     def test_gcm_aligned_decrypt(self):
         data = b'\x159Y\xcf5eud\x90\x9c\x85&]\x14\x1d\x0f'
@@ -89,10 +89,44 @@ def test_gcm_aligned_decrypt(self):
         decrypted = bytes(aes_gcm_decrypt_and_verify(
             list(data), self.key, list(authentication_tag), self.iv[:12]))
         self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg[:16])
-        if Cryptodome.AES:
-            decrypted = aes_gcm_decrypt_and_verify_bytes(
-                data, bytes(self.key), authentication_tag, bytes(self.iv[:12]))
-            self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg[:16])
+        decrypted = aes_gcm_decrypt_and_verify_bytes(
+            data, bytes(self.key), authentication_tag, bytes(self.iv[:12]))
+        self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg[:16])
+
+    def test_gcm_mismatching_tag(self):
+        data = b'\x159Y\xcf5eud\x90\x9c\x85&]\x14\x1d\x0f'
+        with self.assertRaises(ValueError):
+            aes_gcm_decrypt_and_verify_bytes(data, bytes(self.key), bytes(16), bytes(self.iv[:12]))
+
+    def test_cbc_decrypt_native(self):
+        # The table-based implementation must match the reference block cipher for all key sizes
+        data = bytes(range(256)) * 2
+        for key in (list(range(16)), list(range(24)), list(range(32))):
+            for size in (len(data), len(data) - 5):
+                # Incomplete blocks are padded with zeros
+                padded = list(data[:size]) + [0] * (-size % 16)
+                expected, previous = [], self.iv
+                for i in range(0, len(padded), 16):
+                    block = padded[i:i + 16]
+                    expected += map(int.__xor__, aes_decrypt(block, key_expansion(key)), previous)
+                    previous = block
+                self.assertEqual(
+                    _aes_cbc_decrypt_native(data[:size], bytes(key), bytes(self.iv)), bytes(expected[:size]))
+
+    @unittest.skipUnless(_load_libcrypto(), 'OpenSSL libcrypto is not available')
+    def test_openssl(self):
+        data = b'\x97\x92+\xe5\x0b\xc3\x18\x91ky9m&\xb3\xb5@\xe6\x27\xc2\x96.\xc8u\x88\xab9-[\x9e|\xf1\xcd'
+        decrypted = _openssl_decrypt('cbc', data, bytes(self.key), bytes(self.iv))
+        self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
+        with self.assertRaises(ValueError):
+            _openssl_decrypt('cbc', data[:-1], bytes(self.key), bytes(self.iv))
+
+        data = b'\x159Y\xcf5eud\x90\x9c\x85&]\x14\x1d\x0f.\x08\xb4T\xe4/\x17\xbd'
+        authentication_tag = b'\xe8&I\x80rI\x07\x9d}YWuU@:e'
+        decrypted = _openssl_decrypt('gcm', data, bytes(self.key), bytes(self.iv[:12]), authentication_tag)
+        self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
+        with self.assertRaises(ValueError):
+            _openssl_decrypt('gcm', data, bytes(self.key), bytes(self.iv[:12]), bytes(16))
 
     def test_decrypt_text(self):
         password = bytes(self.key).decode()
@@ -11,7 +11,13 @@
 import collections
 
 from test.helper import gettestcases
-from yt_dlp.extractor import FacebookIE, YoutubeIE, gen_extractors
+from yt_dlp.extractor import (
+    FacebookIE,
+    YoutubeIE,
+    gen_extractor_classes,
+    gen_extractors,
+)
+from yt_dlp.extractor._url_index import ExtractorDispatcher, ExtractorIndex
 
 
 class TestAllURLsMatching(unittest.TestCase):
@@ -82,6 +88,16 @@ def test_no_duplicates(self):
                         ie.suitable(url),
                         f'{type(ie).__name__} should not match URL {url!r} . That URL belongs to {tc["name"]}.')
 
+    def test_url_index(self):
+        ies = {ie.ie_key(): ie for ie in gen_extractor_classes()}
+        dispatcher = ExtractorDispatcher(ies, ExtractorIndex.build(ies.values()))
+        for tc in gettestcases(include_onlymatching=True):
+            url = tc['url']
+            candidates = dispatcher.candidates(url)
+            self.assertIn(tc['name'], candidates, f'{tc["name"]}IE is not a candidate for URL {url!r}')
+            self.assertEqual(candidates[-1], 'Generic')
+            self.assertLess(len(candidates), len(ies) / 10)
+
     def test_keywords(self):
         self.assertMatch(':ytsubs', ['youtube:subscriptions'])
         self.assertMatch(':ytsubscriptions', ['youtube:subscriptions'])
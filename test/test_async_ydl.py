@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import asyncio
+import threading
+
+from yt_dlp import AsyncYoutubeDL, YoutubeDL
+from yt_dlp.async_ydl import ExtractionPool
+from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.utils import DownloadError, ExtractorError
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+
+class _TestIE(InfoExtractor):
+    IE_NAME = 'Test'
+    _VALID_URL = r'test:(?P<id>\w+)'
+    downloaders = []
+    barrier = None
+    initializations = []
+    tokens = []
+
+    def _real_initialize(self):
+        # Stands in for a login
+        type(self).initializations.append(self._downloader)
+        self._token = len(type(self).initializations)
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        if video_id == 'error':
+            raise ExtractorError('Expected error', expected=True)
+        ydl = self._downloader
+        type(self).downloaders.append((ydl, ydl.cache, ydl.cookiejar, ydl._request_director))
+        self.tokens.append(self._token)
+        if type(self).barrier:
+            type(self).barrier.wait(timeout=5)
+        return {
+            'id': video_id,
+            'title': video_id,
+            'formats': [
+                {'format_id': 'low', 'url': 'http://127.0.0.1/low.mp4', 'height': 360},
+                {'format_id': 'high', 'url': 'http://127.0.0.1/high.mp4', 'height': 720},
+            ],
+        }
+
+
+class TestAsyncYoutubeDL(unittest.TestCase):
+    def setUp(self):
+        _TestIE.downloaders = []
+        _TestIE.barrier = None
+        _TestIE.initializations = []
+        _TestIE.tokens = []
+
+    def run_extractions(self, coros_func, params=None, **kwargs):
+        async def run():
+            async with AsyncYoutubeDL({'logger': FakeLogger(), **(params or {})}, auto_init=False, **kwargs) as ydl:
+                ydl.add_info_extractor(_TestIE())
+                result = await coros_func(ydl)
+                # The shared resources of the parent are recreated on access after it is closed
+                self.shared = [ydl.ydl.cache, ydl.ydl.cookiejar, ydl.ydl._request_director]
+                return ydl, result
+
+        return asyncio.run(run())
+
+    def test_extract_info(self):
+        ydl, (info, worst) = self.run_extractions(lambda ydl: asyncio.gather(
+            ydl.extract_info('test:first'), ydl.extract_info('test:second', {'format': 'worst'})))
+        self.assertEqual(info['id'], 'first')
+        self.assertEqual(info['format_id'], 'high')
+        self.assertEqual(worst['id'], 'second')
+        self.assertEqual(worst['format_id'], 'low')
+        # Per-call params do not leak into the shared instance
+        self.assertNotIn('format', ydl.ydl.params)
+
+        self.assertEqual(len(_TestIE.downloaders), 2)
+        (first, *shared), (second, *other_shared) = _TestIE.downloaders
+        self.assertIsNot(first, second)
+        self.assertEqual(shared, other_shared)
+        self.assertEqual(shared, self.shared)
+
+    def test_initialization(self):
+        _TestIE.barrier = threading.Barrier(3)
+        ydl, _ = self.run_extractions(
+            lambda ydl: asyncio.gather(*(ydl.extract_info(f'test:{i}') for i in range(3))), max_concurrency=3)
+        # The extractor is initialized once by the parent, and the workers copy its state
+        self.assertEqual(_TestIE.initializations, [ydl.ydl])
+        self.assertEqual(_TestIE.tokens, [1, 1, 1])
+
+        # Unless the params of the login are overridden
+        _TestIE.barrier = None
+        ydl, _ = self.run_extractions(lambda ydl: ydl.extract_info('test:login', {'username': 'user'}))
+        self.assertEqual(len(_TestIE.initializations), 2)
+        self.assertIsNot(_TestIE.initializations[1], ydl.ydl)
+        self.assertEqual(_TestIE.tokens[-1], 2)
+
+    def test_network_params(self):
+        self.run_extractions(lambda ydl: ydl.extract_info('test:proxied', {'proxy': 'http://127.0.0.1:1'}))
+        _, cache, cookiejar, director = _TestIE.downloaders[0]
+        self.assertIs(cache, self.shared[0])
+        self.assertIs(cookiejar, self.shared[1])
+        self.assertIsNot(director, self.shared[2])
+
+    def test_concurrency(self):
+        _TestIE.barrier = threading.Barrier(3)
+        _, infos = self.run_extractions(
+            lambda ydl: asyncio.gather(*(ydl.extract_info(f'test:{i}') for i in range(3))), max_concurrency=3)
+        self.assertEqual([info['id'] for info in infos], ['0', '1', '2'])
+
+    def test_error(self):
+        with self.assertRaises(DownloadError):
+            self.run_extractions(lambda ydl: ydl.extract_info('test:error'))
+        _, info = self.run_extractions(lambda ydl: ydl.extract_info('test:error'), {'ignoreerrors': True})
+        self.assertIsNone(info)
+
+
+class TestExtractionPool(unittest.TestCase):
+    def test_shutdown(self):
+        _TestIE.downloaders = []
+        _TestIE.initializations = []
+        _TestIE.tokens = []
+        ydl = YoutubeDL({'logger': FakeLogger()}, auto_init=False)
+        ydl.add_info_extractor(_TestIE())
+        pool = ExtractionPool(ydl, 2)
+        self.assertEqual(pool.submit('test:first', _TestIE.ie_key()).result()['id'], 'first')
+        closed = []
+        worker = _TestIE.downloaders[0][0]
+        worker.add_close_hook(lambda: closed.append(worker))
+        pool.shutdown()
+        self.assertEqual(closed, [worker])
+        ydl.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
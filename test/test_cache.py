@@ -12,6 +12,7 @@
 
 from test.helper import FakeYDL
 from yt_dlp.cache import Cache
+from yt_dlp.utils import YoutubeDLError
 
 
 def _is_empty(d):
@@ -52,6 +53,76 @@ def test_cache(self):
         self.assertFalse(os.path.exists(self.test_dir))
         self.assertEqual(c.load('test_cache', 'k.'), None)
 
+    def test_memo(self):
+        ydl = FakeYDL({'cachedir': self.test_dir})
+        c = Cache(ydl)
+        c.store('test_cache', 'k', {'x': [1]})
+        c.load('test_cache', 'k')['x'].append(2)
+        self.assertEqual(c.load('test_cache', 'k'), {'x': [1]})
+        shutil.rmtree(self.test_dir)
+        # Served from memory
+        self.assertEqual(c.load('test_cache', 'k'), {'x': [1]})
+        self.assertEqual(Cache(ydl).load('test_cache', 'k'), None)
+
+    def test_ttl(self):
+        ydl = FakeYDL({'cachedir': self.test_dir})
+        c = Cache(ydl)
+        c.store('test_cache', 'k', 1)
+        c.store('test_cache2', 'k', 2)
+        ydl.params['cache_ttl'] = {'test_cache': -1}
+        self.assertEqual(c.load('test_cache', 'k'), None)
+        self.assertEqual(c.load('test_cache2', 'k'), 2)
+        ydl.params['cache_ttl'] = -1
+        self.assertEqual(Cache(ydl).load('test_cache2', 'k'), None)
+
+    def test_sqlite(self):
+        ydl = FakeYDL({'cachedir': self.test_dir, 'cache_backend': 'sqlite'})
+        c = Cache(ydl)
+        obj = {'x': 1, 'y': ['ä', '\\a', True]}
+        self.assertEqual(c.load('test_cache', 'k.'), None)
+        c.store('test_cache', 'k.', obj)
+        c.close()
+        self.assertEqual(os.listdir(self.test_dir), ['cache.sqlite3'])
+        c = Cache(ydl)
+        self.assertEqual(c.load('test_cache', 'k.'), obj)
+        self.assertEqual(c.load('test_cache2', 'k.'), None)
+        c.remove()
+        self.assertFalse(os.path.exists(self.test_dir))
+
+    def test_max_size(self):
+        for backend in ('file', 'sqlite'):
+            ydl = FakeYDL({'cachedir': self.test_dir, 'cache_backend': backend, 'cache_max_size': 0})
+            c = Cache(ydl)
+            c.store('test_cache', 'k1', 'x' * 100)
+            c._store_count = 0
+            c.store('test_cache', 'k2', 'x' * 100)
+            c.close()
+            c = Cache(ydl)
+            self.assertEqual(c.load('test_cache', 'k1'), None, backend)
+            c.remove()
+
+    def test_backend_errors(self):
+        with self.assertRaises(YoutubeDLError):
+            FakeYDL({'cachedir': self.test_dir, 'cache_backend': 'bogus'})
+
+        # The cache directory cannot be created, since its parent is a file
+        _mkdir(self.test_dir)
+        blocker = os.path.join(self.test_dir, 'file')
+        with open(blocker, 'w'):
+            pass
+        for backend in ('file', 'sqlite'):
+            ydl = FakeYDL({'cachedir': os.path.join(blocker, 'cache'), 'cache_backend': backend})
+            warnings = []
+            ydl.report_warning = lambda msg, *args, **kwargs: warnings.append(msg)
+            c = Cache(ydl)
+            self.assertEqual(c.load('test_cache', 'k'), None, backend)
+            c.store('test_cache', 'k', 1)
+            self.assertEqual(c.load('test_cache', 'k'), None, backend)
+            self.assertTrue(warnings[-1].startswith('Writing cache'), backend)
+            if backend == 'sqlite':
+                self.assertTrue(warnings[0].startswith('Unable to open the sqlite cache'))
+            c.close()
+
 
 if __name__ == '__main__':
     unittest.main()
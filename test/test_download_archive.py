@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import tempfile
+
+from test.helper import FakeYDL
+from yt_dlp.archive import (
+    SQLiteDownloadArchive,
+    TextDownloadArchive,
+    open_download_archive,
+)
+from yt_dlp.dependencies import sqlite3
+
+
+class TestDownloadArchive(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.test_dir = self._tmpdir.name
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.test_dir, name)
+
+    def test_text_archive(self):
+        fn = self._path('archive.txt')
+        with open(fn, 'w', encoding='utf-8') as f:
+            f.write('youtube abc\nyoutube def\n')
+
+        archive = open_download_archive(fn)
+        self.assertIsInstance(archive, TextDownloadArchive)
+        self.assertIn('youtube abc', archive)
+        self.assertNotIn('youtube xyz', archive)
+        archive.add('youtube xyz')
+        archive.add('youtube abc')
+        archive.close()
+
+        with open(fn, encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'youtube abc\nyoutube def\nyoutube xyz\n')
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_sqlite_archive(self):
+        fn = self._path('archive.sqlite')
+        archive = open_download_archive(fn)
+        self.assertIsInstance(archive, SQLiteDownloadArchive)
+        self.assertTrue(archive)
+        self.assertNotIn('youtube abc', archive)
+        archive.add('youtube abc')
+        self.assertIn('youtube abc', archive)
+        archive.update(['youtube def', 'youtube abc'])
+        self.assertEqual(len(archive), 2)
+        archive.close()
+
+        # Existing databases are detected regardless of the file extension
+        os.rename(fn, self._path('archive.txt'))
+        with open_download_archive(self._path('archive.txt')) as archive:
+            self.assertIsInstance(archive, SQLiteDownloadArchive)
+            self.assertEqual(set(archive), {'youtube abc', 'youtube def'})
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_sqlite_batching(self):
+        fn = self._path('archive.sqlite')
+        archive = SQLiteDownloadArchive(fn, batch_size=3)
+        archive.update(['a 1', 'a 2'])
+        with SQLiteDownloadArchive(fn) as other:
+            self.assertNotIn('a 1', other)
+        archive.add('a 3')
+        with SQLiteDownloadArchive(fn) as other:
+            self.assertIn('a 1', other)
+            self.assertIn('a 3', other)
+        archive.add('a 4')
+        archive.close()
+        with SQLiteDownloadArchive(fn) as other:
+            self.assertIn('a 4', other)
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_import_export(self):
+        src, dst = self._path('src.txt'), self._path('dst.txt')
+        with open(src, 'w', encoding='utf-8') as f:
+            f.write('youtube abc\n\nvimeo 123\n')
+
+        with open_download_archive(self._path('archive.sqlite3')) as archive:
+            archive.import_text(src)
+            self.assertIn('vimeo 123', archive)
+            archive.export_text(dst)
+
+        with open(dst, encoding='utf-8') as f:
+            self.assertEqual(sorted(f.read().splitlines()), ['vimeo 123', 'youtube abc'])
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_ydl_archive(self):
+        fn = self._path('archive.sqlite')
+        ydl = FakeYDL({'download_archive': fn})
+        self.assertFalse(ydl.in_download_archive({'id': 'abc', 'extractor_key': 'Youtube'}))
+        ydl.record_download_archive({'id': 'abc', 'extractor_key': 'Youtube'})
+        self.assertTrue(ydl.in_download_archive({'id': 'abc', 'extractor_key': 'Youtube'}))
+        self.assertTrue(ydl.in_download_archive({
+            'id': 'new', 'extractor_key': 'Youtube', '_old_archive_ids': ['youtube abc']}))
+        ydl.close()
+
+        ydl = FakeYDL({'download_archive': fn})
+        self.assertTrue(ydl.in_download_archive({'id': 'abc', 'extractor_key': 'Youtube'}))
+        ydl.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
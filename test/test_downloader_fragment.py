@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import http.server
+import re
+import tempfile
+import threading
+import time
+
+from test.helper import http_server_port
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.dash import DashSegmentsFD
+from yt_dlp.downloader.fragment import FragmentScheduler
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+FRAGMENT_COUNT = 20
+
+
+def fragment_content(index):
+    return (b'%d:' % index) * (100 + index)
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        mobj = re.fullmatch(r'/frag/(\d+)', self.path)
+        assert mobj
+        content = fragment_content(int(mobj.group(1)))
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestFragmentFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.test_dir = self._tmpdir.name
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._tmpdir.cleanup()
+
+    def download(self, params, fragment_count=FRAGMENT_COUNT):
+        params = {'logger': FakeLogger(), **params}
+        filename = os.path.join(self.test_dir, 'testfile.mp4')
+        with YoutubeDL(params) as ydl:
+            downloader = DashSegmentsFD(ydl, params)
+            self.assertTrue(downloader.real_download(filename, {
+                'url': f'http://127.0.0.1:{self.port}/manifest.mpd',
+                'protocol': 'http_dash_segments',
+                'fragments': [
+                    {'url': f'http://127.0.0.1:{self.port}/frag/{i}'}
+                    for i in range(fragment_count)],
+            }))
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(map(fragment_content, range(fragment_count))))
+        self.assertEqual(os.listdir(self.test_dir), ['testfile.mp4'])
+
+    def test_buffered(self):
+        self.download({})
+        self.download({'concurrent_fragment_downloads': 4})
+
+    def test_buffer_spill(self):
+        self.download({'fragment_buffer_size': 256})
+        self.download({'fragment_buffer_size': 256, 'concurrent_fragment_downloads': 4})
+
+    def test_fragment_files(self):
+        self.download({'fragment_buffer_size': 0})
+        self.download({'fragment_buffer_size': 0, 'concurrent_fragment_downloads': 4})
+
+    def test_multiple_formats(self):
+        params = {'logger': FakeLogger(), 'concurrent_fragment_downloads': 3}
+        filenames = [os.path.join(self.test_dir, f'testfile.f{i}.mp4') for i in range(2)]
+        with YoutubeDL(params) as ydl:
+            downloader = DashSegmentsFD(ydl, params)
+            self.assertTrue(downloader.real_download(os.path.join(self.test_dir, 'testfile.mp4'), {
+                'url': f'http://127.0.0.1:{self.port}/manifest.mpd',
+                'protocol': 'http_dash_segments',
+                'requested_formats': [{
+                    'filepath': filename,
+                    'fragments': [
+                        {'url': f'http://127.0.0.1:{self.port}/frag/{i}'}
+                        for i in range(count)],
+                } for filename, count in zip(filenames, (3, FRAGMENT_COUNT), strict=True)],
+            }))
+        for filename, count in zip(filenames, (3, FRAGMENT_COUNT), strict=True):
+            with open(filename, 'rb') as f:
+                self.assertEqual(f.read(), b''.join(map(fragment_content, range(count))))
+
+
+class TestFragmentScheduler(unittest.TestCase):
+    def test_ordered(self):
+        scheduler = FragmentScheduler(4)
+
+        def func(i):
+            time.sleep(0.01 * (i % 3))
+            return i
+
+        self.assertEqual(list(scheduler.imap(func, range(50), lookahead=8)), list(range(50)))
+        scheduler.shutdown()
+
+    def test_max_per_host(self):
+        scheduler = FragmentScheduler(6, max_per_host=2)
+        lock = threading.Lock()
+        running, max_running = {}, {}
+
+        def func(host):
+            with lock:
+                running[host] = running.get(host, 0) + 1
+                max_running[host] = max(max_running.get(host, 0), running[host])
+            time.sleep(0.01)
+            with lock:
+                running[host] -= 1
+            return host
+
+        hosts = ['a', 'b', 'a', 'a', 'c', 'a', 'b', 'b'] * 3
+        self.assertEqual(list(scheduler.imap(func, hosts, lookahead=12, host_func=lambda h: h)), hosts)
+        self.assertLessEqual(max(max_running.values()), 2)
+        scheduler.shutdown()
+
+    def test_exception(self):
+        scheduler = FragmentScheduler(2)
+
+        def func(i):
+            if i == 3:
+                raise ValueError(i)
+            return i
+
+        results = scheduler.imap(func, range(10), lookahead=4)
+        self.assertEqual([next(results) for _ in range(3)], [0, 1, 2])
+        with self.assertRaises(ValueError):
+            next(results)
+        scheduler.shutdown()
+        with self.assertRaises(RuntimeError):
+            scheduler.submit(func, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import concurrent.futures
+import http.server
+import json
+import re
+import tempfile
+import threading
+
+from test.helper import FakeYDL, http_server_port
+from yt_dlp import YoutubeDL
+from yt_dlp.aes import aes_cbc_decrypt_bytes, aes_cbc_encrypt_bytes
+from yt_dlp.downloader import get_suitable_downloader
+from yt_dlp.downloader.external import FFmpegFD
+from yt_dlp.downloader.hls import HlsFD
+from yt_dlp.m3u8 import parse_m3u8
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+SEGMENT_COUNT = 8
+WINDOW_SIZE = 3
+KEY = bytes(range(16))
+
+
+def segment_content(index):
+    return (b'%d:' % index) * (100 + index)
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_content(self, content, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        if self.path == '/live.m3u8':
+            # The window of the playlist moves forward by one segment on every request
+            with self.server.lock:
+                start = min(self.server.playlist_requests, SEGMENT_COUNT - WINDOW_SIZE)
+                self.server.playlist_requests += 1
+            lines = ['#EXTM3U', '#EXT-X-TARGETDURATION:1', f'#EXT-X-MEDIA-SEQUENCE:{start}']
+            for index in range(start, start + WINDOW_SIZE):
+                lines.extend(('#EXTINF:1.0,', f'/seg/{index}.ts'))
+            if start + WINDOW_SIZE >= SEGMENT_COUNT:
+                lines.append('#EXT-X-ENDLIST')
+            self.send_content('\n'.join(lines).encode(), 'application/vnd.apple.mpegurl')
+            return
+        if self.path == '/encrypted.m3u8':
+            lines = ['#EXTM3U', '#EXT-X-TARGETDURATION:1', '#EXT-X-KEY:METHOD=AES-128,URI="/key"']
+            for index in range(SEGMENT_COUNT):
+                lines.extend(('#EXTINF:1.0,', f'/enc/{index}.ts'))
+            lines.append('#EXT-X-ENDLIST')
+            self.send_content('\n'.join(lines).encode(), 'application/vnd.apple.mpegurl')
+            return
+        if self.path == '/key':
+            with self.server.lock:
+                self.server.key_requests += 1
+            self.send_content(KEY, 'application/octet-stream')
+            return
+        mobj = re.fullmatch(r'/(seg|enc)/(\d+)\.ts', self.path)
+        assert mobj
+        index = int(mobj.group(2))
+        with self.server.lock:
+            self.server.segment_requests.append(index)
+        content = segment_content(index)
+        if mobj.group(1) == 'enc':
+            # The IV is the media sequence number of the segment
+            padding = 16 - len(content) % 16
+            content = aes_cbc_encrypt_bytes(content + bytes([padding]) * padding, KEY, index.to_bytes(16, 'big'))
+        self.send_content(content, 'video/mp2t')
+
+
+class TestHlsLive(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.httpd.lock = threading.Lock()
+        self.httpd.playlist_requests = 0
+        self.httpd.key_requests = 0
+        self.httpd.segment_requests = []
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self._tmpdir.name, 'testfile.ts')
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._tmpdir.cleanup()
+
+    def download(self, params=None, path='/live.m3u8', **info):
+        params = {'logger': FakeLogger(), **(params or {})}
+        with YoutubeDL(params) as ydl, mock.patch('time.sleep') as sleep:
+            self.assertTrue(HlsFD(ydl, params).real_download(self.filename, {
+                'id': 'live',
+                'url': f'http://127.0.0.1:{self.port}{path}',
+                'ext': 'ts',
+                'protocol': 'm3u8_native',
+                **info,
+            }))
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(map(segment_content, range(SEGMENT_COUNT))))
+        self.assertEqual(os.listdir(self._tmpdir.name), ['testfile.ts'])
+        # The playlist is refreshed once its target duration has passed
+        for (interval,), _ in sleep.call_args_list:
+            self.assertLessEqual(interval, 1)
+        return sleep
+
+    def test_live(self):
+        sleep = self.download(is_live=True)
+        # Each segment is only downloaded once
+        self.assertEqual(self.httpd.segment_requests, list(range(SEGMENT_COUNT)))
+        self.assertEqual(self.httpd.playlist_requests, SEGMENT_COUNT - WINDOW_SIZE + 1)
+        self.assertEqual(sleep.call_count, self.httpd.playlist_requests - 1)
+
+    def test_live_concurrent(self):
+        self.download({'concurrent_fragment_downloads': 4}, is_live=True)
+        self.assertEqual(sorted(self.httpd.segment_requests), list(range(SEGMENT_COUNT)))
+
+    def test_generic_live(self):
+        # The playlist is detected as live without is_live once its media sequence has moved on
+        self.httpd.playlist_requests = 1
+        with open(f'{self.filename}.part', 'wb') as f:
+            f.write(segment_content(0))
+        with open(f'{self.filename}.ytdl', 'w') as f:
+            json.dump({'downloader': {'current_fragment': {'index': 1}}}, f)
+        self.download(extractor_key='Generic')
+        self.assertEqual(self.httpd.segment_requests, list(range(1, SEGMENT_COUNT)))
+
+    def test_resume(self):
+        with open(f'{self.filename}.part', 'wb') as f:
+            f.write(b''.join(map(segment_content, range(2))))
+        with open(f'{self.filename}.ytdl', 'w') as f:
+            json.dump({'downloader': {'current_fragment': {'index': 2}}}, f)
+        self.download(is_live=True)
+        # Segments that are still in the playlist but have already been downloaded are skipped
+        self.assertEqual(self.httpd.segment_requests, list(range(2, SEGMENT_COUNT)))
+
+    def test_interrupted_resume(self):
+        class Crash(Exception):
+            pass
+
+        # The recording starts in the middle of the stream, and crashes at the first refresh of the playlist
+        self.httpd.playlist_requests = 3
+        params = {'logger': FakeLogger()}
+        with YoutubeDL(params) as ydl, mock.patch('time.sleep', side_effect=Crash), self.assertRaises(Crash):
+            HlsFD(ydl, params).real_download(self.filename, {
+                'id': 'live',
+                'url': f'http://127.0.0.1:{self.port}/live.m3u8',
+                'ext': 'ts',
+                'protocol': 'm3u8_native',
+                'is_live': True,
+            })
+        with open(f'{self.filename}.ytdl') as f:
+            self.assertEqual(json.load(f)['downloader']['current_fragment']['index'], 6)
+
+        self.httpd.segment_requests.clear()
+        with YoutubeDL(params) as ydl, mock.patch('time.sleep'):
+            self.assertTrue(HlsFD(ydl, params).real_download(self.filename, {
+                'id': 'live',
+                'url': f'http://127.0.0.1:{self.port}/live.m3u8',
+                'ext': 'ts',
+                'protocol': 'm3u8_native',
+                'is_live': True,
+            }))
+        self.assertEqual(self.httpd.segment_requests, list(range(6, SEGMENT_COUNT)))
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(map(segment_content, range(3, SEGMENT_COUNT))))
+
+    def test_encrypted_concurrent(self):
+        decrypting_threads = set()
+
+        def decrypt(*args):
+            decrypting_threads.add(threading.current_thread())
+            return aes_cbc_decrypt_bytes(*args)
+
+        with mock.patch('yt_dlp.downloader.fragment._AES_BACKEND', 'openssl'), \
+                mock.patch('yt_dlp.downloader.fragment.aes_cbc_decrypt_bytes', decrypt):
+            self.download({'concurrent_fragment_downloads': 4}, path='/encrypted.m3u8')
+        # The fragments are decrypted by the download workers, and the key is only fetched once
+        self.assertTrue(decrypting_threads)
+        self.assertNotIn(threading.main_thread(), decrypting_threads)
+        self.assertEqual(self.httpd.key_requests, 1)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(map(segment_content, range(SEGMENT_COUNT))))
+
+    def test_encrypted_process_pool(self):
+        submit = concurrent.futures.ProcessPoolExecutor.submit
+        with mock.patch('yt_dlp.downloader.fragment._AES_BACKEND', 'native'), \
+                mock.patch.object(concurrent.futures.ProcessPoolExecutor, 'submit', autospec=True, side_effect=submit) as spy:
+            self.download({'concurrent_fragment_downloads': 2}, path='/encrypted.m3u8')
+        # The fragments are decrypted in the process pool
+        self.assertEqual(spy.call_count, SEGMENT_COUNT)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(map(segment_content, range(SEGMENT_COUNT))))
+
+    def test_suitable_downloader(self):
+        info = {'url': 'http://127.0.0.1/live.m3u8', 'protocol': 'm3u8_native', 'is_live': True}
+        self.assertIs(get_suitable_downloader(info, {}), FFmpegFD)
+        self.assertIs(get_suitable_downloader(info, {'external_downloader': {'m3u8': 'native'}}), HlsFD)
+
+
+class TestHlsFragments(unittest.TestCase):
+    MANIFEST_URL = 'https://example.com/hls/media.m3u8?token=1'
+    PLAYLIST = '''#EXTM3U
+#EXT-X-TARGETDURATION:6
+#EXT-X-MEDIA-SEQUENCE:5
+#EXT-X-MAP:URI="init.mp4"
+#EXT-X-KEY:METHOD=AES-128,URI="/key"
+#EXTINF:6,
+a/0.ts
+#EXTINF:6,
+#EXT-X-BYTERANGE:100@0
+../1.ts
+#EXT-X-DISCONTINUITY
+#EXTINF:6,
+#EXT-X-BYTERANGE:100
+../1.ts
+#EXT-X-ENDLIST
+'''
+
+    def build_fragments(self, playlist=PLAYLIST, **info):
+        with FakeYDL() as ydl:
+            fd = HlsFD(ydl, {})
+            return fd._build_fragments(parse_m3u8(playlist), self.MANIFEST_URL, info, info.get('format_index'))
+
+    def test_fragments(self):
+        fragments = self.build_fragments(extra_param_to_segment_url='sig=x')
+        self.assertEqual([(f['frag_index'], f['url'], f['byte_range'], f['media_sequence']) for f in fragments], [
+            (1, 'https://example.com/hls/init.mp4?sig=x', {}, 5),
+            (2, 'https://example.com/hls/a/0.ts?sig=x', {}, 6),
+            (3, 'https://example.com/1.ts?sig=x', {'start': 0, 'end': 100}, 7),
+            (4, 'https://example.com/1.ts?sig=x', {'start': 100, 'end': 200}, 8),
+        ])
+        self.assertTrue(fragments[0]['is_init'])
+        self.assertEqual(fragments[1]['decrypt_info'], {'METHOD': 'AES-128', 'URI': 'https://example.com/key?sig=x'})
+        # The key is only fetched once
+        self.assertIs(fragments[1]['decrypt_info'], fragments[3]['decrypt_info'])
+
+    def test_discontinuity(self):
+        fragments = self.build_fragments(format_index=1)
+        # The initialization section is needed by every discontinuity
+        self.assertEqual([(f['frag_index'], f['url']) for f in fragments], [
+            (1, 'https://example.com/hls/init.mp4'),
+            (2, 'https://example.com/1.ts'),
+        ])
+
+    def test_init_after_media(self):
+        with self.assertRaisesRegex(Exception, 'Initialization fragment found after media fragments'):
+            self.build_fragments(self.PLAYLIST.replace('#EXT-X-DISCONTINUITY', '#EXT-X-MAP:URI="init2.mp4"'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,7 @@
 
 
 import http.server
+import json
 import re
 import threading
 
@@ -21,6 +22,7 @@
 
 
 TEST_SIZE = 10 * 1024
+PATTERN = bytes(i % 251 for i in range(100 * 1024))
 
 
 class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
@@ -54,8 +56,25 @@ def serve(self, range=True, content_length=True):
         self.end_headers()
         self.wfile.write(b'#' * size)
 
+    def serve_pattern(self):
+        self.server.requested_ranges.append(self.headers.get('Range'))
+        start, end = 0, len(PATTERN) - 1
+        mobj = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range') or '')
+        if mobj:
+            start = int(mobj.group(1))
+            end = min(int(mobj.group(2) or end), end)
+        self.send_response(206 if mobj else 200)
+        self.send_header('Content-Type', 'video/mp4')
+        if mobj:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(PATTERN)}')
+        self.send_header('Content-Length', end - start + 1)
+        self.end_headers()
+        self.wfile.write(PATTERN[start:end + 1])
+
     def do_GET(self):
-        if self.path == '/regular':
+        if self.path == '/pattern':
+            self.serve_pattern()
+        elif self.path == '/regular':
             self.serve()
         elif self.path == '/no-content-length':
             self.serve(content_length=False)
@@ -67,10 +86,15 @@ def do_GET(self):
             assert False
 
 
+class ParallelHttpFD(HttpFD):
+    _MIN_RANGE_SIZE = 4096
+
+
 class TestHttpFD(unittest.TestCase):
     def setUp(self):
-        self.httpd = http.server.HTTPServer(
+        self.httpd = http.server.ThreadingHTTPServer(
             ('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.httpd.requested_ranges = []
         self.port = http_server_port(self.httpd)
         self.server_thread = threading.Thread(target=self.httpd.serve_forever)
         self.server_thread.daemon = True
@@ -100,6 +124,77 @@ def test_chunked(self):
             'http_chunk_size': 1000,
         })
 
+    def download_pattern(self, params):
+        params['logger'] = FakeLogger()
+        downloader = ParallelHttpFD(YoutubeDL(params), params)
+        self.assertTrue(downloader.real_download('testfile.mp4', {
+            'url': f'http://127.0.0.1:{self.port}/pattern',
+        }))
+        with open('testfile.mp4', 'rb') as f:
+            self.assertEqual(f.read(), PATTERN)
+        self.assertFalse(os.path.exists('testfile.mp4.ytdl'))
+        try_rm('testfile.mp4')
+
+    def test_parallel(self):
+        params = {'http_connections': 4}
+        for ep in ('regular', 'no-content-length', 'no-range', 'no-range-no-content-length'):
+            params['logger'] = FakeLogger()
+            downloader = ParallelHttpFD(YoutubeDL(params), params)
+            try_rm('testfile.mp4')
+            self.assertTrue(downloader.real_download('testfile.mp4', {
+                'url': f'http://127.0.0.1:{self.port}/{ep}',
+            }), ep)
+            self.assertEqual(os.path.getsize('testfile.mp4'), TEST_SIZE, ep)
+            try_rm('testfile.mp4')
+
+        self.download_pattern({'http_connections': 4})
+        # The probe request and one range for each connection
+        self.assertEqual(len(self.httpd.requested_ranges), 5)
+        self.httpd.requested_ranges.clear()
+        self.download_pattern({'http_connections': 4, 'http_chunk_size': 10000})
+        self.assertEqual(len(self.httpd.requested_ranges), 11)
+        self.download_pattern({'http_connections': 4, 'preallocate': True})
+
+    def test_parallel_resume(self):
+        self.write_partial_download()
+        self.download_pattern({'http_connections': 2})
+        self.assertEqual(self.httpd.requested_ranges[0], 'bytes=30000-34095')
+
+    def write_partial_download(self):
+        with open('testfile.mp4.part', 'wb') as f:
+            f.write(PATTERN[:30000] + bytes(len(PATTERN) - 30000))
+        with open('testfile.mp4.ytdl', 'w') as f:
+            json.dump({'downloader': {'http_ranges': {'total': len(PATTERN), 'completed': [[0, 30000]]}}}, f)
+
+    def test_parallel_resume_single_connection(self):
+        # The preallocated file is resumed from its ranges, instead of from its size
+        self.write_partial_download()
+        self.download_pattern({})
+        self.assertEqual(self.httpd.requested_ranges[0], 'bytes=30000-34095')
+
+        # Without parallel ranges, the download is restarted
+        self.write_partial_download()
+        self.httpd.requested_ranges.clear()
+        params = {'logger': FakeLogger()}
+        self.assertTrue(ParallelHttpFD(YoutubeDL(params), params).real_download('testfile.mp4', {
+            'url': f'http://127.0.0.1:{self.port}/pattern',
+            'http_headers': {'Range': 'bytes=0-'},
+        }))
+        with open('testfile.mp4', 'rb') as f:
+            self.assertEqual(f.read(), PATTERN)
+        self.assertFalse(os.path.exists('testfile.mp4.ytdl'))
+        self.assertEqual(self.httpd.requested_ranges, ['bytes=0-'])
+        try_rm('testfile.mp4')
+
+    def test_parallel_resume_completed(self):
+        # Interrupted after every range was downloaded, but before the file was renamed
+        with open('testfile.mp4.part', 'wb') as f:
+            f.write(PATTERN)
+        with open('testfile.mp4.ytdl', 'w') as f:
+            json.dump({'downloader': {'http_ranges': {'total': len(PATTERN), 'completed': [[0, len(PATTERN)]]}}}, f)
+        self.download_pattern({'http_connections': 2})
+        self.assertEqual(self.httpd.requested_ranges, [])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import pytest
+
+from yt_dlp import YoutubeDL
+from yt_dlp.extractor.youtube.jsc._director import JsChallengeRequestDirector
+from yt_dlp.extractor.youtube.jsc.provider import (
+    JsChallengeProvider,
+    JsChallengeProviderResponse,
+    JsChallengeRequest,
+    JsChallengeResponse,
+    JsChallengeType,
+    NChallengeInput,
+    NChallengeOutput,
+    SigChallengeInput,
+    SigChallengeOutput,
+)
+from yt_dlp.extractor.youtube.pot._director import YoutubeIEContentProviderLogger
+from yt_dlp.extractor.youtube.pot._provider import IEContentProviderLogger
+
+PLAYER_URL = 'https://example.com/player.js'
+
+
+class ReverseJCP(JsChallengeProvider):
+    PROVIDER_NAME = 'reverse'
+    PROVIDER_VERSION = '0.0.1'
+    BUG_REPORT_LOCATION = 'https://example.com/issues'
+
+    _SUPPORTED_TYPES = [JsChallengeType.N, JsChallengeType.SIG]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.solved = []
+
+    def is_available(self) -> bool:
+        return True
+
+    def _real_bulk_solve(self, requests):
+        for request in requests:
+            self.solved.extend(request.input.challenges)
+            output_type = NChallengeOutput if request.type is JsChallengeType.N else SigChallengeOutput
+            yield JsChallengeProviderResponse(request, JsChallengeResponse(request.type, output_type(
+                {challenge: challenge[::-1] for challenge in request.input.challenges})))
+
+
+def n_request(*challenges, player_url=PLAYER_URL):
+    return JsChallengeRequest(JsChallengeType.N, NChallengeInput(player_url, list(challenges)))
+
+
+def sig_request(*challenges, player_url=PLAYER_URL):
+    return JsChallengeRequest(JsChallengeType.SIG, SigChallengeInput(player_url, list(challenges)))
+
+
+def results(solved):
+    return {request.type: response.output.results for request, response in solved}
+
+
+@pytest.fixture
+def create_director(ie):
+    def create(**kwargs):
+        director = JsChallengeRequestDirector(
+            YoutubeIEContentProviderLogger(ie, 'jsc', log_level=IEContentProviderLogger.LogLevel.DEBUG), **kwargs)
+        provider = ReverseJCP(ie, director.logger, {})
+        director.register_provider(provider)
+        return director, provider
+    return create
+
+
+class TestJsChallengeResultsCache:
+    def test_reuse_results(self, create_director):
+        director, provider = create_director()
+        assert results(director.bulk_solve([n_request('abc'), sig_request('xyz')])) == {
+            JsChallengeType.N: {'abc': 'cba'},
+            JsChallengeType.SIG: {'xyz': 'zyx'},
+        }
+        assert provider.solved == ['abc', 'xyz']
+
+        solved = director.bulk_solve([n_request('abc', 'def'), sig_request('xyz')])
+        # Only the challenges that were not solved before are passed to the provider
+        assert provider.solved == ['abc', 'xyz', 'def']
+        assert results(solved) == {
+            JsChallengeType.N: {'abc': 'cba', 'def': 'fed'},
+            JsChallengeType.SIG: {'xyz': 'zyx'},
+        }
+        # The original requests are returned
+        assert [request for request, _ in solved] == [sig_request('xyz'), n_request('abc', 'def')]
+        assert (director.cache_hits, director.cache_misses) == (2, 3)
+
+    def test_keyed_by_player_and_type(self, create_director):
+        director, provider = create_director()
+        director.bulk_solve([n_request('abc')])
+        director.bulk_solve([sig_request('abc'), n_request('abc', player_url='https://example.com/other.js')])
+        assert provider.solved == ['abc', 'abc', 'abc']
+        assert director.cache_hits == 0
+
+    def test_disabled(self, create_director):
+        director, provider = create_director(use_results_cache=False)
+        director.bulk_solve([n_request('abc')])
+        director.bulk_solve([n_request('abc')])
+        assert provider.solved == ['abc', 'abc']
+
+    def test_disk_cache(self, create_director, tmp_path):
+        with YoutubeDL({'cachedir': str(tmp_path)}) as ydl:
+            director, _ = create_director(cache=ydl.cache)
+            director.bulk_solve([n_request('abc')])
+
+            other_director, other_provider = create_director(cache=ydl.cache)
+            assert results(other_director.bulk_solve([n_request('abc')])) == {JsChallengeType.N: {'abc': 'cba'}}
+            assert other_provider.solved == []
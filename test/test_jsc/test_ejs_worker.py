@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import pytest
+
+from yt_dlp.extractor.youtube.jsc.provider import (
+    JsChallengeProviderResponse,
+    JsChallengeRequest,
+    JsChallengeResponse,
+    JsChallengeType,
+    NChallengeInput,
+    NChallengeOutput,
+)
+from yt_dlp.extractor.youtube.jsc._builtin.ejs import Script, ScriptSource, ScriptType, ScriptVariant
+from yt_dlp.extractor.youtube.jsc._builtin.node import NodeJCP
+
+# A stand-in for the solver scripts: the "player" is the suffix that is appended to n challenges
+LIB_SCRIPT = 'const lib = {};'
+CORE_SCRIPT = '''
+var jsc = (input) => {
+  const preprocessed = input.type === 'player' ? `preprocessed:${input.player}` : input.preprocessed_player;
+  const suffix = preprocessed.slice('preprocessed:'.length);
+  const output = {
+    type: 'result',
+    responses: input.requests.map((request) => ({
+      type: 'result',
+      data: Object.fromEntries(request.challenges.map((challenge) => [challenge, challenge + suffix])),
+    })),
+  };
+  if (input.type === 'player' && input.output_preprocessed) {
+    output.preprocessed_player = preprocessed;
+  }
+  return output;
+};
+'''
+
+
+@pytest.fixture
+def jcp(ie, logger):
+    ie._downloader.params['extractor_args'] = {'youtube-ejs': {'persistent': ['true']}}
+    obj = NodeJCP(ie, logger, None)
+    if not obj.is_available():
+        pytest.skip(f'{obj.PROVIDER_NAME} is not available')
+    obj._lib_script = Script(ScriptType.LIB, ScriptVariant.UNKNOWN, ScriptSource.BUILTIN, '0', LIB_SCRIPT)
+    obj._core_script = Script(ScriptType.CORE, ScriptVariant.UNKNOWN, ScriptSource.BUILTIN, '0', CORE_SCRIPT)
+    obj.loaded_players = []
+
+    def _get_player(video_id, player_url):
+        obj.loaded_players.append(player_url)
+        return player_url.rpartition('/')[2]
+
+    obj._get_player = _get_player
+    yield obj
+    obj.close()
+
+
+def solve(jcp, player_url, challenge):
+    request = JsChallengeRequest(JsChallengeType.N, NChallengeInput(player_url, [challenge]))
+    return list(jcp.bulk_solve([request])), JsChallengeProviderResponse(
+        request, JsChallengeResponse(JsChallengeType.N, NChallengeOutput({challenge: f'{challenge}-{player_url[-1]}'})))
+
+
+def test_persistent_worker(jcp):
+    responses, expected = solve(jcp, 'https://example.com/player/-a', 'first')
+    assert responses == [expected]
+    proc = jcp._worker._proc
+    assert proc.poll() is None
+
+    # The player is only loaded once and the process is reused
+    responses, expected = solve(jcp, 'https://example.com/player/-a', 'second')
+    assert responses == [expected]
+    responses, expected = solve(jcp, 'https://example.com/player/-b', 'third')
+    assert responses == [expected]
+    assert jcp.loaded_players == ['https://example.com/player/-a', 'https://example.com/player/-b']
+    assert jcp._worker._proc is proc
+
+
+def test_worker_restart(jcp):
+    responses, expected = solve(jcp, 'https://example.com/player/-a', 'first')
+    assert responses == [expected]
+    jcp._worker._proc.kill()
+    jcp._worker._proc.wait()
+
+    # The players are loaded again into the new process
+    responses, expected = solve(jcp, 'https://example.com/player/-a', 'second')
+    assert responses == [expected]
+    assert jcp.loaded_players == ['https://example.com/player/-a'] * 2
+
+
+def test_worker_close(jcp):
+    solve(jcp, 'https://example.com/player/-a', 'first')
+    proc = jcp._worker._proc
+    jcp.close()
+    assert proc.returncode == 0
+    assert jcp._worker._proc is None
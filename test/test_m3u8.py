@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+from yt_dlp.m3u8 import InitSection, Key, Segment, Variant, parse_m3u8
+
+MEDIA_PLAYLIST = '''#EXTM3U
+#EXT-X-VERSION:6
+#EXT-X-TARGETDURATION:6
+#EXT-X-MEDIA-SEQUENCE:10
+#EXT-X-DISCONTINUITY-SEQUENCE:2
+#EXT-X-PLAYLIST-TYPE:VOD
+#EXT-X-MAP:URI="init.mp4",BYTERANGE="720@0"
+#EXTINF:6.006,
+#EXT-X-BYTERANGE:1000@720
+media.mp4
+#EXT-X-KEY:METHOD=AES-128,URI="key.bin",IV=0x1f
+#EXTINF:5.5,title
+#EXT-X-BYTERANGE:2000
+media.mp4
+#ANVATO-SEGMENT-INFO: type=ad
+#EXTINF:4,
+ad.ts
+#ANVATO-SEGMENT-INFO: type=master
+#EXT-X-DISCONTINUITY
+#EXT-X-KEY:METHOD=NONE
+#EXT-X-MAP:URI="init2.mp4"
+#EXTINF:6,
+
+  https://cdn.example.com/other.ts\r
+#EXT-X-ENDLIST
+'''
+
+
+class TestM3U8(unittest.TestCase):
+    def test_media_playlist(self):
+        playlist = parse_m3u8(MEDIA_PLAYLIST)
+        self.assertTrue(playlist.is_media_playlist)
+        self.assertEqual(playlist.target_duration, 6)
+        self.assertEqual(playlist.media_sequence, 10)
+        self.assertEqual(playlist.playlist_type, 'VOD')
+        self.assertTrue(playlist.end_list)
+        # EXT-X-DISCONTINUITY-SEQUENCE is not a discontinuity
+        self.assertEqual(playlist.discontinuity_count, 1)
+        self.assertEqual(playlist.variants, [])
+
+        init = InitSection('init.mp4', (0, 720))
+        key = Key('AES-128', 'key.bin', b'\x00' * 15 + b'\x1f')
+        self.assertEqual(playlist.segments, [
+            Segment('media.mp4', 10, 6.006, (720, 1720), None, init),
+            Segment('media.mp4', 11, 5.5, (1720, 3720), key, init),
+            Segment('ad.ts', 12, 4.0, None, key, init, is_ad=True),
+            Segment('https://cdn.example.com/other.ts', 13, 6.0, None, None, InitSection('init2.mp4'), 1),
+        ])
+        # Segments share the key and initialization section that apply to them
+        self.assertIs(playlist.segments[1].key, playlist.segments[2].key)
+        self.assertIs(playlist.segments[0].init_section, playlist.segments[2].init_section)
+
+    def test_media_playlist_without_segments(self):
+        playlist = parse_m3u8(MEDIA_PLAYLIST, parse_segments=False)
+        self.assertEqual(playlist.segments, [])
+        self.assertEqual(playlist.discontinuity_count, 1)
+        self.assertEqual(playlist.media_sequence, 10)
+
+    def test_master_playlist(self):
+        playlist = parse_m3u8('''#EXTM3U
+bare.m3u8
+#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="aac",NAME="English",LANGUAGE="en",URI="audio/en.m3u8"
+#EXT-X-STREAM-INF:BANDWIDTH=1280000,CODECS="avc1.4d401f,mp4a.40.2",RESOLUTION=1280x720,AUDIO="aac"
+video/720.m3u8
+other.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=640000
+video/360.m3u8
+''')
+        self.assertFalse(playlist.is_media_playlist)
+        self.assertEqual(playlist.media, [
+            {'TYPE': 'AUDIO', 'GROUP-ID': 'aac', 'NAME': 'English', 'LANGUAGE': 'en', 'URI': 'audio/en.m3u8'},
+        ])
+        self.assertEqual(playlist.variants, [
+            Variant('bare.m3u8', {}),
+            Variant('video/720.m3u8', {
+                'BANDWIDTH': '1280000', 'CODECS': 'avc1.4d401f,mp4a.40.2', 'RESOLUTION': '1280x720', 'AUDIO': 'aac'}),
+            Variant('other.m3u8', {}),
+            Variant('video/360.m3u8', {'BANDWIDTH': '640000'}),
+        ])
+
+    def test_lines(self):
+        lines = MEDIA_PLAYLIST.splitlines(keepends=True)
+        self.assertEqual(parse_m3u8(iter(lines)), parse_m3u8(MEDIA_PLAYLIST))
+
+
+if __name__ == '__main__':
+    unittest.main()
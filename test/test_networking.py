@@ -19,6 +19,7 @@
 import logging
 import pathlib
 import random
+import socket
 import ssl
 import tempfile
 import threading
@@ -46,7 +47,10 @@
     RequestHandler,
     Response,
 )
+import yt_dlp.networking._helper
+from yt_dlp.networking._helper import DNSCache
 from yt_dlp.networking._urllib import UrllibRH
+from yt_dlp.networking.cache import HTTPCache
 from yt_dlp.networking.exceptions import (
     CertificateVerifyError,
     HTTPError,
@@ -311,7 +315,7 @@ def setup_class(cls):
         cls.https_server_thread.start()
 
 
-@pytest.mark.parametrize('handler', ['Urllib', 'Requests', 'CurlCFFI'], indirect=True)
+@pytest.mark.parametrize('handler', ['Urllib', 'Requests', 'CurlCFFI', 'Httpx'], indirect=True)
 @pytest.mark.handler_flaky('CurlCFFI', reason='segfaults')
 class TestHTTPRequestHandler(TestRequestHandlerBase):
 
@@ -534,6 +538,17 @@ def test_incompleteread(self, handler):
             with pytest.raises(IncompleteRead, match='13 bytes read, 234221 more expected'):
                 validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/incompleteread')).read()
 
+    def test_readinto(self, handler):
+        with handler() as rh:
+            res = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/video.html'))
+            buffer = bytearray(64)
+            view = memoryview(buffer)
+            size = res.readinto(view[:10])
+            size += res.readinto(view[size:])
+            assert buffer[:size] == b'<html><video src="/vid.mp4" /></html>'
+            assert res.readinto(view) == 0
+            assert res.closed
+
     def test_cookies(self, handler):
         cookiejar = YoutubeDLCookieJar()
         cookiejar.set_cookie(http.cookiejar.Cookie(
@@ -623,6 +638,22 @@ def test_source_address(self, handler):
                 rh, Request(f'http://127.0.0.1:{self.http_port}/source_address')).read().decode()
             assert source_address == data
 
+    @pytest.mark.skip_handler('CurlCFFI', 'curl-cffi resolves hosts itself')
+    @pytest.mark.parametrize('dns_cache_ttl,lookups', [(None, 1), (0, 2)])
+    def test_dns_cache(self, handler, monkeypatch, dns_cache_ttl, lookups):
+        hosts = []
+
+        def resolver(host, port, *args):
+            hosts.append(host)
+            return socket.getaddrinfo('127.0.0.1', port, *args)
+
+        monkeypatch.setattr(yt_dlp.networking._helper, 'dns_cache', DNSCache(resolver))
+        with handler(dns_cache_ttl=dns_cache_ttl, keep_alive=False) as rh:
+            for _ in range(2):
+                res = validate_and_send(rh, Request(f'http://yt-dlp.invalid:{self.http_port}/gen_200'))
+                assert res.read() == b'<html></html>'
+        assert hosts == ['yt-dlp.invalid'] * lookups
+
     @pytest.mark.skip_handler('CurlCFFI', 'not supported by curl-cffi')
     def test_gzip_trailing_garbage(self, handler):
         with handler() as rh:
@@ -777,7 +808,7 @@ def test_partial_read_greater_than_response_then_full_read(self, handler):
                 assert res.read() == b''
 
 
-@pytest.mark.parametrize('handler', ['Urllib', 'Requests', 'CurlCFFI'], indirect=True)
+@pytest.mark.parametrize('handler', ['Urllib', 'Requests', 'CurlCFFI', 'Httpx'], indirect=True)
 @pytest.mark.handler_flaky('CurlCFFI', reason='segfaults')
 class TestClientCertificate:
     @classmethod
@@ -1108,6 +1139,40 @@ def test_http_response_auto_close(self, handler):
             assert res.fp.closed
             assert res.closed
 
+    def test_pool_size(self, handler):
+        with handler(pool_size=32) as rh:
+            session = rh._get_instance(cookiejar=rh.cookiejar, legacy_ssl_support=None)
+            assert session.adapters['http://'].poolmanager.connection_pool_kw['maxsize'] == 32
+
+    @pytest.mark.parametrize('params,connections', [
+        ({}, 1),
+        ({'max_idle': 0}, 3),
+        ({'keep_alive': False}, 3),
+    ])
+    def test_connection_stats(self, handler, params, connections):
+        with handler(**params) as rh:
+            for _ in range(3):
+                validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/gen_200')).read()
+            assert rh.connection_stats() == {
+                f'127.0.0.1:{self.http_port}': {'connections': connections, 'requests': 3}}
+
+
+@pytest.mark.parametrize('handler', ['Httpx'], indirect=True)
+class TestHttpxRequestHandler(TestRequestHandlerBase):
+    def test_http_version(self, handler):
+        with handler() as rh:
+            res = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/gen_200'))
+            # HTTP/2 is only negotiated over TLS
+            assert res.extensions['http_version'] == 'HTTP/1.1'
+            assert res.read() == b'<html></html>'
+            assert res.fp.closed
+
+    def test_keep_alive(self, handler):
+        with handler(keep_alive=False) as rh:
+            data = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/headers')).read().lower()
+            # Connection headers are malformed in HTTP/2
+            assert b'connection:' not in data
+
 
 @pytest.mark.parametrize('handler', ['CurlCFFI'], indirect=True)
 @pytest.mark.handler_flaky('CurlCFFI', reason='segfaults')
@@ -1331,6 +1396,10 @@ class HTTPSupportedRH(ValidationRH):
             ('http', False, {}),
             ('https', False, {}),
         ]),
+        ('Httpx', [
+            ('http', False, {}),
+            ('https', False, {}),
+        ]),
         (NoCheckRH, [('http', False, {})]),
         (ValidationRH, [('http', UnsupportedRequest, {})]),
     ]
@@ -1362,6 +1431,12 @@ class HTTPSupportedRH(ValidationRH):
             ('socks5', False),
             ('socks5h', False),
         ]),
+        ('Httpx', 'http', [
+            ('http', False),
+            ('https', False),
+            ('socks4', UnsupportedRequest),
+            ('socks5', UnsupportedRequest),
+        ]),
         ('Websockets', 'ws', [
             ('http', UnsupportedRequest),
             ('https', UnsupportedRequest),
@@ -1390,6 +1465,10 @@ class HTTPSupportedRH(ValidationRH):
             ('all', 'http', False),
             ('unrelated', 'http', False),
         ]),
+        ('Httpx', 'http', [
+            ('all', 'http', False),
+            ('unrelated', 'http', False),
+        ]),
         ('Websockets', 'ws', [
             ('all', 'socks5', False),
             ('unrelated', 'socks5', False),
@@ -1441,6 +1520,16 @@ class HTTPSupportedRH(ValidationRH):
             ({'legacy_ssl': True}, False),
             ({'legacy_ssl': 'notabool'}, AssertionError),
         ]),
+        ('Httpx', 'http', [
+            ({'cookiejar': 'notacookiejar'}, AssertionError),
+            ({'cookiejar': YoutubeDLCookieJar()}, False),
+            ({'timeout': 1}, False),
+            ({'timeout': 'notatimeout'}, AssertionError),
+            ({'unsupported': 'value'}, UnsupportedRequest),
+            ({'legacy_ssl': False}, False),
+            ({'legacy_ssl': True}, False),
+            ({'keep_header_casing': True}, UnsupportedRequest),
+        ]),
         (NoCheckRH, 'http', [
             ({'cookiejar': 'notacookiejar'}, False),
             ({'somerandom': 'test'}, False),  # but any extension is allowed through
@@ -1458,6 +1547,7 @@ class HTTPSupportedRH(ValidationRH):
         ('Urllib', False, 'http'),
         ('Requests', False, 'http'),
         ('CurlCFFI', False, 'http'),
+        ('Httpx', False, 'http'),
         ('Websockets', False, 'ws'),
     ], indirect=['handler'])
     def test_no_proxy(self, handler, fail, scheme):
@@ -1681,6 +1771,133 @@ def mock_close(*args, **kwargs):
         assert called
 
 
+class TestHTTPCache:
+
+    class CachedRH(RequestHandler):
+        _SUPPORTED_URL_SCHEMES = ('http',)
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.requests = []
+            self.response_headers = {}
+            self.body = b'content'
+
+        def _send(self, request: Request):
+            self.requests.append(request)
+            etag = self.response_headers.get('ETag')
+            if etag and request.headers.get('If-None-Match') == etag:
+                raise HTTPError(Response(
+                    fp=io.BytesIO(), url=request.url, headers={'ETag': etag, 'Cache-Control': 'max-age=60'},
+                    status=304))
+            return Response(fp=io.BytesIO(self.body), url=request.url, headers=self.response_headers)
+
+    @pytest.fixture
+    def director(self, tmp_path):
+        director = RequestDirector(logger=FakeLogger(), cache=HTTPCache(str(tmp_path)))
+        director.add_handler(self.CachedRH(logger=FakeLogger()))
+        yield director
+        director.close()
+
+    @staticmethod
+    def send(director, url='http://example.com/', ttl=None, **kwargs):
+        response = director.send(Request(url, extensions={'cache': {'ttl': ttl}}, **kwargs))
+        return response.read(), response.extensions.get('cache')
+
+    def test_max_age(self, director, monkeypatch):
+        rh = director.handlers['Cached']
+        rh.response_headers = {'Cache-Control': 'max-age=60', 'Content-Encoding': 'gzip'}
+        assert self.send(director) == (b'content', None)
+        rh.body = b'changed'
+        assert self.send(director) == (b'content', 'hit')
+        assert len(rh.requests) == 1
+        # The content is already decoded by the request handler
+        assert director.send(Request('http://example.com/', extensions={'cache': {}})).get_header(
+            'Content-Encoding') is None
+
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 61)
+        assert self.send(director) == (b'changed', None)
+        assert len(rh.requests) == 2
+
+    def test_revalidation(self, director):
+        rh = director.handlers['Cached']
+        rh.response_headers = {'ETag': '"1"', 'Cache-Control': 'no-cache'}
+        assert self.send(director) == (b'content', None)
+        assert self.send(director) == (b'content', 'revalidated')
+        assert rh.requests[-1].headers['If-None-Match'] == '"1"'
+        # The headers of the 304 response replace the stored ones
+        assert self.send(director) == (b'content', 'hit')
+        assert len(rh.requests) == 2
+
+    def test_revalidation_modified(self, director):
+        rh = director.handlers['Cached']
+        rh.response_headers = {'ETag': '"1"'}
+        self.send(director)
+        rh.response_headers = {'ETag': '"2"'}
+        rh.body = b'changed'
+        assert self.send(director) == (b'changed', None)
+        assert self.send(director) == (b'changed', 'revalidated')
+
+    @pytest.mark.parametrize('headers', [
+        {'Cache-Control': 'no-store, max-age=60'},
+        {'Cache-Control': 'max-age=60', 'Vary': '*'},
+        {'Cache-Control': 'max-age=0'},
+        {'Expires': '0'},
+        {},
+    ])
+    def test_not_cached(self, director, headers):
+        rh = director.handlers['Cached']
+        rh.response_headers = headers
+        self.send(director)
+        assert self.send(director) == (b'content', None)
+        assert len(rh.requests) == 2
+
+    def test_ttl(self, director):
+        rh = director.handlers['Cached']
+        rh.response_headers = {'Cache-Control': 'no-cache'}
+        self.send(director, ttl=60)
+        assert self.send(director, ttl=60) == (b'content', 'hit')
+        assert self.send(director, ttl=0) == (b'content', None)
+
+        # Other methods are only cached with a TTL, keyed by their data
+        self.send(director, data=b'a')
+        assert self.send(director, data=b'a') == (b'content', None)
+        self.send(director, ttl=60, data=b'b')
+        assert self.send(director, ttl=60, data=b'b') == (b'content', 'hit')
+        assert self.send(director, ttl=60, data=b'c') == (b'content', None)
+
+    def test_vary(self, director):
+        rh = director.handlers['Cached']
+        rh.response_headers = {'Cache-Control': 'max-age=60', 'Vary': 'Accept-Language'}
+        self.send(director, headers={'Accept-Language': 'en'})
+        assert self.send(director, headers={'Accept-Language': 'en'})[1] == 'hit'
+        assert self.send(director, headers={'Accept-Language': 'de'})[1] is None
+        assert self.send(director, headers={'Accept-Language': 'de'})[1] == 'hit'
+
+    def test_cookies(self, director):
+        rh = director.handlers['Cached']
+        rh.response_headers = {'Cache-Control': 'max-age=60'}
+        self.send(director)
+        assert self.send(director)[1] == 'hit'
+        # Requests with other cookies are cached separately
+        assert self.send(director, headers={'Cookie': 'a=c'})[1] is None
+
+        # Responses that set cookies are not stored, even with a TTL
+        rh.response_headers = {'Cache-Control': 'max-age=60', 'Set-Cookie': 'a=b'}
+        self.send(director, 'http://example.com/login', ttl=60)
+        response = director.send(Request('http://example.com/login', extensions={'cache': {'ttl': 60}}))
+        assert response.extensions.get('cache') is None
+        assert response.get_header('Set-Cookie') == 'a=b'
+        assert len(rh.requests) == 4
+
+    def test_no_cache(self):
+        # The extension is removed when the director has no cache
+        director = RequestDirector(logger=FakeLogger())
+        director.add_handler(self.CachedRH(logger=FakeLogger()))
+        assert self.send(director) == (b'content', None)
+        assert self.send(director) == (b'content', None)
+
+
 # XXX: do we want to move this to test_YoutubeDL.py?
 class TestYoutubeDLNetworking:
 
@@ -1891,6 +2108,14 @@ def test_clean_header(self):
             rh = self.build_handler(ydl)
             assert 'Ytdl-socks-proxy' not in rh.headers
 
+    def test_http_cache(self, tmp_path):
+        with FakeYDL({'cachedir': str(tmp_path)}) as ydl:
+            assert ydl.build_request_director([FakeRH]).cache is None
+        with FakeYDL({'cachedir': False, 'http_cache': True}) as ydl:
+            assert ydl.build_request_director([FakeRH]).cache is None
+        with FakeYDL({'cachedir': str(tmp_path), 'http_cache': True}) as ydl:
+            assert ydl.build_request_director([FakeRH]).cache.root_dir == str(tmp_path / 'http')
+
     def test_build_handler_params(self):
         with FakeYDL({
             'http_headers': {'test': 'testtest'},
@@ -1912,6 +2137,26 @@ def test_build_handler_params(self):
             assert rh.prefer_system_certs is True
             assert rh.verify is False
             assert rh.legacy_ssl_support is True
+            assert rh.pool_size == 10
+            assert rh.keep_alive is True
+            assert rh.max_idle is None
+            assert rh.dns_cache_ttl == 60
+            assert rh.happy_eyeballs is True
+
+        with FakeYDL({
+            'concurrent_fragment_downloads': 32, 'http_keep_alive': False, 'http_max_idle': 5,
+            'dns_cache_ttl': 0, 'happy_eyeballs': False,
+        }) as ydl:
+            rh = self.build_handler(ydl)
+            # Enough connections for all the threads
+            assert rh.pool_size == 32
+            assert rh.keep_alive is False
+            assert rh.max_idle == 5
+            assert rh.dns_cache_ttl == 0
+            assert rh.happy_eyeballs is False
+
+        with FakeYDL({'concurrent_fragment_downloads': 32, 'http_pool_size': 4}) as ydl:
+            assert self.build_handler(ydl).pool_size == 4
 
     @pytest.mark.parametrize('ydl_params', [
         {'client_certificate': 'fakecert.crt'},
@@ -1940,6 +2185,17 @@ def test_compat_opt_prefer_urllib(self):
             assert len(director.preferences) == 1
             assert director.preferences.pop()(UrllibRH, None)
 
+    def test_http2(self):
+        class HttpxRH(FakeRH):
+            pass
+
+        with FakeYDL({'http2': True}) as ydl:
+            director = ydl.build_request_director([UrllibRH])
+            assert len(director.preferences) == 1
+            preference = director.preferences.pop()
+            assert not preference(UrllibRH, None)
+            assert preference(HttpxRH, None) > 0
+
 
 class TestRequest:
 
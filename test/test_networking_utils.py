@@ -10,14 +10,21 @@
 
 import io
 import random
+import socket
 import ssl
+import threading
+import time
 
 from yt_dlp.cookies import YoutubeDLCookieJar
 from yt_dlp.dependencies import certifi
 from yt_dlp.networking import Response
+from yt_dlp.networking import _helper
 from yt_dlp.networking._helper import (
+    DNSCache,
     InstanceStoreMixin,
+    _interleave_address_families,
     add_accept_encoding_header,
+    create_connection,
     get_redirect_method,
     make_socks_proxy_opts,
     ssl_load_certs,
@@ -167,6 +174,150 @@ def test_mixin(self):
         assert mixin._get_instance(t=1234) != m
 
 
+def make_addrinfo(*ips, port=80):
+    return [
+        (socket.AF_INET6 if ':' in ip else socket.AF_INET, socket.SOCK_STREAM, 6, '', (ip, port))
+        for ip in ips]
+
+
+class StubResolver:
+    def __init__(self, *ips):
+        self.ips = ips
+        self.calls = 0
+
+    def __call__(self, host, port, family=0, type=0):
+        self.calls += 1
+        return make_addrinfo(*self.ips, port=port)
+
+
+class FakeSocket:
+    def __init__(self, ip):
+        self.ip = ip
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestDNSCache:
+    def test_cache(self, monkeypatch):
+        resolver = StubResolver('127.0.0.1')
+        cache = DNSCache(resolver)
+        assert cache.getaddrinfo('example.com', 80, ttl=60) == make_addrinfo('127.0.0.1')
+        assert cache.getaddrinfo('example.com', 80, ttl=60) == make_addrinfo('127.0.0.1')
+        assert resolver.calls == 1
+        # Each port is cached separately
+        assert cache.getaddrinfo('example.com', 443, ttl=60) == make_addrinfo('127.0.0.1', port=443)
+        assert resolver.calls == 2
+
+        # The host is resolved again once the addresses are older than the ttl
+        monotonic = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: monotonic + 30)
+        cache.getaddrinfo('example.com', 80, ttl=60)
+        assert resolver.calls == 2
+        cache.getaddrinfo('example.com', 80, ttl=10)
+        assert resolver.calls == 3
+
+        cache.invalidate('example.com', 80)
+        cache.getaddrinfo('example.com', 80, ttl=60)
+        assert resolver.calls == 4
+
+    def test_no_ttl(self):
+        resolver = StubResolver('127.0.0.1')
+        cache = DNSCache(resolver)
+        cache.getaddrinfo('example.com', 80, ttl=0)
+        cache.getaddrinfo('example.com', 80, ttl=0)
+        assert resolver.calls == 2
+
+    def test_max_size(self):
+        resolver = StubResolver('127.0.0.1')
+        cache = DNSCache(resolver, max_size=2)
+        for host in ('a.example.com', 'b.example.com', 'c.example.com'):
+            cache.getaddrinfo(host, 80, ttl=60)
+        cache.getaddrinfo('c.example.com', 80, ttl=60)
+        cache.getaddrinfo('b.example.com', 80, ttl=60)
+        assert resolver.calls == 3
+        # The least recently resolved host was dropped
+        cache.getaddrinfo('a.example.com', 80, ttl=60)
+        assert resolver.calls == 4
+
+
+class TestCreateConnection:
+    @pytest.fixture(autouse=True)
+    def resolver(self, monkeypatch):
+        resolver = StubResolver('::1', '::2', '127.0.0.1', '127.0.0.2')
+        monkeypatch.setattr(_helper, 'dns_cache', DNSCache(resolver))
+        return resolver
+
+    def test_interleave_address_families(self):
+        assert _interleave_address_families(make_addrinfo('::1', '::2', '::3', '127.0.0.1')) == make_addrinfo(
+            '::1', '127.0.0.1', '::2', '::3')
+        assert _interleave_address_families(make_addrinfo('127.0.0.1', '::1', '127.0.0.2')) == make_addrinfo(
+            '127.0.0.1', '::1', '127.0.0.2')
+
+    def test_sequential(self, resolver):
+        attempts = []
+
+        def connect(ip_addr, timeout, source_address):
+            attempts.append(ip_addr[4][0])
+            if ip_addr[4][0] != '127.0.0.1':
+                raise OSError('unreachable')
+            return FakeSocket(ip_addr[4][0])
+
+        sock = create_connection(('example.com', 80), _create_socket_func=connect, dns_cache_ttl=60)
+        assert sock.ip == '127.0.0.1'
+        assert attempts == ['::1', '::2', '127.0.0.1']
+        create_connection(('example.com', 80), _create_socket_func=connect, dns_cache_ttl=60)
+        assert resolver.calls == 1
+
+    def test_source_address(self):
+        def connect(ip_addr, timeout, source_address):
+            return FakeSocket(ip_addr[4][0])
+
+        sock = create_connection(
+            ('example.com', 80), source_address=('127.0.0.5', 0), _create_socket_func=connect, happy_eyeballs=True)
+        assert sock.ip == '127.0.0.1'
+
+    def test_happy_eyeballs(self):
+        release = threading.Event()
+        sockets = []
+
+        def connect(ip_addr, timeout, source_address):
+            ip = ip_addr[4][0]
+            if ip == '::2':
+                raise OSError('unreachable')
+            # The first address does not answer until another attempt has succeeded
+            if ip == '::1':
+                release.wait(5)
+            sockets.append(FakeSocket(ip))
+            return sockets[-1]
+
+        start = time.monotonic()
+        sock = create_connection(('example.com', 80), _create_socket_func=connect, happy_eyeballs=True)
+        assert time.monotonic() - start < 5
+        # The attempts alternate between IPv6 and IPv4
+        assert sock.ip == '127.0.0.1'
+        release.set()
+        for _ in range(50):
+            if len(sockets) == 2:
+                break
+            time.sleep(0.01)
+        # The socket of the attempt that succeeded later is closed
+        assert [(s.ip, s.closed) for s in sockets] == [('127.0.0.1', False), ('::1', True)]
+
+    def test_happy_eyeballs_failure(self, resolver):
+        def connect(ip_addr, timeout, source_address):
+            raise OSError(f'{ip_addr[4][0]} is unreachable')
+
+        with pytest.raises(OSError, match='is unreachable'):
+            create_connection(
+                ('example.com', 80), _create_socket_func=connect, dns_cache_ttl=60, happy_eyeballs=True)
+        # The addresses are resolved again after all of them have failed
+        with pytest.raises(OSError):
+            create_connection(('example.com', 80), _create_socket_func=connect, dns_cache_ttl=60)
+        assert resolver.calls == 2
+
+
 class TestNetworkingExceptions:
 
     @staticmethod
@@ -12,7 +12,9 @@
     join_nonempty,
     str_or_none,
 )
+from yt_dlp.utils import traversal
 from yt_dlp.utils.traversal import (
+    compile_traversal,
     find_element,
     find_elements,
     require,
@@ -440,6 +442,41 @@ def test_traversal_filter(self):
         assert traverse_obj(data, [..., filter]) == [True, 1, 1.1, 'str', {0: 0}, [1]], \
             '`filter` should filter falsy values'
 
+    def test_traversal_compile(self):
+        paths = [
+            ('urls', ..., 'url', {str}),
+            ('urls', 0, {'index': 'index', 'url': ('url', {str})}),
+            ('data', lambda _, v: v['index'] > 2, 'index'),
+            (('fail', 'str'), any),
+            ('dict', 'fail'),
+        ]
+        for path in paths:
+            for kwargs in ({}, {'default': 'default'}, {'get_all': False}, {'expected_type': int}):
+                assert compile_traversal(path, **kwargs)(_TEST_DATA) == traverse_obj(_TEST_DATA, path, **kwargs), \
+                    'compiled path should give the same result as traverse_obj'
+        get_url = compile_traversal(('urls', ..., 'url'), ('str', {str}), get_all=False)
+        assert get_url(_TEST_DATA) == 'https://www.example.com/0', \
+            'compiled paths should be tried in order'
+        assert get_url({'str': 'str'}) == 'str', \
+            'compiled paths should be reusable for other objects'
+        assert compile_traversal('fail', default='default')(None) == 'default', \
+            'compiled path should return the default'
+        assert compile_traversal(('urls', ..., 'index', {int}, all))(_TEST_DATA) == [0, 1], \
+            'compiled path should support `all`'
+
+        cached = traversal._COMPILED_TRAVERSALS
+        cached.clear()
+        traverse_obj(_TEST_DATA, ('urls', 0, 'url', {str_or_none}))
+        traverse_obj(_TEST_DATA, ('urls', 1, 'url', {str_or_none}))
+        traverse_obj(_TEST_DATA, ['urls', 1, 'url', {str_or_none}])
+        assert len(cached) == 2, 'paths with module level functions should be cached'
+        traverse_obj(_TEST_DATA, ('urls', 0, 'url', {lambda x: x}))
+        traverse_obj(_TEST_DATA, ('urls', 0, {'url': 'url'}), expected_type=lambda x: x)
+        traverse_obj(_TEST_DATA, ('urls', 0, 'url', {trim_str(start='https://')}))
+        assert len(cached) == 2, 'paths with local functions should not be cached'
+        assert traverse_obj(['a', 'b'], 1) == 'b' and traverse_obj(['a', 'b'], 1.0) is None, \
+            'keys that compare equal should be cached separately'
+
 
 class TestTraversalHelpers:
     def test_traversal_require(self):
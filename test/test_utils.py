@@ -39,6 +39,7 @@
     caesar,
     clean_html,
     clean_podcast_url,
+    compile_match_filter,
     cli_bool_option,
     cli_option,
     cli_valueless_option,
@@ -77,6 +78,7 @@
     limit_length,
     locked_file,
     lowercase_escape,
+    match_filter_func,
     match_str,
     merge_dicts,
     mimetype2ext,
@@ -789,6 +791,21 @@ def get_page(pagenum):
         testPL(5, 2, (2, 99), [2, 3, 4])
         testPL(5, 2, (20, 99), [])
 
+    def test_paged_list_known_page(self):
+        fetched = []
+
+        def get_page(pagenum):
+            fetched.append(pagenum)
+            yield from range(pagenum * 3, min(pagenum * 3 + 3, 10))
+
+        for pl in (OnDemandPagedList(get_page, 3), InAdvancePagedList(get_page, 4, 3)):
+            fetched.clear()
+            pl.stop_after_known_page(lambda x: 2 <= x < 6)
+            self.assertEqual(pl.getslice(), [0, 1, 2, 3, 4, 5])
+            self.assertEqual(fetched, [0, 1])
+            self.assertEqual(pl.getslice(7), [])
+            self.assertEqual(fetched, [0, 1])
+
     def test_read_batch_urls(self):
         f = io.StringIO('''\xef\xbb\xbf foo
             bar\r
@@ -1603,6 +1620,20 @@ def test_match_str(self):
         self.assertTrue(match_str('!x', {'id': 'foo'}, True))
         self.assertFalse(match_str('x', {'id': 'foo'}, False))
 
+    def test_compile_match_filter(self):
+        match = compile_match_filter('duration > 1:00 & title~=(?i)^foo & !is_live')
+        self.assertIs(compile_match_filter('duration > 1:00 & title~=(?i)^foo & !is_live'), match)
+        self.assertTrue(match({'duration': 61, 'title': 'Foo bar'}))
+        self.assertFalse(match({'duration': 59, 'title': 'Foo bar'}))
+        self.assertFalse(match({'duration': 61, 'title': 'Foo bar', 'is_live': True}))
+        self.assertFalse(match({'title': 'Foo bar'}))
+        self.assertTrue(match({'title': 'Foo bar'}, {'duration'}))
+        self.assertTrue(match({}, True))
+        # Invalid filters are rejected when they are compiled
+        self.assertRaises(ValueError, compile_match_filter, 'x > 1 & y <')
+        self.assertRaises(ValueError, compile_match_filter, 'x~=(')
+        self.assertRaises(ValueError, match_filter_func, 'x~=(')
+
     def test_parse_dfxp_time_expr(self):
         self.assertEqual(parse_dfxp_time_expr(None), None)
         self.assertEqual(parse_dfxp_time_expr(''), None)
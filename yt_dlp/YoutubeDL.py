@@ -1,4 +1,5 @@
 import collections
+import concurrent.futures
 import contextlib
 import copy
 import datetime as dt
@@ -24,13 +25,16 @@
 import traceback
 import unicodedata
 
+from .archive import DownloadArchive, open_download_archive
 from .cache import Cache
 from .compat import urllib  # isort: split
 from .compat import urllib_req_to_req
 from .cookies import CookieLoadError, LenientSimpleCookie, load_cookies
 from .downloader import FFmpegFD, get_suitable_downloader, shorten_protocol_name
+from .downloader.fragment import FragmentScheduler
 from .downloader.rtmp import rtmpdump_version
 from .extractor import gen_extractor_classes, get_info_extractor, import_extractors
+from .extractor._url_index import ExtractorDispatcher, get_extractor_index
 from .extractor.common import UnsupportedURLIE
 from .extractor.openload import PhantomJSwrapper
 from .globals import (
@@ -47,7 +51,8 @@
 )
 from .minicurses import format_text
 from .networking import HEADRequest, Request, RequestDirector
-from .networking.common import _REQUEST_HANDLERS, _RH_PREFERENCES
+from .networking.cache import HTTPCache
+from .networking.common import _REQUEST_HANDLERS, _RH_PREFERENCES, DEFAULT_POOL_SIZE
 from .networking.exceptions import (
     HTTPError,
     NoSupportingHandlers,
@@ -101,6 +106,7 @@
     FormatSorter,
     GeoRestrictedError,
     ISO3166Utils,
+    JSONStreamWriter,
     LazyList,
     MaxDownloadsReached,
     Namespace,
@@ -137,7 +143,6 @@
     iri_to_uri,
     is_path_like,
     join_nonempty,
-    locked_file,
     make_archive_id,
     make_parent_dirs,
     orderedSet,
@@ -170,6 +175,8 @@
     write_string,
 )
 from .utils._utils import (
+    _NUMERIC_OPERATORS,
+    _STRING_OPERATORS,
     _UnsafeExtensionError,
     _YDLLogger,
     _ProgressState,
@@ -201,6 +208,16 @@ def wrapper(self, *args, **kwargs):
     return wrapper
 
 
+class _ReplacementFormatter(string.Formatter):
+    def get_field(self, field_name, args, kwargs):
+        if field_name.isdigit():
+            return args[0], -1
+        raise ValueError('Unsupported field')
+
+
+_REPLACEMENT_FORMATTER = _ReplacementFormatter()
+
+
 class YoutubeDL:
     """YoutubeDL class.
 
@@ -249,6 +266,10 @@ class YoutubeDL:
     forcejson:         Force printing info_dict as JSON.
     dump_single_json:  Force printing the info_dict of the whole playlist
                        (or video) as a single JSON line.
+    stream_json:       Write the JSON of playlists for dump_single_json, and the
+                       updated playlist infojson if clean_infojson is disabled,
+                       incrementally as each entry is processed. To also not hold
+                       the entries in memory, use extract_flat='discard'
     force_write_download_archive: Force writing download archive regardless
                        of 'skip_download' or 'simulate'.
     simulate:          Do not download the video files. If unset (or None),
@@ -275,6 +296,10 @@ class YoutubeDL:
                        Can be True (check all), False (check none),
                        'selected' (check selected formats),
                        or None (check only if requested by extractor)
+    concurrent_format_checks: Number of formats to test in parallel when
+                       checking formats. The formats that are served over
+                       HTTP are probed with a ranged request, and the first
+                       working format in the selection order is still chosen
     paths:             Dictionary of output paths. The allowed keys are 'home'
                        'temp' and the keys of OUTTMPL_TYPES (in utils/_utils.py)
     outtmpl:           Dictionary of templates for output names. Allowed keys
@@ -298,6 +323,17 @@ class YoutubeDL:
     playlist_items:    Specific indices of playlist to download.
     playlistrandom:    Download playlist items in random order.
     lazy_playlist:     Process playlist entries as they are received.
+    incremental_playlist: Stop fetching the pages of a playlist after the first
+                       page whose entries are all in the download archive, or,
+                       without an archive, were all processed the last time the
+                       playlist was downloaded. For paged playlists that list
+                       their newest entries first
+    concurrent_extractions: Number of playlist entries to extract in parallel.
+                       The entries are still processed and downloaded in order.
+                       Each thread has its own instances of the extractors, which
+                       copy the state of the initialized (logged in) extractors of
+                       this instance. State that the extractors build up later,
+                       e.g. caches and rate limits, is not shared
     matchtitle:        Download only matching titles.
     rejecttitle:       Reject downloads for matching titles.
     logger:            A class having a `debug`, `warning` and `error` function where
@@ -333,6 +369,18 @@ class YoutubeDL:
     skip_download:     Skip the actual download of the video file
     cachedir:          Location of the cache files in the filesystem.
                        False to disable filesystem cache.
+    cache_backend:     How to store the cache in cachedir. One of 'file' (default),
+                       one JSON file per entry, or 'sqlite', a single database file
+    cache_ttl:         Maximum age of cache entries in seconds. Can also be a dict
+                       of section names (or 'default') to their maximum age
+    cache_max_size:    Approximate maximum size of the cache in bytes.
+                       The oldest entries are removed when it grows larger
+    http_cache:        Store the responses to the webpage and API requests of the
+                       extractors in the "http" directory of cachedir, and reuse
+                       them according to their caching headers
+    http_cache_ttl:    Seconds for which cached responses are reused without
+                       checking their caching headers. Can also be a dict of
+                       extractor keys (or 'default') to their TTL
     noplaylist:        Download single video instead of a playlist if in doubt.
     age_limit:         An integer representing the user's age in years.
                        Unsuitable videos for the given age are skipped.
@@ -345,8 +393,10 @@ class YoutubeDL:
                        downloaded.
                        Videos without view count information are always
                        downloaded. None for no limit.
-    download_archive:  A set, or the name of a file where all downloads are recorded.
-                       Videos already present in the file are not downloaded again.
+    download_archive:  A set, a yt_dlp.archive.DownloadArchive, or the name of a file
+                       where all downloads are recorded. Videos already present in
+                       the file are not downloaded again. SQLite databases (and new
+                       files ending in .sqlite/.sqlite3) are opened as indexed archives
     break_on_existing: Stop the download process after attempting to download a
                        file that is in the archive.
     break_per_url:     Whether break_on_reject and break_on_existing
@@ -371,6 +421,16 @@ class YoutubeDL:
     geo_verification_proxy:  URL of the proxy to use for IP address verification
                        on geo-restricted sites.
     socket_timeout:    Time to wait for unresponsive hosts, in seconds
+    http_pool_size:    Maximum number of idle connections to keep open to each host.
+                       By default, enough for concurrent_fragment_downloads and http_connections
+    http_keep_alive:   Whether to reuse connections for later requests (default: True)
+    http_max_idle:     Seconds after which an idle connection is closed instead of being reused
+    http2:             Prefer the HTTP/2 request handler, which multiplexes concurrent
+                       requests to the same host over a single connection
+    dns_cache_ttl:     Seconds for which the resolved addresses of a host are reused
+                       by new connections (default: 60). 0 to disable the DNS cache
+    happy_eyeballs:    Connect to the IPv6 and IPv4 addresses of a host concurrently,
+                       as described in RFC 8305 (default: True)
     bidi_workaround:   Work around buggy terminals without bidirectional text
                        support, using fridibi
     debug_printtraffic:Print out sent and received HTTP traffic
@@ -517,8 +577,9 @@ class YoutubeDL:
     the downloader (see yt_dlp/downloader/common.py):
     nopart, updatetime, buffersize, ratelimit, throttledratelimit, min_filesize,
     max_filesize, test, noresizebuffer, retries, file_access_retries, fragment_retries,
-    continuedl, hls_use_mpegts, http_chunk_size, external_downloader_args,
-    concurrent_fragment_downloads, progress_delta.
+    continuedl, hls_use_mpegts, http_chunk_size, http_connections, preallocate,
+    external_downloader_args, concurrent_fragment_downloads,
+    concurrent_fragments_per_host, fragment_buffer_size, progress_delta.
 
     The following options are used by the post processors:
     ffmpeg_location:   Location of the ffmpeg binary; either the path
@@ -596,6 +657,7 @@ class YoutubeDL:
     no_overwrites:     Same as `overwrites=False`
     """
 
+    _FORMAT_PROBE_SIZE = 1024
     _NUMERIC_FIELDS = {
         'width', 'height', 'asr', 'audio_channels', 'fps',
         'tbr', 'abr', 'vbr', 'filesize', 'filesize_approx',
@@ -641,6 +703,8 @@ def __init__(self, params=None, auto_init=True):
         self.params = params
         self._ies = {}
         self._ies_instances = {}
+        self._ie_dispatcher = None
+        self._linear_url_lookups = 0
         self._pps = {k: [] for k in POSTPROCESS_WHEN}
         self._printed_messages = set()
         self._first_webpage_request = True
@@ -653,6 +717,9 @@ def __init__(self, params=None, auto_init=True):
         self._num_videos = 0
         self._playlist_level = 0
         self._playlist_urls = set()
+        self._prefetched_extractions = {}
+        self._format_probes = {}
+        self._json_streams = []
         self.cache = Cache(self)
         self.__header_cookies = []
 
@@ -771,6 +838,11 @@ def check_deprecated(param, option, suggestion):
                     f'Use --list-impersonate-targets to see available targets. '
                     f'You may be missing dependencies required to support this target.')
 
+        if self.params.get('cache_backend') not in (None, *Cache.BACKENDS):
+            raise YoutubeDLError(
+                f'Invalid cache_backend {self.params["cache_backend"]!r}. '
+                f'Must be one of {", ".join(map(repr, Cache.BACKENDS))}')
+
         if 'list-formats' in self.params['compat_opts']:
             self.params['listformats_table'] = False
 
@@ -842,20 +914,13 @@ def check_deprecated(param, option, suggestion):
 
         def preload_download_archive(fn):
             """Preload the archive, if any is specified"""
-            archive = set()
             if fn is None:
-                return archive
+                return set()
             elif not is_path_like(fn):
                 return fn
 
-            self.write_debug(f'Loading archive file {fn!r}')
-            try:
-                with locked_file(fn, 'r', encoding='utf-8') as archive_file:
-                    for line in archive_file:
-                        archive.add(line.strip())
-            except OSError as ioe:
-                if ioe.errno != errno.ENOENT:
-                    raise
+            archive = open_download_archive(fn)
+            self.write_debug(f'Loading archive file {fn!r} using {type(archive).__name__}')
             return archive
 
         self.archive = preload_download_archive(self.params.get('download_archive'))
@@ -909,6 +974,7 @@ def add_info_extractor(self, ie):
         """Add an InfoExtractor object to the end of the list."""
         ie_key = ie.ie_key()
         self._ies[ie_key] = ie
+        self._ie_dispatcher = None
         if not isinstance(ie, type):
             self._ies_instances[ie_key] = ie
             ie.set_downloader(self)
@@ -925,6 +991,19 @@ def get_info_extractor(self, ie_key):
             self.add_info_extractor(ie)
         return ie
 
+    # Without a pregenerated index, building one only pays off after this many lookups
+    _BUILD_URL_INDEX_AFTER = 500
+
+    def _candidate_ies(self, url):
+        """Return the (ie_key, ie) pairs of the extractors that may be suitable for the URL, in order"""
+        if self._ie_dispatcher is None:
+            self._linear_url_lookups += 1
+            index = get_extractor_index(build=self._linear_url_lookups > self._BUILD_URL_INDEX_AFTER)
+            if index is None:
+                return self._ies.items()
+            self._ie_dispatcher = ExtractorDispatcher(self._ies, index)
+        return [(ie_key, self._ies[ie_key]) for ie_key in self._ie_dispatcher.candidates(url)]
+
     def add_default_info_extractors(self):
         """
         Add the InfoExtractors returned by gen_extractors to the end of the list
@@ -1062,9 +1141,24 @@ def __exit__(self, *args):
 
     def close(self):
         self.save_cookies()
+        if isinstance(self.archive, DownloadArchive):
+            self.archive.close()
         if '_request_director' in self.__dict__:
+            if self.params.get('verbose'):
+                self._write_connection_stats()
             self._request_director.close()
             del self._request_director
+        if '_fragment_scheduler' in self.__dict__:
+            self._fragment_scheduler.shutdown()
+            del self._fragment_scheduler
+        if '_extraction_pool' in self.__dict__:
+            self._extraction_pool.shutdown()
+            del self._extraction_pool
+        if '_format_check_pool' in self.__dict__:
+            self._format_check_pool.shutdown(cancel_futures=True)
+            del self._format_check_pool
+            self._format_probes.clear()
+        self.cache.close()
 
         for close_hook in self._close_hooks:
             close_hook()
@@ -1265,32 +1359,13 @@ def _copy_infodict(info_dict):
         info_dict.pop('__pending_error', None)
         return info_dict
 
-    def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False, *, _exec=False):
-        """ Make the outtmpl and info_dict suitable for substitution: ydl.escape_outtmpl(outtmpl) % info_dict
-        @param sanitize    Whether to sanitize the output as a filename
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _compile_outtmpl(outtmpl):
+        """ Parse the fields of an output template once, for prepare_outtmpl
+        @returns    The parts of the template, which are either literal strings or dicts describing the fields,
+                    and the names of the top level fields used by the template, or None if it uses the whole info_dict
         """
-
-        info_dict.setdefault('epoch', int(time.time()))  # keep epoch consistent once set
-
-        info_dict = self._copy_infodict(info_dict)
-        info_dict['duration_string'] = (  # %(duration>%H-%M-%S)s is wrong if duration > 24hrs
-            formatSeconds(info_dict['duration'], '-' if sanitize else ':')
-            if info_dict.get('duration', None) is not None
-            else None)
-        info_dict['autonumber'] = int(self.params.get('autonumber_start', 1) - 1 + self._num_downloads)
-        info_dict['video_autonumber'] = self._num_videos
-        if info_dict.get('resolution') is None:
-            info_dict['resolution'] = self.format_resolution(info_dict, default=None)
-
-        # For fields playlist_index, playlist_autonumber and autonumber convert all occurrences
-        # of %(field)s to %(field)0Nd for backward compatibility
-        field_size_compat_map = {
-            'playlist_index': len(str(info_dict.get('__last_playlist_index') or 0)),
-            'playlist_autonumber': len(str(info_dict.get('n_entries') or 0)),
-            'autonumber': self.params.get('autonumber_size') or 5,
-        }
-
-        TMPL_DICT = {}
         EXTERNAL_FORMAT_RE = re.compile(STR_FORMAT_RE_TMPL.format('[^)]*', f'[{STR_FORMAT_TYPES}ljhqBUDS]'))
         MATH_FUNCTIONS = {
             '+': float.__add__,
@@ -1316,9 +1391,8 @@ def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False, *, _exec=False):
                 (?:&(?P<replacement>.*?))?
                 (?:\|(?P<default>.*?))?
             )$''')
-        SAFE_EXEC_CONVERSIONS = 'difq'
-        UNSAFE_DEFAULT_CHARS = '"\' \n\t;&|^$%*<>{}()[]`#\\'
-        EXEC_ADVISORY_MSG = 'See  https://github.com/yt-dlp/yt-dlp/security/advisories/GHSA-69qj-pvh9-c5wg  for details'
+
+        top_level_keys = set()
 
         def _from_user_input(field):
             if field == ':':
@@ -1329,7 +1403,8 @@ def _from_user_input(field):
                 return int(field)
             return field
 
-        def _traverse_infodict(fields):
+        def _parse_path(fields):
+            nonlocal top_level_keys
             fields = [f for x in re.split(r'\.({.+?})\.?', fields)
                       for f in ([x] if x.startswith('{') else x.split('.'))]
             for i in (0, -1):
@@ -1343,41 +1418,137 @@ def _traverse_infodict(fields):
                 assert f.endswith('}'), f'No closing brace for {f} in {fields}'
                 fields[i] = {k: list(map(_from_user_input, k.split('.'))) for k in f[1:-1].split(',')}
 
-            return traverse_obj(info_dict, fields, traverse_string=True)
+            if top_level_keys is not None:
+                if fields and isinstance(fields[0], str):
+                    top_level_keys.add(fields[0])
+                else:
+                    top_level_keys = None
+            return fields
+
+        def _parse_maths(offset_key):
+            maths, operator = [], None
+            while offset_key:
+                item = re.match(
+                    MATH_FIELD_RE if operator else MATH_OPERATORS_RE,
+                    offset_key).group(0)
+                offset_key = offset_key[len(item):]
+                if operator is None:
+                    operator = MATH_FUNCTIONS[item]
+                    continue
+                item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
+                offset = float_or_none(item)
+                maths.append((operator, offset, None if offset is not None else _parse_path(item), multiplier))
+                operator = None
+            return maths
+
+        def _parse_field(key):
+            alternatives = []
+            mobj = re.match(INTERNAL_FORMAT_RE, key)
+            while mobj:
+                mobj = mobj.groupdict()
+                path = _parse_path(mobj['fields'])
+                alternatives.append({
+                    'path': path,
+                    # The value of a top level field can be looked up directly
+                    'key': path[0] if len(path) == 1 and isinstance(path[0], str) else None,
+                    'negate': mobj['negate'],
+                    'maths': _parse_maths(mobj['maths']),
+                    'strf_format': mobj['strf_format'] and mobj['strf_format'].replace('\\,', ','),
+                    'fields': mobj['fields'],
+                    'replacement': mobj['replacement'],
+                    'default': mobj['default'],
+                })
+                if not mobj['alternate']:
+                    break
+                mobj = re.match(INTERNAL_FORMAT_RE, mobj['remaining'][1:])
+            return alternatives
+
+        parts, last_end = [], 0
+        for outer_mobj in EXTERNAL_FORMAT_RE.finditer(outtmpl):
+            if not outer_mobj.group('has_key'):
+                continue
+            parts.append(outtmpl[last_end:outer_mobj.start()])
+            last_end = outer_mobj.end()
+            key = outer_mobj.group('key')
+            parts.append({
+                'prefix': outer_mobj.group('prefix'),
+                'format': outer_mobj.group('format'),
+                'conversion': outer_mobj.group('conversion') or '',
+                'alternatives': _parse_field(key),
+                'tmpl_key': '{}\0{}'.format(key.replace('%', '%\0'), outer_mobj.group('format')),
+            })
+        parts.append(outtmpl[last_end:])
+        return tuple(parts), top_level_keys and frozenset(top_level_keys)
+
+    def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False, *, _exec=False):
+        """ Make the outtmpl and info_dict suitable for substitution: ydl.escape_outtmpl(outtmpl) % info_dict
+        @param sanitize    Whether to sanitize the output as a filename
+        """
+
+        info_dict.setdefault('epoch', int(time.time()))  # keep epoch consistent once set
+
+        parts, top_level_keys = self._compile_outtmpl(outtmpl)
+        if top_level_keys is None:
+            tmpl_info = self._copy_infodict(info_dict)
+        else:
+            # Only the fields that are used by the template need to be copied
+            tmpl_info = {
+                key: info_dict[key] for key in top_level_keys
+                if key in info_dict and key not in ('__postprocessors', '__pending_error')}
+        if top_level_keys is None or 'duration_string' in top_level_keys:
+            tmpl_info['duration_string'] = (  # %(duration>%H-%M-%S)s is wrong if duration > 24hrs
+                formatSeconds(info_dict['duration'], '-' if sanitize else ':')
+                if info_dict.get('duration', None) is not None
+                else None)
+        if top_level_keys is None or 'autonumber' in top_level_keys:
+            tmpl_info['autonumber'] = int(self.params.get('autonumber_start', 1) - 1 + self._num_downloads)
+        if top_level_keys is None or 'video_autonumber' in top_level_keys:
+            tmpl_info['video_autonumber'] = self._num_videos
+        if (top_level_keys is None or 'resolution' in top_level_keys) and info_dict.get('resolution') is None:
+            tmpl_info['resolution'] = self.format_resolution(info_dict, default=None)
+
+        # For fields playlist_index, playlist_autonumber and autonumber convert all occurrences
+        # of %(field)s to %(field)0Nd for backward compatibility
+        field_size_compat_map = {
+            'playlist_index': lambda: len(str(info_dict.get('__last_playlist_index') or 0)),
+            'playlist_autonumber': lambda: len(str(info_dict.get('n_entries') or 0)),
+            'autonumber': lambda: self.params.get('autonumber_size') or 5,
+        }
 
-        def get_value(mdict):
+        TMPL_DICT = {}
+        SAFE_EXEC_CONVERSIONS = 'difq'
+        UNSAFE_DEFAULT_CHARS = '"\' \n\t;&|^$%*<>{}()[]`#\\'
+        EXEC_ADVISORY_MSG = 'See  https://github.com/yt-dlp/yt-dlp/security/advisories/GHSA-69qj-pvh9-c5wg  for details'
+
+        def _traverse_infodict(path):
+            return traverse_obj(tmpl_info, path, traverse_string=True)
+
+        def get_value(alternative):
             # Object traversal
-            value = _traverse_infodict(mdict['fields'])
+            if alternative['key'] is None:
+                value = _traverse_infodict(alternative['path'])
+            else:
+                value = tmpl_info.get(alternative['key'])
+                if value in (None, {}):
+                    value = None
             # Negative
-            if mdict['negate']:
+            if alternative['negate']:
                 value = float_or_none(value)
                 if value is not None:
                     value *= -1
             # Do maths
-            offset_key = mdict['maths']
-            if offset_key:
+            if alternative['maths']:
                 value = float_or_none(value)
-                operator = None
-                while offset_key:
-                    item = re.match(
-                        MATH_FIELD_RE if operator else MATH_OPERATORS_RE,
-                        offset_key).group(0)
-                    offset_key = offset_key[len(item):]
-                    if operator is None:
-                        operator = MATH_FUNCTIONS[item]
-                        continue
-                    item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
-                    offset = float_or_none(item)
+                for operator, offset, offset_path, multiplier in alternative['maths']:
                     if offset is None:
-                        offset = float_or_none(_traverse_infodict(item))
+                        offset = float_or_none(_traverse_infodict(offset_path))
                     try:
                         value = operator(value, multiplier * offset)
                     except (TypeError, ZeroDivisionError):
                         return None
-                    operator = None
             # Datetime formatting
-            if mdict['strf_format']:
-                value = strftime_or_none(value, mdict['strf_format'].replace('\\,', ','))
+            if alternative['strf_format']:
+                value = strftime_or_none(value, alternative['strf_format'])
 
             # XXX: Workaround for https://github.com/yt-dlp/yt-dlp/issues/4485
             if sanitize and value == '':
@@ -1409,39 +1580,24 @@ def _dumpjson_default(obj):
                 return list(obj)
             return repr(obj)
 
-        class _ReplacementFormatter(string.Formatter):
-            def get_field(self, field_name, args, kwargs):
-                if field_name.isdigit():
-                    return args[0], -1
-                raise ValueError('Unsupported field')
-
-        replacement_formatter = _ReplacementFormatter()
-
-        def create_key(outer_mobj):
-            if not outer_mobj.group('has_key'):
-                return outer_mobj.group(0)
-            key = outer_mobj.group('key')
-            mobj = re.match(INTERNAL_FORMAT_RE, key)
+        def create_key(field):
             value, replacement, default, last_field = None, None, na, ''
-            while mobj:
-                mobj = mobj.groupdict()
-                default = mobj['default'] if mobj['default'] is not None else default
-                value = get_value(mobj)
-                last_field, replacement = mobj['fields'], mobj['replacement']
-                if value is None and mobj['alternate']:
-                    mobj = re.match(INTERNAL_FORMAT_RE, mobj['remaining'][1:])
-                else:
+            for alternative in field['alternatives']:
+                default = alternative['default'] if alternative['default'] is not None else default
+                value = get_value(alternative)
+                last_field, replacement = alternative['fields'], alternative['replacement']
+                if value is not None:
                     break
 
             if None not in (value, replacement):
                 try:
-                    value = replacement_formatter.format(replacement, value)
+                    value = _REPLACEMENT_FORMATTER.format(replacement, value)
                 except ValueError:
                     value, default = None, na
 
-            fmt = outer_mobj.group('format')
+            fmt = field['format']
             if fmt == 's' and last_field in field_size_compat_map and isinstance(value, int):
-                fmt = f'0{field_size_compat_map[last_field]:d}d'
+                fmt = f'0{field_size_compat_map[last_field]():d}d'
 
             # Validate safety of exec commands
             if _exec:
@@ -1462,7 +1618,7 @@ def create_key(outer_mobj):
                             f'Conversions are not applied to --exec command template defaults, '
                             f'e.g. %(...|DEFAULT;)q. {EXEC_ADVISORY_MSG}')
 
-            flags = outer_mobj.group('conversion') or ''
+            flags = field['conversion']
             str_fmt = f'{fmt[:-1]}s'
             if value is None:
                 value, fmt = default, 's'
@@ -1512,11 +1668,10 @@ def create_key(outer_mobj):
                 if fmt[-1] in 'csra':
                     value = sanitize(last_field, value)
 
-            key = '{}\0{}'.format(key.replace('%', '%\0'), outer_mobj.group('format'))
-            TMPL_DICT[key] = value
-            return '{prefix}%({key}){fmt}'.format(key=key, fmt=fmt, prefix=outer_mobj.group('prefix'))
+            TMPL_DICT[field['tmpl_key']] = value
+            return '{prefix}%({key}){fmt}'.format(key=field['tmpl_key'], fmt=fmt, prefix=field['prefix'])
 
-        return EXTERNAL_FORMAT_RE.sub(create_key, outtmpl), TMPL_DICT
+        return ''.join(part if isinstance(part, str) else create_key(part) for part in parts), TMPL_DICT
 
     def evaluate_outtmpl(self, outtmpl, info_dict, *args, **kwargs):
         outtmpl, info_dict = self.prepare_outtmpl(outtmpl, info_dict, *args, **kwargs)
@@ -1698,11 +1853,11 @@ def extract_info(self, url, download=True, ie_key=None, extra_info=None,
             ie_key = 'Generic'
 
         if ie_key:
-            ies = {ie_key: self._ies[ie_key]} if ie_key in self._ies else {}
+            ies = [(ie_key, self._ies[ie_key])] if ie_key in self._ies else []
         else:
-            ies = self._ies
+            ies = self._candidate_ies(url)
 
-        for key, ie in ies.items():
+        for key, ie in ies:
             if not ie.suitable(url):
                 continue
 
@@ -1862,8 +2017,9 @@ def _apply_header_cookies(self, url, cookies=None):
     def __extract_info(self, url, ie, download, extra_info, process):
         self._apply_header_cookies(url)
 
+        prefetched = self._prefetched_extractions.pop((url, ie.ie_key()), None)
         try:
-            ie_result = ie.extract(url)
+            ie_result = prefetched.result() if prefetched else ie.extract(url)
         except UserNotLive as e:
             if process:
                 if self.params.get('wait_for_video'):
@@ -2015,6 +2171,7 @@ def process_ie_result(self, ie_result, download=True, extra_info=None):
             try:
                 return self.__process_playlist(ie_result, download)
             finally:
+                self._abort_json_streams()
                 self._playlist_level -= 1
                 if not self._playlist_level:
                     self._playlist_urls.clear()
@@ -2088,6 +2245,7 @@ def __process_playlist(self, ie_result, download):
             return
         self.to_screen(f'[download] Downloading {ie_result["_type"]}: {title}')
 
+        known_ids = self._setup_incremental_playlist(ie_result)
         all_entries = PlaylistEntries(self, ie_result)
         entries = orderedSet(all_entries.get_requested_items(), lazy=True)
 
@@ -2138,6 +2296,12 @@ def __process_playlist(self, ie_result, download):
         if keep_resolved_entries:
             self.write_debug('The information of all playlist entries will be held in memory')
 
+        stream_infojson = self._start_json_streams(ie_result, ie_copy, _infojson_written)
+
+        concurrent_extractions = self.params.get('concurrent_extractions') or 1
+        if concurrent_extractions > 1 and self.params.get('extract_flat') not in (True, 'in_playlist'):
+            entries = self._prefetch_entries(entries, concurrent_extractions)
+
         failures = 0
         max_failures = self.params.get('skip_playlist_after_errors') or float('inf')
         for i, (playlist_index, entry) in enumerate(entries):
@@ -2160,18 +2324,26 @@ def __process_playlist(self, ie_result, download):
             if self._match_entry(entry_copy, incomplete=True) is not None:
                 # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
                 resolved_entries[i] = (playlist_index, NO_DEFAULT)
+                if known_ids is not None and entry.get('id'):
+                    known_ids.add(entry['id'])
                 continue
 
             self.to_screen(
                 f'[download] Downloading item {self._format_screen(i + 1, self.Styles.ID)} '
                 f'of {self._format_screen(n_entries, self.Styles.EMPHASIS)}')
 
+            streamed_count = self._json_streams and self._json_streams[0][0].count
             entry_result = self.__process_iterable_entry(entry, download, collections.ChainMap({
                 'playlist_index': playlist_index,
                 'playlist_autonumber': i + 1,
             }, extra))
+            # Nested playlists are streamed as they are processed
+            if self._json_streams and self._json_streams[0][0].count == streamed_count:
+                self._stream_json_entry(entry_result)
             if not entry_result:
                 failures += 1
+            elif known_ids is not None and entry.get('id'):
+                known_ids.add(entry['id'])
             if failures >= max_failures:
                 self.report_error(
                     f'Skipping the remaining entries in playlist "{title}" since {failures} items failed extraction')
@@ -2179,6 +2351,9 @@ def __process_playlist(self, ie_result, download):
             if keep_resolved_entries:
                 resolved_entries[i] = (playlist_index, entry_result)
 
+        if known_ids is not None:
+            self.cache.store('incremental_playlist', self._incremental_playlist_key(ie_result), sorted(known_ids))
+
         # Update with processed data
         ie_result['entries'] = [e for _, e in resolved_entries if e is not NO_DEFAULT]
         ie_result['requested_entries'] = [i for i, e in resolved_entries if e is not NO_DEFAULT]
@@ -2187,15 +2362,155 @@ def __process_playlist(self, ie_result, download):
             ie_result.pop('requested_entries')
 
         # Write the updated info to json
-        if _infojson_written is True and self._write_info_json(
+        if _infojson_written is True and not stream_infojson and self._write_info_json(
                 'updated playlist', ie_result,
                 self.prepare_filename(ie_copy, 'pl_infojson'), overwrite=True) is None:
             return
 
         ie_result = self.run_all_pps('playlist', ie_result)
+        self._end_json_streams(ie_result)
         self.to_screen(f'[download] Finished downloading playlist: {title}')
         return ie_result
 
+    @staticmethod
+    def _incremental_playlist_key(ie_result):
+        return f'{ie_result["extractor_key"]}_{ie_result["id"]}'
+
+    def _setup_incremental_playlist(self, ie_result):
+        """Stop paging the playlist after the first page whose entries were all processed before
+
+        The entries are known from the download archive, or else from the IDs of the entries
+        that were processed the last time the playlist was downloaded, which are kept in the cache.
+        Returns the set to add the IDs of the processed entries to, if they are to be cached"""
+        entries = ie_result.get('entries')
+        if not self.params.get('incremental_playlist') or not isinstance(entries, PagedList):
+            return None
+        if self.archive:
+            entries.stop_after_known_page(lambda entry: isinstance(entry, dict) and self.in_download_archive(entry))
+            return None
+        if not self.cache.enabled or not ie_result.get('id'):
+            return None
+        known_ids = frozenset(self.cache.load(
+            'incremental_playlist', self._incremental_playlist_key(ie_result), default=None) or ())
+        entries.stop_after_known_page(lambda entry: isinstance(entry, dict) and entry.get('id') in known_ids)
+        return set(known_ids)
+
+    def _start_json_streams(self, ie_result, ie_copy, infojson_written):
+        """Start writing the playlist to the JSON streams, opening the ones of this playlist
+
+        Returns whether the updated playlist infojson is streamed"""
+        if not self.params.get('stream_json'):
+            return False
+
+        if self.params.get('dump_single_json') and self._playlist_level == 1:
+            out = self._out_files.out
+            self._json_streams.append((
+                JSONStreamWriter(lambda s: self._write_string(s, out)),
+                self._playlist_level, lambda completed: self._write_string('\n', out)))
+
+        stream_infojson = infojson_written is True and not self.params.get('clean_infojson', True)
+        if stream_infojson:
+            infofn = self.prepare_filename(ie_copy, 'pl_infojson')
+            tempfn = f'{infofn}.tmp'
+            try:
+                infofile = open(tempfn, 'w', encoding='utf-8')
+            except OSError:
+                self.report_error(f'Cannot write updated playlist metadata to JSON file {tempfn}')
+                return True
+
+            def finish(completed):
+                infofile.close()
+                if completed:
+                    self.to_screen(f'[info] Writing updated playlist metadata as JSON to: {infofn}')
+                    os.replace(tempfn, infofn)
+                else:
+                    os.remove(tempfn)
+
+            self._json_streams.append((
+                JSONStreamWriter(infofile.write, ensure_ascii=False), self._playlist_level, finish))
+
+        # The requested entries are only final after the playlist has been processed
+        info = {k: v for k, v in ie_result.items() if k not in ('entries', 'requested_entries')}
+        for writer, _, _ in self._json_streams:
+            writer.start(self._sanitize_info_values(info) if writer.depth else self.sanitize_info(dict(info)))
+        return stream_infojson
+
+    def _stream_json_entry(self, entry):
+        self.post_extract(entry)
+        entry = self._sanitize_info_values(entry)
+        for writer, _, _ in self._json_streams:
+            writer.add(entry)
+
+    def _end_json_streams(self, ie_result=None):
+        """Finish writing the current playlist to the JSON streams, closing the ones of this playlist
+
+        ie_result is None if the playlist was not completed"""
+        info = ie_result and {k: v for k, v in ie_result.items() if k != 'entries'}
+        for writer, _, _ in self._json_streams:
+            if info:
+                writer.end(self._sanitize_info_values(info) if writer.depth > 1 else self.sanitize_info(dict(info)))
+            else:
+                writer.end()
+        for stream in [stream for stream in self._json_streams if not stream[0].depth]:
+            self._json_streams.remove(stream)
+            stream[2](ie_result is not None)
+
+    def _abort_json_streams(self):
+        """Close the current playlist in the JSON streams, if it was left unfinished by an error"""
+        if self._json_streams:
+            writer, level, _ = self._json_streams[0]
+            if writer.depth > self._playlist_level - level:
+                self._end_json_streams()
+
+    def _prefetch_entries(self, entries, lookahead):
+        """Yield the playlist entries, while extracting the next `lookahead` of them in the background
+
+        The results are picked up by __extract_info when the entries are processed
+        """
+        pending = collections.deque()
+        try:
+            for item in entries:
+                pending.append((item, self._prefetch_entry(item[1])))
+                if len(pending) > lookahead:
+                    item, key = pending.popleft()
+                    yield item
+                    self._discard_prefetched(key)
+            while pending:
+                item, key = pending.popleft()
+                yield item
+                self._discard_prefetched(key)
+        finally:
+            for _, key in pending:
+                self._discard_prefetched(key)
+
+    def _prefetch_entry(self, entry):
+        """Start extracting an unresolved entry and return its key in _prefetched_extractions"""
+        if not isinstance(entry, dict) or entry.get('_type') not in ('url', 'url_transparent'):
+            return None
+        # Same as in process_ie_result
+        url = entry['url'] = sanitize_url(
+            entry['url'], scheme='http' if self.params.get('prefer_insecure') else 'https')
+        ie_key = entry.get('ie_key')
+        ies = [(ie_key, self._ies[ie_key])] if ie_key in self._ies else self._candidate_ies(url)
+        ie_key, ie = next(((key, ie) for key, ie in ies if ie.suitable(url)), (None, None))
+        if not ie:
+            return None
+        # Entries that are already in the archive are not extracted
+        temp_id = ie.get_temp_id(url)
+        if temp_id is not None and self.in_download_archive({'id': temp_id, 'ie_key': ie_key}):
+            return None
+        key = (url, ie_key)
+        if key not in self._prefetched_extractions:
+            self._apply_header_cookies(url)
+            self._prefetched_extractions[key] = self._extraction_pool.submit(url, ie_key)
+        return key
+
+    def _discard_prefetched(self, key):
+        """Discard the extraction of an entry that was skipped"""
+        future = self._prefetched_extractions.pop(key, None)
+        if future:
+            future.cancel()
+
     @_handle_extraction_exceptions
     def __process_iterable_entry(self, entry, download, extra_info):
         return self.process_ie_result(
@@ -2205,11 +2520,7 @@ def _build_format_filter(self, filter_spec):
         " Returns a function to filter the formats according to the filter_spec "
 
         OPERATORS = {
-            '<': operator.lt,
-            '<=': operator.le,
-            '>': operator.gt,
-            '>=': operator.ge,
-            '=': operator.eq,
+            **_NUMERIC_OPERATORS,
             '!=': operator.ne,
         }
         operator_rex = re.compile(r'''(?x)\s*
@@ -2234,10 +2545,7 @@ def _build_format_filter(self, filter_spec):
         if not m:
             STR_OPERATORS = {
                 '=': operator.eq,
-                '^=': lambda attr, value: attr.startswith(value),
-                '$=': lambda attr, value: attr.endswith(value),
-                '*=': lambda attr, value: value in attr,
-                '~=': lambda attr, value: value.search(attr) is not None,
+                **_STRING_OPERATORS,
             }
             str_operator_rex = re.compile(r'''(?x)\s*
                 (?P<key>[a-zA-Z0-9._-]+)\s*
@@ -2269,43 +2577,101 @@ def _filter(f):
         return _filter
 
     def _check_formats(self, formats, warning=True):
-        for f in formats:
-            working = f.get('__working')
-            if working is not None:
-                if working:
+        """Yield the formats that can be downloaded, in order
+
+        Formats that are served over plain HTTP are probed with a ranged request instead of a test download.
+        The next `concurrent_format_checks` of them are probed in the background
+        while the previous formats are being checked
+        """
+        lookahead = self.params.get('concurrent_format_checks') or 1
+        formats, pending = iter(formats), collections.deque()
+        try:
+            while True:
+                for f in itertools.islice(formats, lookahead - len(pending)):
+                    pending.append((f, self._submit_format_probe(f)))
+                if not pending:
+                    break
+                f, probe = pending.popleft()
+                if self._check_format(f, probe, warning):
                     yield f
-                continue
-            self.to_screen('[info] Testing format {}'.format(f['format_id']))
-            path = self.get_output_path('temp')
-            if not self._ensure_dir_exists(f'{path}/'):
-                continue
-            temp_file = tempfile.NamedTemporaryFile(suffix='.tmp', delete=False, dir=path or None)
-            temp_file.close()
-            # If FragmentFD fails when testing a fragment, it will wrongly set a non-zero return code.
-            # Save the actual return code for later. See https://github.com/yt-dlp/yt-dlp/issues/13750
-            original_retcode = self._download_retcode
-            try:
-                success, _ = self.dl(temp_file.name, f, test=True)
-            except (DownloadError, OSError, ValueError, *network_exceptions):
-                success = False
-            finally:
-                if os.path.exists(temp_file.name):
-                    try:
-                        os.remove(temp_file.name)
-                    except OSError:
-                        self.report_warning(f'Unable to delete temporary file "{temp_file.name}"')
-            # Restore the actual return code
-            self._download_retcode = original_retcode
-            f['__working'] = success
-            if success:
-                f.pop('__needs_testing', None)
-                yield f
+        finally:
+            for _, probe in pending:
+                if probe:
+                    probe.cancel()
+
+    def _check_format(self, f, probe=None, warning=True):
+        working = f.get('__working')
+        if working is not None:
+            return working
+        self.to_screen('[info] Testing format {}'.format(f['format_id']))
+        if probe:
+            success = probe.result()
+        else:
+            success = self._test_download_format(f)
+        f['__working'] = success
+        if success:
+            f.pop('__needs_testing', None)
+        else:
+            msg = f'Unable to download format {f["format_id"]}. Skipping...'
+            if warning:
+                self.report_warning(msg)
             else:
-                msg = f'Unable to download format {f["format_id"]}. Skipping...'
-                if warning:
-                    self.report_warning(msg)
-                else:
-                    self.to_screen(f'[info] {msg}')
+                self.to_screen(f'[info] {msg}')
+        return success
+
+    def _test_download_format(self, f):
+        path = self.get_output_path('temp')
+        if not self._ensure_dir_exists(f'{path}/'):
+            return False
+        temp_file = tempfile.NamedTemporaryFile(suffix='.tmp', delete=False, dir=path or None)
+        temp_file.close()
+        # If FragmentFD fails when testing a fragment, it will wrongly set a non-zero return code.
+        # Save the actual return code for later. See https://github.com/yt-dlp/yt-dlp/issues/13750
+        original_retcode = self._download_retcode
+        try:
+            success, _ = self.dl(temp_file.name, f, test=True)
+        except (DownloadError, OSError, ValueError, *network_exceptions):
+            success = False
+        finally:
+            if os.path.exists(temp_file.name):
+                try:
+                    os.remove(temp_file.name)
+                except OSError:
+                    self.report_warning(f'Unable to delete temporary file "{temp_file.name}"')
+        # Restore the actual return code
+        self._download_retcode = original_retcode
+        return success
+
+    def _submit_format_probe(self, f):
+        """Start probing a format that is served over plain HTTP, and return the future of the result
+
+        The results are cached by URL for the lifetime of this instance
+        """
+        if f.get('__working') is not None:
+            return None
+        url = f.get('url')
+        if (determine_protocol(f) not in ('http', 'https') or f.get('fragments') or f.get('impersonate')
+                or not isinstance(url, str) or not url.startswith(('http://', 'https://'))
+                or 'range' in map(str.lower, f.get('http_headers') or {})):
+            return None
+        probe = self._format_probes.get(url)
+        if not probe or probe.cancelled():
+            probe = self._format_probes[url] = self._format_check_pool.submit(self._probe_format, f)
+        return probe
+
+    def _probe_format(self, f):
+        """Check that the first bytes of a format can be downloaded"""
+        request = Request(f['url'], f.get('request_data'), HTTPHeaderDict(
+            {'Accept-Encoding': 'identity'}, f.get('http_headers'), {'Range': f'bytes=0-{self._FORMAT_PROBE_SIZE - 1}'}))
+        try:
+            with self.urlopen(request) as response:
+                if response.read(self._FORMAT_PROBE_SIZE):
+                    return True
+                err = 'no data received'
+        except (DownloadError, OSError, ValueError, RequestError, *network_exceptions) as e:
+            err = e
+        self.write_debug(f'Unable to download the first bytes of format {f.get("format_id")}: {err}')
+        return False
 
     def _select_formats(self, formats, selector):
         return list(selector({
@@ -3695,7 +4061,9 @@ def wrapper(*args, **kwargs):
                     raise
                 self._num_downloads = 0
             else:
-                if self.params.get('dump_single_json', False):
+                # Streamed playlists have already been written while they were processed
+                streamed = self.params.get('stream_json') and (res or {}).get('_type') in ('playlist', 'multi_video')
+                if self.params.get('dump_single_json', False) and not streamed:
                     self.post_extract(res)
                     self.to_stdout(json.dumps(self.sanitize_info(res)))
         return wrapper
@@ -3751,7 +4119,11 @@ def sanitize_info(info_dict, remove_private_keys=False):
             'release_git_head': RELEASE_GIT_HEAD,
             'repository': ORIGIN,
         })
+        return YoutubeDL._sanitize_info_values(info_dict, remove_private_keys)
 
+    @staticmethod
+    def _sanitize_info_values(info_dict, remove_private_keys=False):
+        """ Sanitize the infodict for converting to json, without adding the top-level metadata """
         if remove_private_keys:
             reject = lambda k, v: v is None or k.startswith('__') or k in {
                 'requested_downloads', 'requested_formats', 'requested_subtitles', 'requested_entries',
@@ -3866,7 +4238,7 @@ def _make_archive_id(self, info_dict):
             if not url:
                 return
             # Try to find matching extractor for the URL and take its ie_key
-            for ie_key, ie in self._ies.items():
+            for ie_key, ie in self._candidate_ies(url):
                 if ie.suitable(url):
                     extractor = ie_key
                     break
@@ -3890,9 +4262,6 @@ def record_download_archive(self, info_dict):
         assert vid_id
 
         self.write_debug(f'Adding to archive: {vid_id}')
-        if is_path_like(fn):
-            with locked_file(fn, 'a', encoding='utf-8') as archive_file:
-                archive_file.write(vid_id + '\n')
         self.archive.add(vid_id)
 
     @staticmethod
@@ -4351,7 +4720,18 @@ def build_request_director(self, handlers, preferences=None):
         clean_headers(headers)
         clean_proxies(proxies, headers)
 
-        director = RequestDirector(logger=logger, verbose=self.params.get('debug_printtraffic'))
+        # Every thread of concurrent downloads needs a connection to the same host
+        pool_size = self.params.get('http_pool_size') or max(
+            DEFAULT_POOL_SIZE, *(self.params.get(key) or 1 for key in (
+                'concurrent_fragment_downloads', 'http_connections')))
+
+        http_cache = None
+        if self.params.get('http_cache') and self.cache.enabled:
+            http_cache = HTTPCache(
+                os.path.join(self.cache._get_root_dir(), 'http'), cookiejar=self.cookiejar, logger=logger)
+
+        director = RequestDirector(
+            logger=logger, verbose=self.params.get('debug_printtraffic'), cache=http_cache)
         for handler in handlers:
             director.add_handler(handler(
                 logger=logger,
@@ -4360,11 +4740,16 @@ def build_request_director(self, handlers, preferences=None):
                 proxies=proxies,
                 prefer_system_certs='no-certifi' in self.params['compat_opts'],
                 verify=not self.params.get('nocheckcertificate'),
+                pool_size=pool_size,
                 **traverse_obj(self.params, {
                     'verbose': 'debug_printtraffic',
                     'source_address': 'source_address',
                     'timeout': 'socket_timeout',
                     'legacy_ssl_support': 'legacyserverconnect',
+                    'keep_alive': 'http_keep_alive',
+                    'max_idle': 'http_max_idle',
+                    'dns_cache_ttl': 'dns_cache_ttl',
+                    'happy_eyeballs': 'happy_eyeballs',
                     'enable_file_urls': 'enable_file_urls',
                     'impersonate': 'impersonate',
                     'client_cert': {
@@ -4377,12 +4762,37 @@ def build_request_director(self, handlers, preferences=None):
         director.preferences.update(preferences or [])
         if 'prefer-legacy-http-handler' in self.params['compat_opts']:
             director.preferences.add(lambda rh, _: 500 if rh.RH_KEY == 'Urllib' else 0)
+        elif self.params.get('http2'):
+            director.preferences.add(lambda rh, _: 500 if rh.RH_KEY == 'Httpx' else 0)
         return director
 
+    def _write_connection_stats(self):
+        for handler in self._request_director.handlers.values():
+            for host, stats in handler.connection_stats().items():
+                self.write_debug(
+                    f'[{handler.RH_NAME}] {host}: {stats["requests"]} requests '
+                    f'over {stats["connections"]} connections')
+
     @functools.cached_property
     def _request_director(self):
         return self.build_request_director(_REQUEST_HANDLERS.values(), _RH_PREFERENCES)
 
+    @functools.cached_property
+    def _fragment_scheduler(self):
+        return FragmentScheduler(
+            self.params.get('concurrent_fragment_downloads', 1),
+            self.params.get('concurrent_fragments_per_host'))
+
+    @functools.cached_property
+    def _extraction_pool(self):
+        from .async_ydl import ExtractionPool
+        return ExtractionPool(self, self.params.get('concurrent_extractions'))
+
+    @functools.cached_property
+    def _format_check_pool(self):
+        return concurrent.futures.ThreadPoolExecutor(
+            self.params.get('concurrent_format_checks') or 1, thread_name_prefix='yt-dlp-check')
+
     def encode(self, s):
         if isinstance(s, bytes):
             return s  # Already encoded
@@ -72,6 +72,7 @@
     QuickJsRuntime as _QuickJsRuntime,
 )
 from .YoutubeDL import YoutubeDL
+from .async_ydl import AsyncYoutubeDL
 
 
 def _exit(status=0, *args):
@@ -218,6 +219,9 @@ def validate_minmax(min_val, max_val, min_name, max_name=None):
     validate_positive('autonumber start', opts.autonumber_start)
     validate_positive('autonumber size', opts.autonumber_size, True)
     validate_positive('concurrent fragments', opts.concurrent_fragment_downloads, True)
+    validate_positive('http connections', opts.http_connections, True)
+    validate_positive('concurrent extractions', opts.concurrent_extractions, True)
+    validate_positive('concurrent format checks', opts.concurrent_format_checks, True)
     validate_positive('playlist start', opts.playliststart, True)
     if opts.playlistend != -1:
         validate_minmax(opts.playliststart, opts.playlistend, 'playlist start', 'playlist end')
@@ -765,10 +769,10 @@ def parse_options(argv=None):
                                and opts.allow_playlist_files and opts.outtmpl.get('pl_infojson') != '')
     if not any((
         opts.extract_flat,
-        opts.dump_single_json,
+        opts.dump_single_json and not opts.stream_json,
         opts.forceprint.get('playlist'),
         opts.print_to_file.get('playlist'),
-        write_playlist_infojson,
+        write_playlist_infojson and not opts.stream_json,
     )):
         if not playlist_pps:
             opts.extract_flat = 'discard'
@@ -813,6 +817,7 @@ def parse_options(argv=None):
         'print_to_file': opts.print_to_file,
         'forcejson': opts.dumpjson or opts.print_json,
         'dump_single_json': opts.dump_single_json,
+        'stream_json': opts.stream_json,
         'force_write_download_archive': opts.force_write_download_archive,
         'simulate': (print_only or any_getting or None) if opts.simulate is None else opts.simulate,
         'skip_download': opts.skip_download,
@@ -824,6 +829,7 @@ def parse_options(argv=None):
         'allow_multiple_video_streams': opts.allow_multiple_video_streams,
         'allow_multiple_audio_streams': opts.allow_multiple_audio_streams,
         'check_formats': opts.check_formats,
+        'concurrent_format_checks': opts.concurrent_format_checks,
         'listformats': opts.listformats,
         'listformats_table': opts.listformats_table,
         'outtmpl': opts.outtmpl,
@@ -850,6 +856,7 @@ def parse_options(argv=None):
         'buffersize': opts.buffersize,
         'noresizebuffer': opts.noresizebuffer,
         'http_chunk_size': opts.http_chunk_size,
+        'http_connections': opts.http_connections,
         'continuedl': opts.continue_dl,
         'noprogress': opts.quiet if opts.noprogress is None else opts.noprogress,
         'progress_with_newline': opts.progress_with_newline,
@@ -860,6 +867,8 @@ def parse_options(argv=None):
         'playlistreverse': opts.playlist_reverse,
         'playlistrandom': opts.playlist_random,
         'lazy_playlist': opts.lazy_playlist,
+        'incremental_playlist': opts.incremental_playlist,
+        'concurrent_extractions': opts.concurrent_extractions,
         'noplaylist': opts.noplaylist,
         'logtostderr': opts.outtmpl.get('default') == '-',
         'consoletitle': opts.consoletitle,
@@ -1106,6 +1115,7 @@ def main(argv=None):
 supported_remote_components.value.append('ejs:npm')
 
 __all__ = [
+    'AsyncYoutubeDL',
     'YoutubeDL',
     'gen_extractors',
     'list_extractors',
@@ -1,10 +1,92 @@
 import base64
+import functools
+import os
+import struct
 from math import ceil
 
 from .compat import compat_ord
-from .dependencies import Cryptodome
+from .dependencies import Cryptodome, cryptography
+
+
+@functools.cache
+def _load_libcrypto():
+    """ Load the libcrypto of the OpenSSL that the ssl module is linked against, if possible """
+    try:
+        import ctypes
+
+        import _ssl
+    except ImportError:
+        return None
+
+    if os.name == 'nt':
+        # The symbols of the DLLs that _ssl depends on are not visible through it
+        names = ('libcrypto-3-x64', 'libcrypto-3', 'libcrypto-1_1-x64', 'libcrypto-1_1')
+    else:
+        # None is the namespace of the process, for when _ssl is built into the interpreter
+        names = (getattr(_ssl, '__file__', None),)
+
+    for name in names:
+        try:
+            lib = ctypes.CDLL(name)
+            for mode in ('cbc', 'gcm'):
+                for bits in (128, 192, 256):
+                    getattr(lib, f'EVP_aes_{bits}_{mode}').restype = ctypes.c_void_p
+            lib.EVP_CIPHER_CTX_new.restype = ctypes.c_void_p
+            lib.EVP_CIPHER_CTX_free.argtypes = [ctypes.c_void_p]
+            lib.EVP_CIPHER_CTX_free.restype = None
+            lib.EVP_CIPHER_CTX_set_padding.argtypes = [ctypes.c_void_p, ctypes.c_int]
+            lib.EVP_CIPHER_CTX_ctrl.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+            lib.EVP_DecryptInit_ex.argtypes = [ctypes.c_void_p] * 5
+            lib.EVP_DecryptUpdate.argtypes = [
+                ctypes.c_void_p, ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.c_void_p, ctypes.c_int]
+            lib.EVP_DecryptFinal_ex.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.POINTER(ctypes.c_int)]
+        except (OSError, AttributeError):
+            continue
+        return lib
+    return None
+
+
+def _openssl_decrypt(mode, data, key, iv, tag=None):
+    import ctypes
+
+    lib = _load_libcrypto()
+    if len(key) not in (16, 24, 32):
+        raise ValueError(f'Incorrect AES key length ({len(key)} bytes)')
+    cipher = getattr(lib, f'EVP_aes_{len(key) * 8}_{mode}')()
+    out = ctypes.create_string_buffer(len(data) + BLOCK_SIZE_BYTES)
+    out_len, final_len = ctypes.c_int(), ctypes.c_int()
+    ctx = lib.EVP_CIPHER_CTX_new()
+    if not ctx:
+        raise MemoryError('Unable to allocate the OpenSSL cipher context')
+    try:
+        if mode == 'gcm':
+            EVP_CTRL_GCM_SET_IVLEN, EVP_CTRL_GCM_SET_TAG = 0x9, 0x11
+            if not (lib.EVP_DecryptInit_ex(ctx, cipher, None, None, None)
+                    and lib.EVP_CIPHER_CTX_ctrl(ctx, EVP_CTRL_GCM_SET_IVLEN, len(iv), None)
+                    and lib.EVP_DecryptInit_ex(ctx, None, None, key, iv)
+                    and lib.EVP_DecryptUpdate(ctx, out, ctypes.byref(out_len), data, len(data))
+                    and lib.EVP_CIPHER_CTX_ctrl(ctx, EVP_CTRL_GCM_SET_TAG, len(tag), tag)):
+                raise ValueError('Unable to decrypt the data with OpenSSL')
+            # The tag is verified when the decryption is finalized
+            if lib.EVP_DecryptFinal_ex(ctx, ctypes.byref(out, out_len.value), ctypes.byref(final_len)) <= 0:
+                raise ValueError('Mismatching authentication tag')
+        else:
+            if len(iv) != BLOCK_SIZE_BYTES:
+                raise ValueError(f'Incorrect IV length ({len(iv)} bytes)')
+            if len(data) % BLOCK_SIZE_BYTES:
+                raise ValueError(f'Data must be padded to {BLOCK_SIZE_BYTES} byte boundary in CBC mode')
+            if not (lib.EVP_DecryptInit_ex(ctx, cipher, None, key, iv)
+                    and lib.EVP_CIPHER_CTX_set_padding(ctx, 0)
+                    and lib.EVP_DecryptUpdate(ctx, out, ctypes.byref(out_len), data, len(data))):
+                raise ValueError('Unable to decrypt the data with OpenSSL')
+    finally:
+        lib.EVP_CIPHER_CTX_free(ctx)
+    return out.raw[:out_len.value + final_len.value]
+
 
 if Cryptodome.AES:
+    _AES_BACKEND = 'pycryptodomex'
+
     def aes_cbc_decrypt_bytes(data, key, iv):
         """ Decrypt bytes with AES-CBC using pycryptodome """
         return Cryptodome.AES.new(key, Cryptodome.AES.MODE_CBC, iv).decrypt(data)
@@ -13,10 +95,42 @@ def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
         """ Decrypt bytes with AES-GCM using pycryptodome """
         return Cryptodome.AES.new(key, Cryptodome.AES.MODE_GCM, nonce).decrypt_and_verify(data, tag)
 
+elif cryptography:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    _AES_BACKEND = 'cryptography'
+
+    def aes_cbc_decrypt_bytes(data, key, iv):
+        """ Decrypt bytes with AES-CBC using cryptography """
+        decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+        return decryptor.update(data) + decryptor.finalize()
+
+    def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
+        """ Decrypt bytes with AES-GCM using cryptography """
+        decryptor = Cipher(algorithms.AES(key), modes.GCM(nonce, tag)).decryptor()
+        try:
+            return decryptor.update(data) + decryptor.finalize()
+        except InvalidTag:
+            raise ValueError('Mismatching authentication tag')
+
+elif _load_libcrypto():
+    _AES_BACKEND = 'openssl'
+
+    def aes_cbc_decrypt_bytes(data, key, iv):
+        """ Decrypt bytes with AES-CBC using the libcrypto of OpenSSL since pycryptodome is unavailable """
+        return _openssl_decrypt('cbc', data, key, iv)
+
+    def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
+        """ Decrypt bytes with AES-GCM using the libcrypto of OpenSSL since pycryptodome is unavailable """
+        return _openssl_decrypt('gcm', data, key, nonce, tag)
+
 else:
+    _AES_BACKEND = 'native'
+
     def aes_cbc_decrypt_bytes(data, key, iv):
         """ Decrypt bytes with AES-CBC using native implementation since pycryptodome is unavailable """
-        return bytes(aes_cbc_decrypt(*map(list, (data, key, iv))))
+        return _aes_cbc_decrypt_native(data, key, iv)
 
     def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
         """ Decrypt bytes with AES-GCM using native implementation since pycryptodome is unavailable """
@@ -157,19 +271,44 @@ def aes_cbc_decrypt(data, key, iv):
     @param {int[]} iv          16-Byte IV
     @returns {int[]}           decrypted data
     """
-    expanded_key = key_expansion(key)
-    block_count = ceil(len(data) / BLOCK_SIZE_BYTES)
+    return list(_aes_cbc_decrypt_native(bytes(data), bytes(key), bytes(iv)))
 
-    decrypted_data = []
-    previous_cipher_block = iv
-    for i in range(block_count):
-        block = data[i * BLOCK_SIZE_BYTES: (i + 1) * BLOCK_SIZE_BYTES]
-        block += [0] * (BLOCK_SIZE_BYTES - len(block))
 
-        decrypted_block = aes_decrypt(block, expanded_key)
-        decrypted_data += xor(decrypted_block, previous_cipher_block)
-        previous_cipher_block = block
-    return decrypted_data[:len(data)]
+def _aes_cbc_decrypt_native(data, key, iv):
+    """
+    Decrypt bytes with AES-CBC using 32-bit lookup tables
+
+    Each round of a block is done with 16 table lookups on its 4 columns,
+    and the whole buffer is unpacked into and packed from words at once
+    """
+    first_key, round_keys, last_key = _decryption_key_schedule(bytes(key))
+    td0, td1, td2, td3, si0, si1, si2, si3 = _decryption_tables()
+    f0, f1, f2, f3 = first_key
+    l0, l1, l2, l3 = last_key
+    p0, p1, p2, p3 = struct.unpack('>4I', bytes(iv))
+
+    size = len(data)
+    # The last block is padded with zeros for backwards compatibility
+    words = struct.unpack(f'>{ceil(size / BLOCK_SIZE_BYTES) * 4}I', bytes(data) + bytes(-size % BLOCK_SIZE_BYTES))
+    decrypted = [0] * len(words)
+    for i in range(0, len(words), 4):
+        c0, c1, c2, c3 = words[i], words[i + 1], words[i + 2], words[i + 3]
+        s0, s1, s2, s3 = c0 ^ f0, c1 ^ f1, c2 ^ f2, c3 ^ f3
+        for k0, k1, k2, k3 in round_keys:
+            t0 = td0[s0 >> 24] ^ td1[s3 >> 16 & 0xFF] ^ td2[s2 >> 8 & 0xFF] ^ td3[s1 & 0xFF] ^ k0
+            t1 = td0[s1 >> 24] ^ td1[s0 >> 16 & 0xFF] ^ td2[s3 >> 8 & 0xFF] ^ td3[s2 & 0xFF] ^ k1
+            t2 = td0[s2 >> 24] ^ td1[s1 >> 16 & 0xFF] ^ td2[s0 >> 8 & 0xFF] ^ td3[s3 & 0xFF] ^ k2
+            t3 = td0[s3 >> 24] ^ td1[s2 >> 16 & 0xFF] ^ td2[s1 >> 8 & 0xFF] ^ td3[s0 & 0xFF] ^ k3
+            s0 = t0
+            s1 = t1
+            s2 = t2
+            s3 = t3
+        decrypted[i] = si0[s0 >> 24] ^ si1[s3 >> 16 & 0xFF] ^ si2[s2 >> 8 & 0xFF] ^ si3[s1 & 0xFF] ^ l0 ^ p0
+        decrypted[i + 1] = si0[s1 >> 24] ^ si1[s0 >> 16 & 0xFF] ^ si2[s3 >> 8 & 0xFF] ^ si3[s2 & 0xFF] ^ l1 ^ p1
+        decrypted[i + 2] = si0[s2 >> 24] ^ si1[s1 >> 16 & 0xFF] ^ si2[s0 >> 8 & 0xFF] ^ si3[s3 & 0xFF] ^ l2 ^ p2
+        decrypted[i + 3] = si0[s3 >> 24] ^ si1[s2 >> 16 & 0xFF] ^ si2[s1 >> 8 & 0xFF] ^ si3[s0 & 0xFF] ^ l3 ^ p3
+        p0, p1, p2, p3 = c0, c1, c2, c3
+    return struct.pack(f'>{len(decrypted)}I', *decrypted)[:size]
 
 
 def aes_cbc_encrypt(data, key, iv, *, padding_mode='pkcs7'):
@@ -420,6 +559,49 @@ def key_expansion(data):
     return data[:expanded_key_size_bytes]
 
 
+def _gf_multiply(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return RIJNDAEL_EXP_TABLE[(RIJNDAEL_LOG_TABLE[a] + RIJNDAEL_LOG_TABLE[b]) % 0xFF]
+
+
+@functools.cache
+def _decryption_tables():
+    """
+    Build the lookup tables of the inverse cipher
+
+    @returns    The 4 rotations of the table that combines InvSubBytes and InvMixColumns,
+                followed by the 4 byte positions of the table of InvSubBytes
+    """
+    td0 = tuple(
+        _gf_multiply(x, 0xE) << 24 | _gf_multiply(x, 0x9) << 16 | _gf_multiply(x, 0xD) << 8 | _gf_multiply(x, 0xB)
+        for x in SBOX_INV)
+    td1, td2, td3 = (tuple((w >> shift | w << (32 - shift)) & 0xFFFFFFFF for w in td0) for shift in (8, 16, 24))
+    return (td0, td1, td2, td3, *(tuple(x << shift for x in SBOX_INV) for shift in (24, 16, 8, 0)))
+
+
+@functools.lru_cache(maxsize=16)
+def _decryption_key_schedule(key):
+    """
+    Generate the key schedule of the equivalent inverse cipher (FIPS 197, section 5.3.5)
+
+    @param {bytes} key   16/24/32-Byte cipher key
+    @returns             The first round key, the keys of the middle rounds and the last round key
+    """
+    td0, td1, td2, td3 = _decryption_tables()[:4]
+    expanded_key = bytes(key_expansion(list(key)))
+    words = struct.unpack(f'>{len(expanded_key) // 4}I', expanded_key)
+    rounds = len(words) // 4 - 1
+
+    def inv_mix_columns(w):
+        return (td0[SBOX[w >> 24]] ^ td1[SBOX[w >> 16 & 0xFF]]
+                ^ td2[SBOX[w >> 8 & 0xFF]] ^ td3[SBOX[w & 0xFF]])
+
+    round_keys = tuple(
+        tuple(map(inv_mix_columns, words[4 * i: 4 * i + 4])) for i in range(rounds - 1, 0, -1))
+    return words[4 * rounds: 4 * rounds + 4], round_keys, words[:4]
+
+
 def iter_vector(iv):
     while True:
         yield iv
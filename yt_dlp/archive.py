@@ -0,0 +1,189 @@
+import contextlib
+import errno
+import os
+import threading
+
+from .dependencies import sqlite3
+from .utils import YoutubeDLError, locked_file
+
+_SQLITE_MAGIC = b'SQLite format 3\x00'
+_SQLITE_EXTENSIONS = ('.sqlite', '.sqlite3')
+
+
+class DownloadArchive:
+    """Base class for download archive backends
+
+    A download archive is a set-like store of archive ids (see YoutubeDL._make_archive_id).
+    Subclasses must implement `__contains__`, `__iter__` and `_write`.
+    Appends may be buffered by the backend until `flush` or `close` is called.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.path!r})'
+
+    def __bool__(self):
+        # An empty archive is still an archive; avoid counting the entries
+        return True
+
+    def __contains__(self, archive_id):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def __iter__(self):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def _write(self, archive_ids):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def add(self, archive_id):
+        self.update((archive_id,))
+
+    def update(self, archive_ids):
+        archive_ids = [id_ for id_ in archive_ids if id_ not in self]
+        if archive_ids:
+            self._write(archive_ids)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def import_text(self, filename):
+        """Add all ids from a text archive file (one id per line)"""
+        with locked_file(filename, 'r', encoding='utf-8') as archive_file:
+            self.update(filter(None, map(str.strip, archive_file)))
+        self.flush()
+
+    def export_text(self, filename):
+        """Write all ids to a text archive file (one id per line)"""
+        self.flush()
+        with locked_file(filename, 'w', encoding='utf-8') as archive_file:
+            archive_file.writelines(f'{id_}\n' for id_ in self)
+
+
+class TextDownloadArchive(DownloadArchive):
+    """The traditional archive format: a text file with one id per line
+
+    The whole file is loaded into memory on creation.
+    Every new id is appended to the file immediately, so that
+    several processes can share the same archive file
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._ids = set()
+        try:
+            with locked_file(path, 'r', encoding='utf-8') as archive_file:
+                for line in archive_file:
+                    self._ids.add(line.strip())
+        except OSError as ioe:
+            if ioe.errno != errno.ENOENT:
+                raise
+
+    def __contains__(self, archive_id):
+        return archive_id in self._ids
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _write(self, archive_ids):
+        with locked_file(self.path, 'a', encoding='utf-8') as archive_file:
+            archive_file.writelines(f'{id_}\n' for id_ in archive_ids)
+        self._ids.update(archive_ids)
+
+
+class SQLiteDownloadArchive(DownloadArchive):
+    """An indexed archive stored in an SQLite database
+
+    Lookups are answered from the database index without loading the archive into memory.
+    New ids are committed in batches of `batch_size`, and whenever the archive is flushed or closed
+    """
+
+    def __init__(self, path, batch_size=100):
+        if not sqlite3:
+            raise YoutubeDLError(
+                'Cannot use an SQLite download archive without sqlite3 support. '
+                'Please use a Python interpreter compiled with sqlite3 support')
+        super().__init__(path)
+        self.batch_size = batch_size
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS archive (id TEXT PRIMARY KEY NOT NULL) WITHOUT ROWID')
+
+    def __contains__(self, archive_id):
+        with self._lock:
+            if archive_id in self._pending:
+                return True
+            return self._conn.execute(
+                'SELECT 1 FROM archive WHERE id = ? LIMIT 1', (archive_id,)).fetchone() is not None
+
+    def __iter__(self):
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute('SELECT id FROM archive').fetchall()
+        return (id_ for id_, in rows)
+
+    def __len__(self):
+        self.flush()
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM archive').fetchone()[0]
+
+    def _write(self, archive_ids):
+        with self._lock:
+            self._pending.update(archive_ids)
+            if len(self._pending) >= self.batch_size:
+                self._commit()
+
+    def _commit(self):
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO archive (id) VALUES (?)', ((id_,) for id_ in self._pending))
+        self._pending.clear()
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        if self._conn is None:
+            return
+        self.flush()
+        with self._lock:
+            self._conn.close()
+            self._conn = None
+
+
+def _is_sqlite_archive(path):
+    with contextlib.suppress(OSError):
+        with open(path, 'rb') as f:
+            return f.read(len(_SQLITE_MAGIC)) == _SQLITE_MAGIC
+    # Only create new databases if explicitly requested by the file extension
+    return not os.path.exists(path) and path.lower().endswith(_SQLITE_EXTENSIONS)
+
+
+def open_download_archive(path):
+    """Open the archive at `path` with the appropriate backend
+
+    Existing SQLite databases are detected by their header. New archives are created
+    as SQLite databases if the filename ends in .sqlite or .sqlite3, and as text otherwise
+    """
+    path = os.fsdecode(path)
+    if _is_sqlite_archive(path):
+        return SQLiteDownloadArchive(path)
+    return TextDownloadArchive(path)
@@ -0,0 +1,186 @@
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+from .YoutubeDL import YoutubeDL
+
+# Params that the request handlers are built from; see YoutubeDL.build_request_director
+_NETWORK_PARAMS = frozenset((
+    'http_headers', 'proxy', 'debug_printtraffic', 'source_address', 'socket_timeout',
+    'legacyserverconnect', 'enable_file_urls', 'impersonate', 'nocheckcertificate', 'compat_opts',
+    'client_certificate', 'client_certificate_key', 'client_certificate_password'))
+_COOKIE_PARAMS = frozenset(('cookiefile', 'cookiesfrombrowser'))
+# Params that the initialization of the extractors depends on
+_LOGIN_PARAMS = frozenset((
+    'username', 'password', 'twofactor', 'usenetrc', 'netrc_location', 'netrc_cmd',
+    'ap_mso', 'ap_username', 'ap_password', 'extractor_args'))
+
+# Held while an extractor of a parent is initialized for its workers, so that it logs in only once
+_INITIALIZE_LOCK = threading.Lock()
+
+
+class _WorkerYoutubeDL(YoutubeDL):
+    """A YoutubeDL for a single extraction, which borrows the resources of its parent
+
+    The request director, cookie jar, download archive and cache of the parent are
+    used unless the params this instance is created with require different ones.
+    Borrowed resources are left to be closed by the parent
+
+    The extractors are instantiated per worker, since their instances are not thread-safe.
+    They are initialized (i.e. logged in) once by the parent, and copy its state
+    """
+
+    def __init__(self, parent, params):
+        self._parent = parent
+        self._borrowed = {'cache', 'archive'}
+        if not params.keys() & _COOKIE_PARAMS:
+            self._borrowed.add('cookiejar')
+            if not params.keys() & _LOGIN_PARAMS:
+                # The login is kept in the cookies and in the state of the extractors
+                self._borrowed.add('initialization')
+            if not params.keys() & _NETWORK_PARAMS:
+                self._borrowed.add('_request_director')
+        if 'download_archive' not in params and parent.params.get('download_archive') is not None:
+            params['download_archive'] = parent.archive
+        else:
+            self._borrowed.remove('archive')
+
+        params = {**parent.params, **params}
+        # Warnings about the params have already been shown by the parent
+        params.pop('_warnings', None)
+        params.pop('_deprecation_warnings', None)
+        super().__init__(params, auto_init=False)
+
+        for ie in parent._ies.values():
+            # Extractor instances hold per-YoutubeDL state
+            self.add_info_extractor(ie if isinstance(ie, type) else type(ie)())
+        self._own_cache, self.cache = self.cache, parent.cache
+
+    @functools.cached_property
+    def cookiejar(self):
+        return self._parent.cookiejar if 'cookiejar' in self._borrowed else super().cookiejar
+
+    @functools.cached_property
+    def _request_director(self):
+        if '_request_director' in self._borrowed:
+            return self._parent._request_director
+        return super()._request_director
+
+    def get_info_extractor(self, ie_key):
+        ie = super().get_info_extractor(ie_key)
+        if not ie._ready and 'initialization' in self._borrowed:
+            with _INITIALIZE_LOCK:
+                parent_ie = self._parent.get_info_extractor(ie_key)
+                parent_ie.initialize()
+            ie.__dict__.update({
+                key: value for key, value in parent_ie.__dict__.items()
+                if key not in ('_downloader', '_printed_messages')})
+        return ie
+
+    def _candidate_ies(self, url):
+        # The extractors are the same as the parent's, so share its dispatch index
+        return self._parent._candidate_ies(url)
+
+    def save_cookies(self):
+        if 'cookiejar' not in self._borrowed:
+            super().save_cookies()
+
+    def close(self):
+        self.cache = self._own_cache
+        if 'archive' in self._borrowed:
+            self.archive = set()
+        for name in ('cookiejar', '_request_director'):
+            if name in self._borrowed:
+                self.__dict__.pop(name, None)
+        super().close()
+
+
+class ExtractionPool:
+    """Run extractors for the URLs of a YoutubeDL in worker threads
+
+    Each thread extracts with its own _WorkerYoutubeDL, which is kept
+    for the lifetime of the pool so that extractors are initialized once,
+    and closed when the pool is shut down
+    """
+
+    def __init__(self, ydl, max_workers):
+        self._ydl = ydl
+        self._local = threading.local()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers, thread_name_prefix='yt-dlp-extract')
+
+    def _extract(self, url, ie_key):
+        worker = getattr(self._local, 'ydl', None)
+        if worker is None:
+            worker = self._local.ydl = _WorkerYoutubeDL(self._ydl, {})
+            with self._lock:
+                self._workers.append(worker)
+        return worker.get_info_extractor(ie_key).extract(url)
+
+    def submit(self, url, ie_key):
+        """Return a future of the result of the extractor, before any processing"""
+        return self._executor.submit(self._extract, url, ie_key)
+
+    def shutdown(self):
+        # The running extractions must finish before their workers can be closed
+        self._executor.shutdown(cancel_futures=True)
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
+
+
+class AsyncYoutubeDL:
+    """Run extractions concurrently from asyncio code
+
+    Each extraction runs in a worker thread with its own YoutubeDL instance, so that
+    params can be overridden per call. The instances share the request handlers,
+    cookies, download archive and cache of one parent YoutubeDL, which is created
+    with `params` and `auto_init`.
+
+    Usage:
+        async with AsyncYoutubeDL({'quiet': True}, max_concurrency=8) as ydl:
+            infos = await asyncio.gather(*map(ydl.extract_info, urls))
+
+    NB: Cancelling an extraction does not interrupt its worker thread
+    """
+
+    def __init__(self, params=None, *, max_concurrency=4, auto_init=True):
+        self.ydl = YoutubeDL(params, auto_init=auto_init)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_concurrency, thread_name_prefix='yt-dlp-extract')
+
+    def add_info_extractor(self, ie):
+        """Add an InfoExtractor to be used by subsequent extractions"""
+        self.ydl.add_info_extractor(ie)
+
+    def _extract_info(self, url, params, kwargs):
+        ydl = _WorkerYoutubeDL(self.ydl, dict(params or {}))
+        try:
+            return ydl.extract_info(url, download=False, **kwargs)
+        finally:
+            ydl.close()
+
+    async def extract_info(self, url, params=None, *, ie_key=None, process=True, extra_info=None):
+        """
+        Extract and return the information dictionary of the URL
+
+        The result is the same as that of YoutubeDL.extract_info with download=False
+        @param params   Params to override for this extraction only
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._extract_info, url, params,
+            {'ie_key': ie_key, 'process': process, 'extra_info': extra_info})
+
+    def close(self):
+        """Wait for the running extractions and close the shared resources"""
+        self._executor.shutdown()
+        self.ydl.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
@@ -1,18 +1,125 @@
+import collections
 import contextlib
+import copy
 import json
 import os
 import re
 import shutil
+import threading
+import time
 import traceback
 import urllib.parse
 
+from .dependencies import sqlite3
 from .utils import expand_path, traverse_obj, version_tuple, write_json_file
 from .version import __version__
 
 
+class _FileCacheStore:
+    """One JSON file per key, in a directory per section"""
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+
+    def filename(self, section, key, dtype):
+        key = urllib.parse.quote(key, safe='').replace('%', ',')  # encode non-ascii characters
+        return os.path.join(self.root_dir, section, f'{key}.{dtype}')
+
+    def get(self, section, key, dtype):
+        with open(self.filename(section, key, dtype), encoding='utf-8') as cachef:
+            return json.load(cachef)
+
+    def put(self, section, key, dtype, obj):
+        fn = self.filename(section, key, dtype)
+        os.makedirs(os.path.dirname(fn), exist_ok=True)
+        write_json_file(obj, fn)  # atomic
+
+    def evict(self, max_size):
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root_dir):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                with contextlib.suppress(OSError):
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_size:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+                total -= size
+
+    def close(self):
+        pass
+
+
+class _SQLiteCacheStore:
+    """All entries in a single SQLite database"""
+
+    FILENAME = 'cache.sqlite3'
+
+    def __init__(self, root_dir):
+        os.makedirs(root_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(root_dir, self.FILENAME), timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS cache (
+                section TEXT NOT NULL, key TEXT NOT NULL, dtype TEXT NOT NULL,
+                timestamp REAL NOT NULL, value TEXT NOT NULL,
+                PRIMARY KEY (section, key, dtype))''')
+
+    def filename(self, section, key, dtype):
+        return f'{self.FILENAME}:{section}/{key}.{dtype}'
+
+    def get(self, section, key, dtype):
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    'SELECT value FROM cache WHERE section = ? AND key = ? AND dtype = ?',
+                    (section, key, dtype)).fetchone()
+            except sqlite3.Error as e:
+                raise OSError(f'Unable to read {self.FILENAME}: {e}') from e
+        if row is None:
+            raise FileNotFoundError(self.filename(section, key, dtype))
+        return json.loads(row[0])
+
+    def put(self, section, key, dtype, obj):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (section, key, dtype, timestamp, value) VALUES (?, ?, ?, ?, ?)',
+                (section, key, dtype, time.time(), json.dumps(obj, ensure_ascii=False)))
+
+    def evict(self, max_size):
+        with self._lock, self._conn:
+            self._conn.execute('''DELETE FROM cache WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT rowid, SUM(LENGTH(value)) OVER (ORDER BY timestamp DESC) AS total FROM cache)
+                WHERE total > ?)''', (max_size,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
 class Cache:
+    """Persistent cache of JSON data, organised in sections
+
+    Entries that have been loaded or stored are also kept in memory,
+    so that repeated lookups of the same key do not hit the filesystem
+    """
+
+    BACKENDS = {'file': _FileCacheStore, 'sqlite': _SQLiteCacheStore}
+    _MEMO_SIZE = 512
+    _EVICT_INTERVAL = 100
+    _MISSING = object()
+
     def __init__(self, ydl):
         self._ydl = ydl
+        self._memo = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._store_count = 0
 
     def _get_root_dir(self):
         res = self._ydl.params.get('cachedir')
@@ -22,50 +129,116 @@ def _get_root_dir(self):
         return expand_path(res)
 
     def _get_cache_fn(self, section, key, dtype):
-        assert re.match(r'^[\w.-]+$', section), f'invalid section {section!r}'
-        key = urllib.parse.quote(key, safe='').replace('%', ',')  # encode non-ascii characters
-        return os.path.join(self._get_root_dir(), section, f'{key}.{dtype}')
+        return self._backend.filename(section, key, dtype)
+
+    @property
+    def _backend(self):
+        with self._lock:
+            if '_backend_store' not in self.__dict__:
+                backend = self._ydl.params.get('cache_backend') or 'file'
+                root_dir = self._get_root_dir()
+                self._backend_store = None
+                if backend not in self.BACKENDS:
+                    self._ydl.report_warning(f'Invalid cache backend {backend!r}. Falling back to files')
+                elif backend == 'sqlite' and not sqlite3:
+                    self._ydl.report_warning(
+                        'Cannot use the sqlite cache backend without sqlite3 support. Falling back to files')
+                else:
+                    try:
+                        self._backend_store = self.BACKENDS[backend](root_dir)
+                    except Exception as e:
+                        self._ydl.report_warning(f'Unable to open the {backend} cache: {e}. Falling back to files')
+                if self._backend_store is None:
+                    self._backend_store = _FileCacheStore(root_dir)
+            return self._backend_store
 
     @property
     def enabled(self):
         return self._ydl.params.get('cachedir') is not False
 
+    def _get_ttl(self, section):
+        ttl = self._ydl.params.get('cache_ttl')
+        if isinstance(ttl, dict):
+            ttl = ttl.get(section, ttl.get('default'))
+        return ttl
+
+    def _memoize(self, memo_key, value):
+        with self._lock:
+            self._memo[memo_key] = value
+            self._memo.move_to_end(memo_key)
+            while len(self._memo) > self._MEMO_SIZE:
+                self._memo.popitem(last=False)
+
     def store(self, section, key, data, dtype='json'):
         assert dtype in ('json',)
+        assert re.match(r'^[\w.-]+$', section), f'invalid section {section!r}'
 
         if not self.enabled:
             return
 
-        fn = self._get_cache_fn(section, key, dtype)
+        obj = {'yt-dlp_version': __version__, 'timestamp': int(time.time()), 'data': data}
+        fn = f'{section}.{key}'
         try:
-            os.makedirs(os.path.dirname(fn), exist_ok=True)
+            fn = self._get_cache_fn(section, key, dtype)
             self._ydl.write_debug(f'Saving {section}.{key} to cache')
-            write_json_file({'yt-dlp_version': __version__, 'data': data}, fn)
+            self._backend.put(section, key, dtype, obj)
         except Exception:
             tb = traceback.format_exc()
             self._ydl.report_warning(f'Writing cache to {fn!r} failed: {tb}')
+            return
+        # Round-trip through JSON so that the memoized entry matches what would be loaded from disk
+        self._memoize((section, key, dtype), json.loads(json.dumps(obj)))
+
+        max_size = self._ydl.params.get('cache_max_size')
+        if max_size is not None and self._store_count % self._EVICT_INTERVAL == 0:
+            try:
+                self._backend.evict(max_size)
+            except Exception as e:
+                self._ydl.report_warning(f'Unable to shrink cache: {e}')
+        self._store_count += 1
 
-    def _validate(self, data, min_ver):
+    def _validate(self, data, min_ver, ttl=None):
         version = traverse_obj(data, 'yt-dlp_version')
         if not version:  # Backward compatibility
             data, version = {'data': data}, '2022.08.19'
-        if not min_ver or version_tuple(version) >= version_tuple(min_ver):
-            return data['data']
-        self._ydl.write_debug(f'Discarding old cache from version {version} (needs {min_ver})')
+        if min_ver and version_tuple(version) < version_tuple(min_ver):
+            self._ydl.write_debug(f'Discarding old cache from version {version} (needs {min_ver})')
+            return None
+        if ttl is not None and time.time() - (data.get('timestamp') or 0) > ttl:
+            self._ydl.write_debug('Discarding expired cache entry')
+            return None
+        return data['data']
+
+    def _load_obj(self, section, key, dtype):
+        memo_key = (section, key, dtype)
+        with self._lock:
+            obj = self._memo.get(memo_key)
+            if obj is not None:
+                self._memo.move_to_end(memo_key)
+        if obj is None:
+            try:
+                obj = self._backend.get(section, key, dtype)
+            except OSError:
+                obj = self._MISSING
+            self._memoize(memo_key, obj)
+        if obj is self._MISSING:
+            raise FileNotFoundError
+        return copy.deepcopy(obj)
 
     def load(self, section, key, dtype='json', default=None, *, min_ver=None):
         assert dtype in ('json',)
+        assert re.match(r'^[\w.-]+$', section), f'invalid section {section!r}'
 
         if not self.enabled:
             return default
 
-        cache_fn = self._get_cache_fn(section, key, dtype)
         with contextlib.suppress(OSError):
             try:
-                with open(cache_fn, encoding='utf-8') as cachef:
-                    self._ydl.write_debug(f'Loading {section}.{key} from cache')
-                    return self._validate(json.load(cachef), min_ver)
+                obj = self._load_obj(section, key, dtype)
+                self._ydl.write_debug(f'Loading {section}.{key} from cache')
+                return self._validate(obj, min_ver, self._get_ttl(section))
             except (ValueError, KeyError):
+                cache_fn = self._get_cache_fn(section, key, dtype)
                 try:
                     file_size = os.path.getsize(cache_fn)
                 except OSError as oe:
@@ -74,6 +247,13 @@ def load(self, section, key, dtype='json', default=None, *, min_ver=None):
 
         return default
 
+    def close(self):
+        with self._lock:
+            self._memo.clear()
+            if '_backend_store' in self.__dict__:
+                self._backend_store.close()
+                del self._backend_store
+
     def remove(self):
         if not self.enabled:
             self._ydl.to_screen('Cache is disabled (Did you combine --no-cache-dir and --rm-cache-dir?)')
@@ -83,6 +263,7 @@ def remove(self):
         if not any((term in cachedir) for term in ('cache', 'tmp')):
             raise Exception(f'Not removing directory {cachedir} - this does not look like a cache dir')
 
+        self.close()
         self._ydl.to_screen(
             f'Removing cache dir {cachedir} .', skip_eol=True)
         if os.path.exists(cachedir):
@@ -66,6 +66,16 @@
 except ImportError:
     requests = None
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
 try:
     import xattr  # xattr or pyxattr
 except ImportError:
@@ -81,6 +91,11 @@
 
 from . import Cryptodome
 
+try:
+    import cryptography.hazmat.primitives.ciphers
+except ImportError:
+    cryptography = None
+
 try:
     import yt_dlp_ejs
 except ImportError:
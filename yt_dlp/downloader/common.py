@@ -1,3 +1,4 @@
+import concurrent.futures
 import contextlib
 import errno
 import functools
@@ -34,6 +35,17 @@
 from ..utils._utils import _ProgressState
 
 
+def _future_result(future):
+    if os.name != 'nt':
+        return future.result()
+    # Windows does not deliver KeyboardInterrupt while waiting on a lock
+    while True:
+        try:
+            return future.result(0.1)
+        except concurrent.futures.TimeoutError:
+            continue
+
+
 class FileDownloader:
     """File Downloader class.
 
@@ -72,6 +84,10 @@ class FileDownloader:
     http_chunk_size:    Size of a chunk for chunk-based HTTP downloading. May be
                         useful for bypassing bandwidth throttling imposed by
                         a webserver (experimental)
+    http_connections:   Number of connections over which to download different
+                        ranges of a file in parallel (default: 1)
+    preallocate:        Reserve the disk space for files that are downloaded
+                        over several connections, where supported
     progress_template:  See YoutubeDL.py
     retry_sleep_functions: See YoutubeDL.py
 
@@ -1,17 +1,35 @@
+import collections
 import concurrent.futures
 import contextlib
+import functools
 import json
-import math
 import os
 import struct
+import sys
+import tempfile
+import threading
 import time
+import urllib.parse
 
-from .common import FileDownloader
+from .common import FileDownloader, _future_result
 from .http import HttpFD
-from ..aes import aes_cbc_decrypt_bytes, unpad_pkcs7
+from ..aes import _AES_BACKEND, aes_cbc_decrypt_bytes, unpad_pkcs7
 from ..networking import Request
-from ..networking.exceptions import HTTPError, IncompleteRead
-from ..utils import DownloadError, RetryManager, traverse_obj
+from ..networking.exceptions import (
+    CertificateVerifyError,
+    HTTPError,
+    IncompleteRead,
+    TransportError,
+)
+from ..utils import (
+    NO_DEFAULT,
+    ContentTooShortError,
+    DownloadError,
+    RetryManager,
+    int_or_none,
+    timeconvert,
+    traverse_obj,
+)
 from ..utils.networking import HTTPHeaderDict
 from ..utils.progress import ProgressCalculator
 
@@ -23,6 +41,118 @@ def to_screen(self, *args, **kargs):
     to_console_title = to_screen
 
 
+class FragmentScheduler:
+    """
+    A pool of worker threads shared by all fragment downloads of a YoutubeDL instance.
+
+    All tasks go into a single queue, so workers that are not needed by one
+    download (e.g. an audio track that has finished) pick up work from the others.
+    If max_per_host is given, tasks for a host that already has that many
+    running tasks are skipped over until one of them finishes.
+    CPU bound work that holds the GIL can be offloaded to process_pool.
+    """
+
+    def __init__(self, max_workers=1, max_per_host=None):
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self._cond = threading.Condition()
+        self._queue = collections.deque()
+        self._running = collections.Counter()
+        self._threads = []
+        self._idle = 0
+        self._shutdown = False
+
+    def ensure_workers(self, max_workers):
+        with self._cond:
+            self.max_workers = max(self.max_workers, max_workers)
+
+    def submit(self, fn, *args, host=None):
+        future = concurrent.futures.Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError('cannot schedule new fragments after shutdown')
+            self._queue.append((future, host, fn, args))
+            if not self._idle and len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._worker, daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+        return future
+
+    def imap(self, fn, iterable, *, lookahead, host_func=None):
+        """Like map(), but with at most `lookahead` items in progress at a time"""
+        iterator = iter(iterable)
+        pending = collections.deque()
+        try:
+            while True:
+                while len(pending) < lookahead:
+                    item = next(iterator, NO_DEFAULT)
+                    if item is NO_DEFAULT:
+                        break
+                    pending.append(self.submit(fn, item, host=host_func and host_func(item)))
+                if not pending:
+                    return
+                yield _future_result(pending.popleft())
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _next_task(self):
+        for idx, task in enumerate(self._queue):
+            if not self.max_per_host or self._running[task[1]] < self.max_per_host:
+                del self._queue[idx]
+                return task
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                self._idle += 1
+                while not (task := self._next_task()):
+                    if self._shutdown:
+                        self._idle -= 1
+                        return
+                    self._cond.wait()
+                self._idle -= 1
+                future, host, fn, args = task
+                self._running[host] += 1
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+
+            with self._cond:
+                self._running[host] -= 1
+                self._cond.notify_all()
+
+    @functools.cached_property
+    def process_pool(self):
+        """A pool of processes, or None if multiprocessing cannot be used"""
+        # Frozen executables would need multiprocessing.freeze_support() in their entry point
+        if getattr(sys, 'frozen', False):
+            return None
+        import multiprocessing
+        try:
+            # Forking a process with running threads is unsafe
+            return concurrent.futures.ProcessPoolExecutor(
+                min(self.max_workers, os.cpu_count() or 1), mp_context=multiprocessing.get_context('spawn'))
+        except (ImportError, OSError, NotImplementedError):
+            return None
+
+    def shutdown(self):
+        with self._cond:
+            self._shutdown = True
+            while self._queue:
+                self._queue.popleft()[0].cancel()
+            self._cond.notify_all()
+        if self.__dict__.get('process_pool'):
+            self.process_pool.shutdown(cancel_futures=True)
+
+
 class FragmentFD(FileDownloader):
     """
     A base file downloader class for fragmented media (e.g. f4m/m3u8 manifests).
@@ -35,7 +165,12 @@ class FragmentFD(FileDownloader):
                         Skip unavailable fragments (DASH and hlsnative only)
     keep_fragments:     Keep downloaded fragments on disk after downloading is
                         finished
-    concurrent_fragment_downloads:  The number of threads to use for native hls and dash downloads
+    concurrent_fragment_downloads:  The number of threads to use for native hls and dash downloads.
+                        The threads are shared by all the downloads of the YoutubeDL instance
+    concurrent_fragments_per_host:  Maximum number of fragments to download from the same host at once
+    fragment_buffer_size: Fragments are downloaded into memory and spooled to a temporary
+                        file only if they are larger than this size in bytes (default: 10MiB).
+                        0 to download every fragment to its own .part-FragN file
     _no_ytdl_file:      Don't use .ytdl file
 
     For each incomplete fragment download yt-dlp keeps on disk a special
@@ -108,7 +243,18 @@ def _write_ytdl_file(self, ctx):
         finally:
             frag_index_stream.close()
 
+    _DEFAULT_FRAGMENT_BUFFER_SIZE = 10 * 1024 * 1024
+
+    def _use_fragment_buffer(self, ctx):
+        return (
+            not self.params.get('keep_fragments', False)
+            and self.params.get('fragment_buffer_size', self._DEFAULT_FRAGMENT_BUFFER_SIZE) != 0
+            and isinstance(ctx['dl'], HttpFD))
+
     def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_data=None):
+        if self._use_fragment_buffer(ctx):
+            return self._download_fragment_to_buffer(ctx, frag_url, info_dict, headers, request_data)
+
         fragment_filename = '%s-Frag%d' % (ctx['tmpfilename'], ctx['fragment_index'])
         fragment_info_dict = {
             'url': frag_url,
@@ -129,7 +275,99 @@ def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_dat
         ctx['fragment_filename_sanitized'] = fragment_filename
         return True
 
+    def _download_fragment_to_buffer(self, ctx, frag_url, info_dict, headers=None, request_data=None):
+        """Download a fragment without going through a .part-FragN file
+
+        The response is read straight into a spooled buffer (stored in ctx['fragment_buffer']),
+        which only touches the disk if the fragment is larger than fragment_buffer_size.
+        Responses are always read to the end and closed, so that the connection
+        can be reused for the next fragment by request handlers that support it
+        """
+        dl = ctx['dl']
+        fragment_info_dict = {
+            'url': frag_url,
+            'http_headers': headers or info_dict.get('http_headers'),
+            'request_data': request_data,
+            'ctx_id': ctx.get('ctx_id'),
+        }
+        ctx['frag_resume_len'] = 0
+        if ctx.get('fragment_buffer') is not None:
+            # Left over from a fragment that was skipped
+            ctx.pop('fragment_buffer').close()
+
+        request = Request(
+            frag_url, request_data,
+            HTTPHeaderDict({'Accept-Encoding': 'identity'}, fragment_info_dict['http_headers']))
+        spool_size = self.params.get('fragment_buffer_size', self._DEFAULT_FRAGMENT_BUFFER_SIZE)
+        spool_dir = None if ctx['tmpfilename'] == '-' else os.path.dirname(os.path.abspath(ctx['tmpfilename']))
+
+        for retry in RetryManager(self.params.get('retries'), dl.report_retry):
+            buffer = tempfile.SpooledTemporaryFile(max_size=spool_size, dir=spool_dir)
+            try:
+                with contextlib.closing(self.ydl.urlopen(request)) as response:
+                    self._read_fragment_response(dl, response, buffer, fragment_info_dict)
+                    last_modified = response.headers.get('Last-Modified')
+            except (TransportError, ContentTooShortError) as err:
+                buffer.close()
+                if isinstance(err, CertificateVerifyError):
+                    raise
+                retry.error = err
+                continue
+            except BaseException:
+                buffer.close()
+                raise
+            if self.params.get('updatetime') and last_modified:
+                ctx['fragment_filetime'] = timeconvert(last_modified)
+            buffer.seek(0)
+            ctx['fragment_buffer'] = buffer
+            return True
+        return False
+
+    def _read_fragment_response(self, dl, response, buffer, fragment_info_dict):
+        total_bytes = int_or_none(response.headers.get('Content-Length'))
+        byte_counter = 0
+        block_size = self.params.get('buffersize', 1024)
+        start = before = time.time()
+        now = None
+        while True:
+            data_block = response.read(block_size)
+            if not data_block:
+                break
+            buffer.write(data_block)
+            byte_counter += len(data_block)
+
+            dl.slow_down(start, now, byte_counter)
+            now = time.time()
+            if not self.params.get('noresizebuffer', False):
+                block_size = dl.best_block_size(now - before, len(data_block))
+            before = now
+
+            dl._hook_progress({
+                'status': 'downloading',
+                'downloaded_bytes': byte_counter,
+                'total_bytes': total_bytes,
+                'filename': fragment_info_dict['url'],
+                'speed': dl.calc_speed(start, now, byte_counter),
+                'elapsed': now - start,
+                'ctx_id': fragment_info_dict['ctx_id'],
+            }, fragment_info_dict)
+
+        if total_bytes is not None and byte_counter != total_bytes:
+            raise ContentTooShortError(byte_counter, total_bytes)
+
+        dl._hook_progress({
+            'status': 'finished',
+            'downloaded_bytes': byte_counter,
+            'total_bytes': byte_counter,
+            'filename': fragment_info_dict['url'],
+            'elapsed': time.time() - start,
+            'ctx_id': fragment_info_dict['ctx_id'],
+        }, fragment_info_dict)
+
     def _read_fragment(self, ctx):
+        if ctx.get('fragment_buffer') is not None:
+            ctx['fragment_buffer'].seek(0)
+            return ctx['fragment_buffer'].read()
         if not ctx.get('fragment_filename_sanitized'):
             return None
         try:
@@ -150,9 +388,12 @@ def _append_fragment(self, ctx, frag_content):
         finally:
             if self.__do_ytdl_file(ctx):
                 self._write_ytdl_file(ctx)
-            if not self.params.get('keep_fragments', False):
-                self.try_remove(ctx['fragment_filename_sanitized'])
-            del ctx['fragment_filename_sanitized']
+            if ctx.get('fragment_buffer') is not None:
+                ctx.pop('fragment_buffer').close()
+            else:
+                if not self.params.get('keep_fragments', False):
+                    self.try_remove(ctx['fragment_filename_sanitized'])
+                del ctx['fragment_filename_sanitized']
 
     def _prepare_frag_download(self, ctx):
         if not ctx.setdefault('live', False):
@@ -338,13 +579,27 @@ def _prepare_external_frag_download(self, ctx):
             'fragment_index': 0,
         })
 
-    def decrypter(self, info_dict):
+    def decrypter(self, info_dict, *, executor=None):
+        """
+        @param executor   An executor to decrypt the fragments on, instead of the calling thread
+        """
         _key_cache = {}
+        _key_lock = threading.Lock()
 
         def _get_key(url):
-            if url not in _key_cache:
-                _key_cache[url] = self.ydl.urlopen(self._prepare_url(info_dict, url)).read()
-            return _key_cache[url]
+            # Fragments may be decrypted by several threads at once
+            with _key_lock:
+                if url not in _key_cache:
+                    _key_cache[url] = self.ydl.urlopen(self._prepare_url(info_dict, url)).read()
+                return _key_cache[url]
+
+        def _decrypt(data, key, iv):
+            if executor:
+                try:
+                    return executor.submit(aes_cbc_decrypt_bytes, data, key, iv).result()
+                except concurrent.futures.BrokenExecutor:
+                    pass
+            return aes_cbc_decrypt_bytes(data, key, iv)
 
         def decrypt_fragment(fragment, frag_content):
             if frag_content is None:
@@ -360,7 +615,7 @@ def decrypt_fragment(fragment, frag_content):
             # not what it decrypts to.
             if self.params.get('test', False):
                 return frag_content
-            return unpad_pkcs7(aes_cbc_decrypt_bytes(frag_content, decrypt_info['KEY'], iv))
+            return unpad_pkcs7(_decrypt(frag_content, decrypt_info['KEY'], iv))
 
         return decrypt_fragment
 
@@ -373,34 +628,15 @@ def download_and_append_fragments_multiple(self, *args, **kwargs):
         max_progress = len(args)
         if max_progress == 1:
             return self.download_and_append_fragments(*args[0], **kwargs)
-        max_workers = self.params.get('concurrent_fragment_downloads', 1)
         if max_progress > 1:
             self._prepare_multiline_status(max_progress)
         is_live = any(traverse_obj(args, (..., 2, 'is_live')))
 
-        def thread_func(idx, ctx, fragments, info_dict, tpe):
+        def thread_func(idx, ctx, fragments, info_dict):
             ctx['max_progress'] = max_progress
             ctx['progress_idx'] = idx
             return self.download_and_append_fragments(
-                ctx, fragments, info_dict, **kwargs, tpe=tpe, interrupt_trigger=interrupt_trigger)
-
-        class FTPE(concurrent.futures.ThreadPoolExecutor):
-            # has to stop this or it's going to wait on the worker thread itself
-            def __exit__(self, exc_type, exc_val, exc_tb):
-                pass
-
-        if os.name == 'nt':
-            def future_result(future):
-                while True:
-                    try:
-                        return future.result(0.1)
-                    except KeyboardInterrupt:
-                        raise
-                    except concurrent.futures.TimeoutError:
-                        continue
-        else:
-            def future_result(future):
-                return future.result()
+                ctx, fragments, info_dict, **kwargs, interrupt_trigger=interrupt_trigger)
 
         def interrupt_trigger_iter(fg):
             for f in fg:
@@ -408,20 +644,22 @@ def interrupt_trigger_iter(fg):
                     break
                 yield f
 
-        spins = []
-        for idx, (ctx, fragments, info_dict) in enumerate(args):
-            tpe = FTPE(math.ceil(max_workers / max_progress))
-            job = tpe.submit(thread_func, idx, ctx, interrupt_trigger_iter(fragments), info_dict, tpe)
-            spins.append((tpe, job))
+        # These threads only append the fragments; the downloads themselves
+        # are done by the shared FragmentScheduler
+        tpe = concurrent.futures.ThreadPoolExecutor(max_progress)
+        jobs = [
+            tpe.submit(thread_func, idx, ctx, interrupt_trigger_iter(fragments), info_dict)
+            for idx, (ctx, fragments, info_dict) in enumerate(args)]
 
         result = True
-        for tpe, job in spins:
-            try:
-                result = result and future_result(job)
-            except KeyboardInterrupt:
-                interrupt_trigger[0] = False
-            finally:
-                tpe.shutdown(wait=True)
+        try:
+            for job in jobs:
+                try:
+                    result = result and _future_result(job)
+                except KeyboardInterrupt:
+                    interrupt_trigger[0] = False
+        finally:
+            tpe.shutdown(wait=True)
         if not interrupt_trigger[0] and not is_live:
             raise KeyboardInterrupt
         # we expect the user wants to stop and DO WANT the preceding postprocessors to run;
@@ -432,7 +670,7 @@ def download_and_append_fragments(
             self, ctx, fragments, info_dict, *, is_fatal=(lambda idx: False),
             pack_func=(lambda content, idx: content), finish_func=None,
             tpe=None, interrupt_trigger=(True, )):
-
+        # tpe is unused and only kept for compatibility; see FragmentScheduler
         if not self.params.get('skip_unavailable_fragments', True):
             is_fatal = lambda _: True
 
@@ -471,6 +709,8 @@ def error_callback(err, count, retries):
 
         def append_fragment(frag_content, frag_index, ctx):
             if frag_content:
+                # The progress hook counts the fragments, which is not their index for live streams
+                ctx['fragment_index'] = frag_index
                 self._append_fragment(ctx, pack_func(frag_content, frag_index))
             elif not is_fatal(frag_index - 1):
                 self.report_skip_fragment(frag_index, 'fragment not found')
@@ -480,32 +720,52 @@ def append_fragment(frag_content, frag_index, ctx):
                 return False
             return True
 
-        decrypt_fragment = self.decrypter(info_dict)
-
-        max_workers = math.ceil(
-            self.params.get('concurrent_fragment_downloads', 1) / ctx.get('max_progress', 1))
+        max_workers = self.params.get('concurrent_fragment_downloads', 1)
         if max_workers > 1:
+            scheduler = self.ydl._fragment_scheduler
+            scheduler.ensure_workers(max_workers)
+            # Encrypted fragments are decrypted by the workers, so that decryption scales with them
+            # instead of holding up the appending. The native AES implementation holds the GIL
+            # the whole time, so it is run on processes instead
+            decrypt_fragment = self.decrypter(
+                info_dict, executor=scheduler.process_pool if _AES_BACKEND == 'native' else None)
+
             def _download_fragment(fragment):
                 ctx_copy = ctx.copy()
+                # The buffer may belong to a fragment that is being appended by the main thread
+                ctx_copy.pop('fragment_buffer', None)
                 download_fragment(fragment, ctx_copy)
-                return fragment, fragment['frag_index'], ctx_copy.get('fragment_filename_sanitized')
-
-            with tpe or concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
-                try:
-                    for fragment, frag_index, frag_filename in pool.map(_download_fragment, fragments):
-                        ctx.update({
-                            'fragment_filename_sanitized': frag_filename,
-                            'fragment_index': frag_index,
-                        })
-                        if not append_fragment(decrypt_fragment(fragment, self._read_fragment(ctx)), frag_index, ctx):
-                            return False
-                except KeyboardInterrupt:
-                    self._finish_multiline_status()
-                    self.report_error(
-                        'Interrupted by user. Waiting for all threads to shutdown...', is_error=False, tb=False)
-                    pool.shutdown(wait=False)
-                    raise
+                frag_content = NO_DEFAULT
+                if traverse_obj(fragment, ('decrypt_info', 'METHOD')) == 'AES-128':
+                    frag_content = decrypt_fragment(fragment, self._read_fragment(ctx_copy))
+                return (fragment, fragment['frag_index'], ctx_copy.get('fragment_filename_sanitized'),
+                        ctx_copy.get('fragment_buffer'), frag_content)
+
+            # Look further ahead than the number of workers so that
+            # a single slow fragment does not stall the whole pool
+            results = scheduler.imap(
+                _download_fragment, fragments, lookahead=2 * max_workers,
+                host_func=lambda fragment: urllib.parse.urlparse(fragment['url']).netloc)
+            try:
+                for fragment, frag_index, frag_filename, frag_buffer, frag_content in results:
+                    ctx.update({
+                        'fragment_filename_sanitized': frag_filename,
+                        'fragment_buffer': frag_buffer,
+                        'fragment_index': frag_index,
+                    })
+                    if frag_content is NO_DEFAULT:
+                        frag_content = decrypt_fragment(fragment, self._read_fragment(ctx))
+                    if not append_fragment(frag_content, frag_index, ctx):
+                        return False
+            except KeyboardInterrupt:
+                self._finish_multiline_status()
+                self.report_error(
+                    'Interrupted by user. Waiting for all threads to shutdown...', is_error=False, tb=False)
+                raise
+            finally:
+                results.close()
         else:
+            decrypt_fragment = self.decrypter(info_dict)
             for fragment in fragments:
                 if not interrupt_trigger[0]:
                     break
@@ -1,16 +1,20 @@
 import binascii
 import io
+import itertools
 import re
+import time
 import urllib.parse
 
 from . import get_suitable_downloader
 from .external import FFmpegFD
 from .fragment import FragmentFD
 from .. import webvtt
-from ..dependencies import Cryptodome
+from ..aes import _AES_BACKEND
+from ..m3u8 import parse_m3u8
+from ..networking.exceptions import HTTPError, TransportError
 from ..utils import (
+    RetryManager,
     bug_reports_message,
-    parse_m3u8_attributes,
     remove_start,
     traverse_obj,
     update_url_query,
@@ -27,6 +31,8 @@ class HlsFD(FragmentFD):
     """
 
     FD_NAME = 'hlsnative'
+    # Number of consecutive refreshes without new fragments after which a live recording is stopped
+    _LIVE_MAX_STALLED_REFRESHES = 10
 
     @staticmethod
     def _has_drm(manifest):  # TODO: https://github.com/yt-dlp/yt-dlp/pull/5039
@@ -64,7 +70,6 @@ def can_download(cls, manifest, info_dict, allow_unplayable_formats=False):
             ]
 
         def check_results():
-            yield not info_dict.get('is_live')
             for feature in UNSUPPORTED_FEATURES:
                 yield not re.search(feature, manifest)
             if not allow_unplayable_formats:
@@ -94,23 +99,19 @@ def real_download(self, filename, info_dict):
         can_download, message = self.can_download(s, info_dict, self.params.get('allow_unplayable_formats')), None
         if can_download:
             has_ffmpeg = FFmpegFD.available()
-            if not Cryptodome.AES and '#EXT-X-KEY:METHOD=AES-128' in s:
-                # Even if pycryptodomex isn't available, force HlsFD for m3u8s that won't work with ffmpeg
+            if _AES_BACKEND == 'native' and '#EXT-X-KEY:METHOD=AES-128' in s:
+                # Even if no accelerated AES implementation is available, force HlsFD for m3u8s that won't work with ffmpeg
                 ffmpeg_can_dl = not traverse_obj(info_dict, ((
                     'extra_param_to_segment_url', 'extra_param_to_key_url',
                     'hls_media_playlist_data', ('hls_aes', ('uri', 'key', 'iv')),
                 ), any))
                 message = 'The stream has AES-128 encryption and {} available'.format(
-                    'neither ffmpeg nor pycryptodomex are' if ffmpeg_can_dl and not has_ffmpeg else
-                    'pycryptodomex is not')
+                    'neither ffmpeg nor pycryptodomex/cryptography are' if ffmpeg_can_dl and not has_ffmpeg else
+                    'neither pycryptodomex nor cryptography is')
                 if has_ffmpeg and ffmpeg_can_dl:
                     can_download = False
                 else:
                     message += '; decryption will be performed natively, but will be extremely slow'
-            elif info_dict.get('extractor_key') == 'Generic' and re.search(r'(?m)#EXT-X-MEDIA-SEQUENCE:(?!0$)', s):
-                install_ffmpeg = '' if has_ffmpeg else 'install ffmpeg and '
-                message = ('Live HLS streams are not supported by the native downloader. If this is a livestream, '
-                           f'please {install_ffmpeg}add "--downloader ffmpeg --hls-use-mpegts" to your command')
         if not can_download:
             if self._has_drm(s) and not self.params.get('allow_unplayable_formats'):
                 if info_dict.get('has_drm') and self.params.get('test'):
@@ -127,9 +128,18 @@ def real_download(self, filename, info_dict):
         elif message:
             self.report_warning(message)
 
+        playlist = parse_m3u8(s)
+        # Media playlists are only updated while they have no end tag
+        is_live = not playlist.end_list and bool(info_dict.get('is_live') or (
+            info_dict.get('extractor_key') == 'Generic' and playlist.media_sequence != 0))
+        if is_live:
+            self.to_screen(f'[{self.FD_NAME}] Recording live stream; the playlist will be refreshed until it ends')
+
         is_webvtt = info_dict['ext'] == 'vtt'
         if is_webvtt:
             real_downloader = None  # Packing the fragments is not currently supported for external downloader
+        elif is_live:
+            real_downloader = None  # The fragments are not known in advance
         else:
             real_downloader = get_suitable_downloader(
                 info_dict, self.params, None, protocol='m3u8_frag_urls', to_stdout=(filename == '-'))
@@ -138,38 +148,15 @@ def real_download(self, filename, info_dict):
         if real_downloader:
             self.to_screen(f'[{self.FD_NAME}] Fragment downloads will be delegated to {real_downloader.get_basename()}')
 
-        def is_ad_fragment_start(s):
-            return ((s.startswith('#ANVATO-SEGMENT-INFO') and 'type=ad' in s)
-                    or (s.startswith('#UPLYNK-SEGMENT') and s.endswith(',ad')))
-
-        def is_ad_fragment_end(s):
-            return ((s.startswith('#ANVATO-SEGMENT-INFO') and 'type=master' in s)
-                    or (s.startswith('#UPLYNK-SEGMENT') and s.endswith(',segment')))
-
-        fragments = []
-
-        media_frags = 0
-        ad_frags = 0
-        ad_frag_next = False
-        for line in s.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            if line.startswith('#'):
-                if is_ad_fragment_start(line):
-                    ad_frag_next = True
-                elif is_ad_fragment_end(line):
-                    ad_frag_next = False
-                continue
-            if ad_frag_next:
-                ad_frags += 1
-                continue
-            media_frags += 1
+        ad_frags = sum(segment.is_ad for segment in playlist.segments)
+        media_frags = len(playlist.segments) - ad_frags
 
         ctx = {
             'filename': filename,
-            'total_frags': media_frags,
+            'total_frags': None if is_live else media_frags,
             'ad_frags': ad_frags,
+            # Not True, so that the .ytdl file is kept and the recording can be resumed
+            'live': 'hls_live' if is_live else False,
         }
 
         if real_downloader:
@@ -179,128 +166,17 @@ def is_ad_fragment_end(s):
 
         extra_state = ctx.setdefault('extra_state', {})
 
-        format_index = info_dict.get('format_index')
-        extra_segment_query = None
-        if extra_param_to_segment_url := info_dict.get('extra_param_to_segment_url'):
-            extra_segment_query = urllib.parse.parse_qs(extra_param_to_segment_url)
-        extra_key_query = None
-        if extra_param_to_key_url := info_dict.get('extra_param_to_key_url'):
-            extra_key_query = urllib.parse.parse_qs(extra_param_to_key_url)
-        i = 0
-        media_sequence = 0
-        decrypt_info = {'METHOD': 'NONE'}
-        external_aes_key = traverse_obj(info_dict, ('hls_aes', 'key'))
-        if external_aes_key:
-            external_aes_key = binascii.unhexlify(remove_start(external_aes_key, '0x'))
-            assert len(external_aes_key) in (16, 24, 32), 'Invalid length for HLS AES-128 key'
-        external_aes_iv = traverse_obj(info_dict, ('hls_aes', 'iv'))
-        if external_aes_iv:
-            external_aes_iv = binascii.unhexlify(remove_start(external_aes_iv, '0x').zfill(32))
-        byte_range = {}
-        byte_range_offset = 0
-        discontinuity_count = 0
-        frag_index = 0
-        ad_frag_next = False
-        for line in s.splitlines():
-            line = line.strip()
-            if line:
-                if not line.startswith('#'):
-                    if format_index is not None and discontinuity_count != format_index:
-                        continue
-                    if ad_frag_next:
-                        continue
-                    frag_index += 1
-                    if frag_index <= ctx['fragment_index']:
-                        continue
-                    frag_url = urljoin(man_url, line)
-                    if extra_segment_query:
-                        frag_url = update_url_query(frag_url, extra_segment_query)
-
-                    fragments.append({
-                        'frag_index': frag_index,
-                        'url': frag_url,
-                        'decrypt_info': decrypt_info,
-                        'byte_range': byte_range,
-                        'media_sequence': media_sequence,
-                    })
-                    media_sequence += 1
-
-                    # If the byte_range is truthy, reset it after appending a fragment that uses it
-                    if byte_range:
-                        byte_range_offset = byte_range['end']
-                        byte_range = {}
-
-                elif line.startswith('#EXT-X-MAP'):
-                    if format_index is not None and discontinuity_count != format_index:
-                        continue
-                    if frag_index > 0:
-                        self.report_error(
-                            'Initialization fragment found after media fragments, unable to download')
-                        return False
-                    frag_index += 1
-                    map_info = parse_m3u8_attributes(line[11:])
-                    frag_url = urljoin(man_url, map_info.get('URI'))
-                    if extra_segment_query:
-                        frag_url = update_url_query(frag_url, extra_segment_query)
-
-                    map_byte_range = {}
-
-                    if map_info.get('BYTERANGE'):
-                        splitted_byte_range = map_info.get('BYTERANGE').split('@')
-                        sub_range_start = int(splitted_byte_range[1]) if len(splitted_byte_range) == 2 else 0
-                        map_byte_range = {
-                            'start': sub_range_start,
-                            'end': sub_range_start + int(splitted_byte_range[0]),
-                        }
-
-                    fragments.append({
-                        'frag_index': frag_index,
-                        'url': frag_url,
-                        'decrypt_info': decrypt_info,
-                        'byte_range': map_byte_range,
-                        'media_sequence': media_sequence,
-                    })
-                    media_sequence += 1
-
-                elif line.startswith('#EXT-X-KEY'):
-                    decrypt_url = decrypt_info.get('URI')
-                    decrypt_info = parse_m3u8_attributes(line[11:])
-                    if decrypt_info['METHOD'] == 'AES-128':
-                        if external_aes_iv:
-                            decrypt_info['IV'] = external_aes_iv
-                        elif 'IV' in decrypt_info:
-                            decrypt_info['IV'] = binascii.unhexlify(decrypt_info['IV'][2:].zfill(32))
-                        if external_aes_key:
-                            decrypt_info['KEY'] = external_aes_key
-                        else:
-                            decrypt_info['URI'] = urljoin(man_url, decrypt_info['URI'])
-                            if extra_key_query or extra_segment_query:
-                                # Fall back to extra_segment_query to key for backwards compat
-                                decrypt_info['URI'] = update_url_query(
-                                    decrypt_info['URI'], extra_key_query or extra_segment_query)
-                            if decrypt_url != decrypt_info['URI']:
-                                decrypt_info['KEY'] = None
-
-                elif line.startswith('#EXT-X-MEDIA-SEQUENCE'):
-                    media_sequence = int(line[22:])
-                elif line.startswith('#EXT-X-BYTERANGE'):
-                    splitted_byte_range = line[17:].split('@')
-                    sub_range_start = int(splitted_byte_range[1]) if len(splitted_byte_range) == 2 else byte_range_offset
-                    byte_range = {
-                        'start': sub_range_start,
-                        'end': sub_range_start + int(splitted_byte_range[0]),
-                    }
-                elif is_ad_fragment_start(line):
-                    ad_frag_next = True
-                elif is_ad_fragment_end(line):
-                    ad_frag_next = False
-                elif line.startswith('#EXT-X-DISCONTINUITY'):
-                    discontinuity_count += 1
-                i += 1
+        if is_live:
+            fragments = self._live_fragments(playlist, man_url, ctx, info_dict)
+        else:
+            fragments = self._build_fragments(playlist, man_url, info_dict, info_dict.get('format_index'))
+            if fragments is None:
+                return False
+            fragments = [fragment for fragment in fragments if fragment['frag_index'] > ctx['fragment_index']]
 
         # We only download the first fragment during the test
         if self.params.get('test', False):
-            fragments = fragments[:1]
+            fragments = list(itertools.islice(fragments, 1))
 
         if real_downloader:
             info_dict['fragments'] = fragments
@@ -400,10 +276,174 @@ def fin_fragments():
 
                 return output.getvalue().encode()
 
-            if len(fragments) == 1:
+            if not is_live and len(fragments) == 1:
                 self.download_and_append_fragments(ctx, fragments, info_dict)
             else:
                 self.download_and_append_fragments(
                     ctx, fragments, info_dict, pack_func=pack_fragment, finish_func=fin_fragments)
         else:
             return self.download_and_append_fragments(ctx, fragments, info_dict)
+
+    def _build_fragments(self, playlist, man_url, info_dict, format_index=None, live=False):
+        """
+        Build the fragments to download from a parsed media playlist
+
+        @param format_index The discontinuity to download, as split by the extractor
+        @param live         Index the fragments by their media sequence number,
+                            so that they can be matched between playlist refreshes
+        @returns            A list of fragment dicts, or None if the playlist cannot be downloaded
+        """
+        extra_segment_query = None
+        if extra_param_to_segment_url := info_dict.get('extra_param_to_segment_url'):
+            extra_segment_query = urllib.parse.parse_qs(extra_param_to_segment_url)
+        extra_key_query = None
+        if extra_param_to_key_url := info_dict.get('extra_param_to_key_url'):
+            extra_key_query = urllib.parse.parse_qs(extra_param_to_key_url)
+        external_aes_key = traverse_obj(info_dict, ('hls_aes', 'key'))
+        if external_aes_key:
+            external_aes_key = binascii.unhexlify(remove_start(external_aes_key, '0x'))
+            assert len(external_aes_key) in (16, 24, 32), 'Invalid length for HLS AES-128 key'
+        external_aes_iv = traverse_obj(info_dict, ('hls_aes', 'iv'))
+        if external_aes_iv:
+            external_aes_iv = binascii.unhexlify(remove_start(external_aes_iv, '0x').zfill(32))
+
+        # Resolving the segment URIs is most of the work for large playlists, so plain relative paths
+        # are appended to the directory of the manifest and repeated URIs (i.e. byte ranges) are reused
+        base_dir = urljoin(man_url, '.')
+        last_uri = last_url = None
+
+        def frag_url(uri):
+            nonlocal last_uri, last_url
+            if uri == last_uri:
+                return last_url
+            if base_dir and uri[0] not in './?#' and '/.' not in uri and ':' not in uri:
+                url = base_dir + uri
+            else:
+                url = urljoin(man_url, uri)
+            if extra_segment_query:
+                url = update_url_query(url, extra_segment_query)
+            last_uri, last_url = uri, url
+            return url
+
+        # The fragments that use the same key share its decrypt_info so that the key is only fetched once
+        no_decrypt_info = {'METHOD': 'NONE'}
+        decrypt_infos = {}
+
+        def get_decrypt_info(key):
+            if not key:
+                return no_decrypt_info
+            decrypt_info = decrypt_infos.get(key)
+            if decrypt_info is not None:
+                return decrypt_info
+            decrypt_info = decrypt_infos[key] = {'METHOD': key.method, 'URI': key.uri}
+            if key.method != 'AES-128':
+                return decrypt_info
+            if external_aes_iv:
+                decrypt_info['IV'] = external_aes_iv
+            elif key.iv:
+                decrypt_info['IV'] = key.iv
+            if external_aes_key:
+                decrypt_info['KEY'] = external_aes_key
+            else:
+                decrypt_info['URI'] = urljoin(man_url, key.uri)
+                if extra_key_query or extra_segment_query:
+                    # Fall back to extra_segment_query to key for backwards compat
+                    decrypt_info['URI'] = update_url_query(
+                        decrypt_info['URI'], extra_key_query or extra_segment_query)
+            return decrypt_info
+
+        def to_byte_range(byte_range):
+            return {'start': byte_range[0], 'end': byte_range[1]} if byte_range else {}
+
+        fragments = []
+        frag_index = 0
+        # Used for the default IV; the initialization section counts towards it for backwards compat
+        media_sequence = playlist.media_sequence
+        init_section = None
+        for segment in playlist.segments:
+            if segment.is_ad or (format_index is not None and segment.discontinuity != format_index):
+                continue
+            if segment.init_section is not init_section:
+                init_section = segment.init_section
+                if frag_index > 0:
+                    self.report_error(
+                        'Initialization fragment found after media fragments, unable to download')
+                    return None
+                frag_index = segment.media_sequence + 1 if live else frag_index + 1
+                fragments.append({
+                    'frag_index': frag_index,
+                    'url': frag_url(init_section.uri),
+                    'decrypt_info': get_decrypt_info(init_section.key),
+                    'byte_range': to_byte_range(init_section.byte_range),
+                    'media_sequence': media_sequence,
+                    'is_init': True,
+                })
+                media_sequence += 1
+
+            frag_index = segment.media_sequence + 1 + bool(init_section) if live else frag_index + 1
+            fragments.append({
+                'frag_index': frag_index,
+                'url': frag_url(segment.uri),
+                'decrypt_info': get_decrypt_info(segment.key),
+                'byte_range': to_byte_range(segment.byte_range),
+                'media_sequence': media_sequence,
+            })
+            media_sequence += 1
+
+        return fragments
+
+    def _fetch_live_playlist(self, man_url, info_dict):
+        def error_callback(err, count, retries):
+            self.report_retry(err, count, retries, fatal=False)
+
+        for retry in RetryManager(self.params.get('fragment_retries'), error_callback):
+            try:
+                urlh = self.ydl.urlopen(self._prepare_url(info_dict, man_url))
+                return urlh.read().decode('utf-8', 'ignore'), urlh.url
+            except (HTTPError, TransportError) as err:
+                retry.error = err
+        return None, man_url
+
+    def _live_fragments(self, playlist, man_url, ctx, info_dict):
+        """
+        Yield the fragments of a live media playlist as they are added to it
+
+        The playlist is refreshed as per RFC 8216 section 6.3.4 until it ends or stops being updated.
+        Fragments are identified by their media sequence number, which is also used as their index
+        so that a recording that is resumed skips the fragments that have already been downloaded
+        """
+        last_index = ctx['fragment_index']
+        stalled_refreshes = 0
+        while True:
+            refreshed_at = time.monotonic()
+            fragments = self._build_fragments(playlist, man_url, info_dict, live=True)
+            if fragments is None:
+                return
+            new_fragments = False
+            for fragment in fragments:
+                if fragment['frag_index'] <= last_index or (fragment.get('is_init') and last_index):
+                    continue
+                new_fragments = True
+                last_index = fragment['frag_index']
+                yield fragment
+
+            if playlist.end_list:
+                return
+            stalled_refreshes = 0 if new_fragments else stalled_refreshes + 1
+            if stalled_refreshes > self._LIVE_MAX_STALLED_REFRESHES:
+                self.report_warning('The live playlist is no longer being updated; stopping the recording')
+                return
+
+            target_duration = playlist.target_duration or 10
+            # Wait for the target duration after a change to the playlist, and half of it otherwise
+            interval = target_duration if new_fragments else target_duration / 2
+            try:
+                time.sleep(max(0, refreshed_at + interval - time.monotonic()))
+                s, man_url = self._fetch_live_playlist(man_url, info_dict)
+            except KeyboardInterrupt:
+                self.to_screen(f'[{self.FD_NAME}] Interrupted by user; finishing the recording')
+                return
+            if s is None:
+                self.report_warning('Unable to refresh the live playlist; stopping the recording')
+                return
+            playlist = parse_m3u8(s)
@@ -1,8 +1,12 @@
+import concurrent.futures
+import contextlib
+import json
 import os
 import random
+import threading
 import time
 
-from .common import FileDownloader
+from .common import FileDownloader, _future_result
 from ..networking import Request
 from ..networking.exceptions import (
     CertificateVerifyError,
@@ -16,11 +20,67 @@
     int_or_none,
     parse_http_range,
     try_call,
+    write_json_file,
 )
 from ..utils.networking import HTTPHeaderDict
+from ..utils.progress import ProgressCalculator
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _missing_ranges(total, completed):
+    missing, pos = [], 0
+    for start, end in _merge_ranges(completed):
+        if start > pos:
+            missing.append((pos, start))
+        pos = max(pos, end)
+    if pos < total:
+        missing.append((pos, total))
+    return missing
+
+
+class _WriteBuffer:
+    """A reusable buffer that responses are read into, and which is written out only once it is full"""
+
+    def __init__(self, size):
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self.pending = 0
+
+    def reserve(self, size, write):
+        """Make room for `size` more bytes, writing out the buffered data if needed"""
+        if len(self._buffer) - self.pending < size:
+            self.flush(write)
+            if size > len(self._buffer):
+                self._buffer = bytearray(size)
+                self._view = memoryview(self._buffer)
+
+    def readinto(self, response, size):
+        """Read up to `size` bytes from the response; room must have been reserved for them"""
+        read = response.readinto(self._view[self.pending:self.pending + size])
+        self.pending += read
+        return read
+
+    def flush(self, write):
+        if self.pending:
+            write(self._view[:self.pending])
+            self.pending = 0
 
 
 class HttpFD(FileDownloader):
+    # Do not split the file into ranges smaller than this
+    _MIN_RANGE_SIZE = 1024 * 1024
+    # Data is written to the file in blocks of this size
+    _WRITE_BUFFER_SIZE = 1024 * 1024
+
     def real_download(self, filename, info_dict):
         url = info_dict['url']
         request_data = info_dict.get('request_data', None)
@@ -56,6 +116,27 @@ class DownloadContext(dict):
         # parse given Range
         req_start, req_end, _ = parse_http_range(headers.get('Range'))
 
+        connections = self.params.get('http_connections') or 1
+        can_download_ranges = not is_test and ctx.tmpfilename != '-' and req_start is None and req_end is None
+        # The temporary file of an interrupted parallel download is preallocated,
+        # so it can only be resumed from the ranges recorded in the .ytdl file
+        has_range_map = (
+            self.params.get('continuedl', True) and os.path.isfile(ctx.tmpfilename)
+            and self._read_range_map(ctx)[0] is not None)
+        if can_download_ranges and (connections > 1 or has_range_map):
+            def make_request(start, end):
+                request = Request(url, request_data, headers, extensions=request_extensions)
+                request.headers['Range'] = f'bytes={start}-{end}'
+                return request
+
+            result = self._download_ranges(ctx, info_dict, make_request, connections, chunk_size)
+            if result is not None:
+                return result
+        elif has_range_map:
+            self.report_unable_to_resume()
+            self.try_remove(ctx.tmpfilename)
+            self.try_remove(self.ytdl_filename(ctx.filename))
+
         if self.params.get('continuedl', True):
             # Establish possible resume length
             if os.path.isfile(ctx.tmpfilename):
@@ -191,8 +272,12 @@ def establish_connection():
             except TransportError as err:
                 raise RetryDownload(err)
 
+        ctx.buffer = _WriteBuffer(self._WRITE_BUFFER_SIZE)
+
         def close_stream():
             if ctx.stream is not None:
+                with contextlib.suppress(OSError):
+                    ctx.buffer.flush(ctx.stream.write)
                 if ctx.tmpfilename != '-':
                     ctx.stream.close()
                 ctx.stream = None
@@ -245,17 +330,31 @@ def retry(e):
                         ctx.resume_len = 0
                 raise RetryDownload(e)
 
+            def write(data):
+                ctx.stream.write(data)
+
+            def report_write_error(err):
+                self.to_stderr('\n')
+                self.report_error(f'unable to write data: {err}')
+                return False
+
             while True:
+                read_size = block_size if not is_test else min(block_size, data_len - byte_counter)
+                try:
+                    ctx.buffer.reserve(read_size, write)
+                except OSError as err:
+                    return report_write_error(err)
+
                 try:
-                    # Download and write
-                    data_block = ctx.data.read(block_size if not is_test else min(block_size, data_len - byte_counter))
+                    # Download into the buffer, which is written out once full
+                    read_size = ctx.buffer.readinto(ctx.data, read_size)
                 except TransportError as err:
                     retry(err)
 
-                byte_counter += len(data_block)
+                byte_counter += read_size
 
                 # exit loop when download is finished
-                if len(data_block) == 0:
+                if read_size == 0:
                     break
 
                 # Open destination file just in time
@@ -270,12 +369,12 @@ def retry(e):
                         self.report_error(f'unable to open for writing: {err}')
                         return False
 
-                try:
-                    ctx.stream.write(data_block)
-                except OSError as err:
-                    self.to_stderr('\n')
-                    self.report_error(f'unable to write data: {err}')
-                    return False
+                if ctx.tmpfilename == '-':
+                    # Do not delay the data for the consumer of the output
+                    try:
+                        ctx.buffer.flush(write)
+                    except OSError as err:
+                        return report_write_error(err)
 
                 # Apply rate limit
                 self.slow_down(start, now, byte_counter - ctx.resume_len)
@@ -286,7 +385,7 @@ def retry(e):
 
                 # Adjust block size
                 if not self.params.get('noresizebuffer', False):
-                    block_size = self.best_block_size(after - before, len(data_block))
+                    block_size = self.best_block_size(after - before, read_size)
 
                 before = after
 
@@ -318,8 +417,7 @@ def retry(e):
                     if ctx.throttle_start is None:
                         ctx.throttle_start = now
                     elif now - ctx.throttle_start > 3:
-                        if ctx.stream is not None and ctx.tmpfilename != '-':
-                            ctx.stream.close()
+                        close_stream()
                         raise ThrottledDownload
                 elif speed:
                     ctx.throttle_start = None
@@ -329,6 +427,11 @@ def retry(e):
                 self.report_error('Did not get any data blocks')
                 return False
 
+            try:
+                ctx.buffer.flush(write)
+            except OSError as err:
+                return report_write_error(err)
+
             if not is_test and ctx.chunk_size and ctx.content_len is not None and byte_counter < ctx.content_len:
                 ctx.resume_len = byte_counter
                 raise NextFragment
@@ -374,3 +477,247 @@ def retry(e):
                 close_stream()
                 raise
         return False
+
+    def _preallocate(self, stream, size):
+        if self.params.get('preallocate') and hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(stream.fileno(), 0, size)
+                return
+            except OSError as err:
+                self.write_debug(f'Unable to preallocate {size} bytes: {err}')
+        # Creates a sparse file on most filesystems
+        stream.truncate(size)
+
+    def _read_range_map(self, ctx):
+        """Return the total size and the completed ranges recorded in the .ytdl file"""
+        try:
+            with open(self.ytdl_filename(ctx.filename), encoding='utf-8') as f:
+                state = json.load(f)['downloader']['http_ranges']
+            return int(state['total']), [(int(start), int(end)) for start, end in state['completed']]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None, []
+
+    def _write_range_map(self, ctx, total, completed):
+        write_json_file({'downloader': {'http_ranges': {
+            'total': total,
+            'completed': _merge_ranges(completed),
+        }}}, self.ytdl_filename(ctx.filename))
+
+    def _download_ranges(self, ctx, info_dict, make_request, connections, chunk_size):
+        """Download different ranges of the file over several connections in parallel
+
+        The ranges are written into a preallocated temporary file, and the completed ranges
+        are recorded in the .ytdl file so that the download can be resumed.
+        Returns None if the server does not support this, so that a regular download should be done instead
+        """
+        ytdl_filename = self.ytdl_filename(ctx.filename)
+        total, completed = None, []
+        if os.path.isfile(ctx.tmpfilename) and self.params.get('continuedl', True):
+            if not os.path.isfile(ytdl_filename):
+                # Partially downloaded over a single connection
+                return None
+            total, completed = self._read_range_map(ctx)
+            if total is None:
+                self.report_warning('.ytdl file is corrupt. Restarting from the beginning')
+                self.try_remove(ctx.tmpfilename)
+
+        def discard_partial_download():
+            if total is not None:
+                self.report_unable_to_resume()
+                self.try_remove(ctx.tmpfilename)
+                self.try_remove(ytdl_filename)
+
+        if total is not None and not _missing_ranges(total, completed):
+            # Interrupted after the last range had been recorded, but before the file was renamed
+            self.report_destination(ctx.filename)
+            self.report_resuming_byte(total)
+            self._finish_ranges(ctx, info_dict, total)
+            return True
+
+        first_start = _missing_ranges(total, completed)[0][0] if total else 0
+        try:
+            response = self.ydl.urlopen(make_request(first_start, first_start + self._MIN_RANGE_SIZE - 1))
+        except (TransportError, HTTPError) as err:
+            # Let the regular download handle the error
+            self.write_debug(f'Unable to download in parallel ranges: {err}')
+            discard_partial_download()
+            return None
+
+        range_start, range_end, content_len = parse_http_range(response.headers.get('Content-Range'))
+        if (range_start != first_start or range_end is None or not content_len
+                or (total is not None and content_len != total) or response.headers.get('Content-encoding')):
+            response.close()
+            self.write_debug('Server does not support downloading in parallel ranges')
+            discard_partial_download()
+            return None
+
+        min_data_len = self.params.get('min_filesize')
+        max_data_len = self.params.get('max_filesize')
+        if min_data_len is not None and content_len < min_data_len:
+            response.close()
+            self.to_screen(
+                f'\r[download] File is smaller than min-filesize ({content_len} bytes < {min_data_len} bytes). Aborting.')
+            return False
+        if max_data_len is not None and content_len > max_data_len:
+            response.close()
+            self.to_screen(
+                f'\r[download] File is larger than max-filesize ({content_len} bytes > {max_data_len} bytes). Aborting.')
+            return False
+
+        try:
+            if total is None:
+                stream, ctx.tmpfilename = self.sanitize_open(ctx.tmpfilename, 'wb')
+                self._preallocate(stream, content_len)
+            else:
+                stream = open(ctx.tmpfilename, 'r+b')
+        except OSError as err:
+            response.close()
+            self.report_error(f'unable to open for writing: {err}')
+            return False
+        total = content_len
+        ctx.filename = self.undo_temp_name(ctx.tmpfilename)
+        self.report_destination(ctx.filename)
+        if completed:
+            self.report_resuming_byte(sum(end - start for start, end in _merge_ranges(completed)))
+
+        # The first range is being downloaded by the probe request
+        parts = [(first_start, range_end + 1, response)]
+        missing = _missing_ranges(total, [*completed, (first_start, range_end + 1)])
+        part_size = max(self._MIN_RANGE_SIZE, -(-sum(end - start for start, end in missing) // connections))
+        if chunk_size:
+            part_size = min(part_size, chunk_size)
+        parts.extend(
+            (start, min(start + part_size, end), None)
+            for gap_start, end in missing for start in range(gap_start, end, part_size))
+
+        lock, stop = threading.Lock(), threading.Event()
+        positions = {}  # start -> downloaded up to, of the parts in progress
+        initial = total - sum(end - start for start, end, _ in parts)
+        progress = ProgressCalculator(initial)
+        progress.total = total
+        start_time, throttle_start = time.time(), None
+
+        def hook_progress():
+            nonlocal throttle_start
+            speed = progress.speed.smooth
+            self._hook_progress({
+                'status': 'downloading',
+                'downloaded_bytes': progress.downloaded,
+                'total_bytes': total,
+                'tmpfilename': ctx.tmpfilename,
+                'filename': ctx.filename,
+                'eta': progress.eta.smooth,
+                'speed': speed,
+                'elapsed': time.time() - ctx.start_time,
+                'ctx_id': info_dict.get('ctx_id'),
+            }, info_dict)
+
+            if speed and speed < (self.params.get('throttledratelimit') or 0):
+                # The speed must stay below the limit for 3 seconds
+                now = time.time()
+                if throttle_start is None:
+                    throttle_start = now
+                elif now - throttle_start > 3:
+                    raise ThrottledDownload
+            elif speed:
+                throttle_start = None
+
+        def download_part(start, end, response):
+            pos = written = start
+            block_size, buffer = ctx.block_size, _WriteBuffer(self._WRITE_BUFFER_SIZE)
+            progress.thread_reset()
+
+            def write(data):
+                nonlocal written
+                with lock:
+                    stream.seek(written)
+                    stream.write(data)
+                    written = positions[start] = written + len(data)
+
+            try:
+                for retry in RetryManager(self.params.get('retries'), self.report_retry):
+                    try:
+                        if response is None:
+                            response = self.ydl.urlopen(make_request(pos, end - 1))
+                            if parse_http_range(response.headers.get('Content-Range'))[0] != pos:
+                                raise TransportError(msg='Server did not return the requested range')
+                        before = time.time()
+                        while pos < end:
+                            if stop.is_set():
+                                return False
+                            read_size = min(block_size, end - pos)
+                            buffer.reserve(read_size, write)
+                            read_size = buffer.readinto(response, read_size)
+                            if not read_size:
+                                raise ContentTooShortError(pos - start, end - start)
+                            pos += read_size
+                            with lock:
+                                progress.update(pos - start)
+                                hook_progress()
+
+                            # Apply rate limit over all connections
+                            self.slow_down(start_time, None, progress.downloaded - initial)
+                            after = time.time()
+                            if not self.params.get('noresizebuffer', False):
+                                block_size = self.best_block_size(after - before, read_size)
+                            before = after
+                    except CertificateVerifyError:
+                        raise
+                    except (TransportError, ContentTooShortError) as err:
+                        retry.error = err
+                    except HTTPError as err:
+                        if err.status < 500 or err.status >= 600:
+                            raise
+                        retry.error = err
+                    finally:
+                        if response is not None:
+                            response.close()
+                            response = None
+            finally:
+                # Keep the downloaded data for resuming
+                with contextlib.suppress(OSError):
+                    buffer.flush(write)
+            if pos < end:
+                return False
+            with lock:
+                del positions[start]
+                completed.append((start, end))
+                stream.flush()
+                self._write_range_map(ctx, total, completed)
+            return True
+
+        success = False
+        try:
+            with concurrent.futures.ThreadPoolExecutor(connections, thread_name_prefix='http_range') as pool:
+                futures = [pool.submit(download_part, *part) for part in parts]
+                try:
+                    success = all(_future_result(future) for future in futures)
+                finally:
+                    stop.set()
+                    for future in futures:
+                        future.cancel()
+        finally:
+            response.close()
+            stream.close()
+            if not success:
+                self._write_range_map(ctx, total, [*completed, *positions.items()])
+        if not success:
+            return False
+
+        self._finish_ranges(ctx, info_dict, total, response.headers.get('last-modified', None))
+        return True
+
+    def _finish_ranges(self, ctx, info_dict, total, last_modified=None):
+        self.try_remove(self.ytdl_filename(ctx.filename))
+        self.try_rename(ctx.tmpfilename, ctx.filename)
+        if last_modified and self.params.get('updatetime'):
+            info_dict['filetime'] = self.try_utime(ctx.filename, last_modified)
+
+        self._hook_progress({
+            'downloaded_bytes': total,
+            'total_bytes': total,
+            'filename': ctx.filename,
+            'status': 'finished',
+            'elapsed': time.time() - ctx.start_time,
+            'ctx_id': info_dict.get('ctx_id'),
+        }, info_dict)
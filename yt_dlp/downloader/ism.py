@@ -4,8 +4,6 @@
 import time
 
 from .fragment import FragmentFD
-from ..networking.exceptions import HTTPError
-from ..utils import RetryManager
 
 u8 = struct.Struct('>B')
 u88 = struct.Struct('>Bx')
@@ -248,36 +246,20 @@ def real_download(self, filename, info_dict):
             'ism_track_written': False,
         })
 
-        skip_unavailable_fragments = self.params.get('skip_unavailable_fragments', True)
-
-        frag_index = 0
-        for segment in segments:
-            frag_index += 1
-            if frag_index <= ctx['fragment_index']:
-                continue
-
-            retry_manager = RetryManager(self.params.get('fragment_retries'), self.report_retry,
-                                         frag_index=frag_index, fatal=not skip_unavailable_fragments)
-            for retry in retry_manager:
-                try:
-                    success = self._download_fragment(ctx, segment['url'], info_dict)
-                    if not success:
-                        return False
-                    frag_content = self._read_fragment(ctx)
-
-                    if not extra_state['ism_track_written']:
-                        tfhd_data = extract_box_data(frag_content, [b'moof', b'traf', b'tfhd'])
-                        info_dict['_download_params']['track_id'] = u32.unpack(tfhd_data[4:8])[0]
-                        write_piff_header(ctx['dest_stream'], info_dict['_download_params'])
-                        extra_state['ism_track_written'] = True
-                    self._append_fragment(ctx, frag_content)
-                except HTTPError as err:
-                    retry.error = err
-                    continue
-
-            if retry_manager.error:
-                if not skip_unavailable_fragments:
-                    return False
-                self.report_skip_fragment(frag_index)
-
-        return self._finish_frag_download(ctx, info_dict)
+        def pack_fragment(frag_content, frag_index):
+            if extra_state['ism_track_written']:
+                return frag_content
+            # The track id of the PIFF header is only known from the first fragment
+            tfhd_data = extract_box_data(frag_content, [b'moof', b'traf', b'tfhd'])
+            info_dict['_download_params']['track_id'] = u32.unpack(tfhd_data[4:8])[0]
+            header = io.BytesIO()
+            write_piff_header(header, info_dict['_download_params'])
+            extra_state['ism_track_written'] = True
+            return header.getvalue() + frag_content
+
+        fragments = [{
+            'frag_index': frag_index,
+            'url': segment['url'],
+        } for frag_index, segment in enumerate(segments, 1) if frag_index > ctx['fragment_index']]
+
+        return self.download_and_append_fragments(ctx, fragments, info_dict, pack_func=pack_fragment)
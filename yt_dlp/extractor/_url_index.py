@@ -0,0 +1,289 @@
+"""An index of extractors by the words that their _VALID_URL requires a URL to contain
+
+Matching a URL against every extractor's _VALID_URL is linear in the number of extractors.
+Most of these regexes however contain literal words (usually the site's domain name),
+without which they can never match. Looking up the words of a URL in this index
+yields the (small) set of extractors that can possibly match, which then only need
+to be tested in the usual order.
+
+The keys of the index are
+    'word'  - the URL must contain this word
+    'word*' - the URL must contain a word starting with this
+    '*word' - the URL must contain a word ending with this
+where a word is a maximal run of [a-z0-9] in the lowercased URL.
+
+NB: For correctness, every extractor's `suitable` must imply that its _VALID_URL matches.
+"""
+
+import collections
+import re
+
+try:
+    sre_parse = re._parser
+except AttributeError:  # Python 3.10
+    import sre_parse
+
+from ..utils import variadic
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, 'POSSESSIVE_REPEAT', None))
+_ATOMIC_GROUP = getattr(sre_parse, 'ATOMIC_GROUP', None)
+
+
+def _is_word_char(char):
+    return char.isascii() and char.isalnum()
+
+
+def _is_delimiter(node):
+    """Whether the node always matches exactly one non-word character"""
+    op, av = node
+    if op is sre_parse.LITERAL:
+        return not _is_word_char(chr(av).lower())
+    if op is sre_parse.IN:
+        return all(
+            sub_op is sre_parse.LITERAL and not _is_word_char(chr(sub_av).lower())
+            for sub_op, sub_av in av)
+    return False
+
+
+def _bounded_after(nodes, bounded, reverse=False):
+    """Whether a match of the nodes must end in a non-word character (or at the start of the string)
+
+    `bounded` is the same property for the position before the nodes.
+    If `reverse`, the nodes are instead considered from right to left
+    """
+    for op, av in reversed(nodes) if reverse else nodes:
+        if op is sre_parse.AT:
+            if av in ((sre_parse.AT_END, sre_parse.AT_END_STRING) if reverse
+                      else (sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING)):
+                bounded = True
+        elif op is sre_parse.SUBPATTERN:
+            bounded = _bounded_after(av[-1], bounded, reverse)
+        elif op is _ATOMIC_GROUP:
+            bounded = _bounded_after(av, bounded, reverse)
+        elif op in _REPEATS:
+            if av[1] > 0:
+                # The end state of the first repetition is also the worst case for the later ones
+                bounded = _bounded_after(av[2], bounded, reverse) and (av[0] > 0 or bounded)
+        elif op is sre_parse.BRANCH:
+            bounded = all(_bounded_after(branch, bounded, reverse) for branch in av[1])
+        elif op not in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            bounded = _is_delimiter((op, av))
+    return bounded
+
+
+def _run_keys(text, left_bounded, right_bounded):
+    for mobj in _WORD_RE.finditer(text):
+        left = mobj.start() > 0 or left_bounded
+        right = mobj.end() < len(text) or right_bounded
+        if left and right:
+            yield mobj.group()
+        elif left:
+            yield f'{mobj.group()}*'
+        elif right:
+            yield f'*{mobj.group()}'
+
+
+def _requirements(nodes, left_bounded=False, right_bounded=False, frequency=None):
+    """Yield sets of keys such that any match of the pattern satisfies at least one key of each set"""
+    nodes = list(nodes)
+    # Whether the position before/after each of the nodes is bounded
+    lefts, rights = [left_bounded], [right_bounded]
+    for idx in range(len(nodes)):
+        lefts.append(_bounded_after(nodes[idx:idx + 1], lefts[-1]))
+        rights.append(_bounded_after(nodes[-idx - 1:len(nodes) - idx], rights[-1], reverse=True))
+    rights.reverse()
+
+    run, run_left = [], left_bounded
+    for idx, (op, av) in enumerate(nodes):
+        prev_bounded, next_bounded = lefts[idx], rights[idx + 1]
+
+        if op is sre_parse.LITERAL:
+            if not run:
+                run_left = prev_bounded
+            run.append(chr(av).lower())
+            if idx + 1 == len(nodes) or nodes[idx + 1][0] is not sre_parse.LITERAL:
+                for key in _run_keys(''.join(run), run_left, next_bounded):
+                    yield frozenset((key,))
+                run = []
+
+        elif op is sre_parse.SUBPATTERN:
+            yield from _requirements(av[-1], prev_bounded, next_bounded, frequency)
+
+        elif op is _ATOMIC_GROUP:
+            yield from _requirements(av, prev_bounded, next_bounded, frequency)
+
+        elif op in _REPEATS and av[0] >= 1:
+            if av[1] == 1:
+                yield from _requirements(av[2], prev_bounded, next_bounded, frequency)
+            else:
+                yield from _requirements(av[2], frequency=frequency)
+
+        elif op is sre_parse.BRANCH:
+            options = set()
+            for branch in av[1]:
+                best = _best_requirement(_requirements(branch, prev_bounded, next_bounded, frequency), frequency)
+                if not best:
+                    break
+                options.update(best)
+            else:
+                yield frozenset(options)
+
+
+def _key_weight(key, frequency):
+    # Short words are likely to be found in any URL
+    return (frequency[key] if frequency else 0) + 4 ** max(0, 5 - len(key.strip('*')))
+
+
+def _best_requirement(requirements, frequency=None):
+    """Pick the requirement that the fewest URLs are expected to satisfy
+
+    `frequency` is the number of extractors that require each key"""
+    return min(requirements, default=None, key=lambda req: sum(_key_weight(key, frequency) for key in req))
+
+
+def _parse_valid_url(valid_url):
+    """Return the parsed regexes, or None if they cannot be handled"""
+    try:
+        return [sre_parse.parse(regex) for regex in variadic(valid_url)]
+    except Exception:
+        return None
+
+
+def _regexes_requirements(regexes, frequency=None):
+    result = []
+    for parsed in regexes:
+        requirements = list(_requirements(parsed, left_bounded=True, frequency=frequency))
+        if not requirements:
+            return None
+        result.append(requirements)
+    return result
+
+
+def url_requirements(valid_url):
+    """Return a list with the requirements of each of the regexes, or None if a URL is not required
+    to contain any word. A URL that matches one of the regexes satisfies at least one key of each
+    set in the corresponding requirements"""
+    regexes = _parse_valid_url(valid_url)
+    return regexes and _regexes_requirements(regexes)
+
+
+class ExtractorIndex:
+    def __init__(self, keys, unindexed, classes=None):
+        self._keys = keys
+        self._words, self._prefixes, self._suffixes = {}, {}, {}
+        for key, ie_keys in keys.items():
+            if key.endswith('*'):
+                self._prefixes[key[:-1]] = ie_keys
+            elif key.startswith('*'):
+                self._suffixes[key[1:]] = ie_keys
+            else:
+                self._words[key] = ie_keys
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._prefixes})
+        self._suffix_lengths = sorted({len(suffix) for suffix in self._suffixes})
+        self.unindexed = frozenset(unindexed)
+        # The classes this index was built from; mapping of ie_key -> class
+        self.classes = classes or {}
+
+    @classmethod
+    def build(cls, ies):
+        """Build the index for the given extractor classes"""
+        parsed, unindexed = {}, []
+        for ie in ies:
+            regexes = ie._VALID_URL and _parse_valid_url(ie._VALID_URL)
+            if regexes:
+                parsed[ie.ie_key()] = regexes
+            else:
+                unindexed.append(ie.ie_key())
+
+        def get_requirements(frequency=None):
+            return {ie_key: _regexes_requirements(regexes, frequency) for ie_key, regexes in parsed.items()}
+
+        # Prefer the keys that are required by the fewest extractors
+        frequency = collections.Counter(
+            key for reqs in get_requirements().values() if reqs
+            for options in reqs for req in options for key in req)
+        keys = collections.defaultdict(set)
+        for ie_key, reqs in get_requirements(frequency).items():
+            if not reqs:
+                unindexed.append(ie_key)
+                continue
+            # A URL must satisfy the best requirement of *any* of the regexes
+            for options in reqs:
+                for key in _best_requirement(options, frequency):
+                    keys[key].add(ie_key)
+
+        return cls(
+            {key: tuple(sorted(ie_keys)) for key, ie_keys in keys.items()}, unindexed,
+            {ie.ie_key(): ie for ie in ies})
+
+    def to_data(self):
+        return {'keys': dict(sorted(self._keys.items())), 'unindexed': tuple(sorted(self.unindexed))}
+
+    @classmethod
+    def from_data(cls, data, classes=None):
+        return cls(data['keys'], data['unindexed'], classes)
+
+    def candidates(self, url):
+        """Return the ie_keys of the indexed extractors that may be suitable for the URL"""
+        result = set()
+        for word in set(_WORD_RE.findall(url.lower())):
+            if word in self._words:
+                result.update(self._words[word])
+            for length in self._prefix_lengths:
+                if length > len(word):
+                    break
+                if word[:length] in self._prefixes:
+                    result.update(self._prefixes[word[:length]])
+            for length in self._suffix_lengths:
+                if length > len(word):
+                    break
+                if word[-length:] in self._suffixes:
+                    result.update(self._suffixes[word[-length:]])
+        return result
+
+
+class ExtractorDispatcher:
+    """Find the extractors that may be suitable for a URL, in the order of `ies`
+
+    `ies` is a mapping of ie_key -> extractor class or instance, like YoutubeDL._ies.
+    Extractors that are not the exact class the index was built from (e.g. plugins
+    overriding a built-in extractor) are always considered
+    """
+
+    def __init__(self, ies, index):
+        self._index = index
+        self._order = {ie_key: idx for idx, ie_key in enumerate(ies)}
+        self._known = frozenset(self._order)
+        self._always = frozenset(
+            ie_key for ie_key, ie in ies.items()
+            if ie_key in index.unindexed
+            or index.classes.get(ie_key) is not (ie if isinstance(ie, type) else type(ie)))
+
+    def candidates(self, url):
+        """Return the candidate ie_keys for the URL"""
+        keys = self._index.candidates(url)
+        keys.intersection_update(self._known)
+        keys.update(self._always)
+        return sorted(keys, key=self._order.__getitem__)
+
+
+_INDEX = None
+
+
+def get_extractor_index(build=True):
+    """Return the index of the built-in extractors
+
+    The index is pregenerated with the lazy extractors. Otherwise it is built
+    on first use if `build` is true, else None is returned
+    """
+    global _INDEX
+    if _INDEX is None:
+        from .extractors import _CLASS_LOOKUP, _URL_INDEX
+
+        classes = {ie.ie_key(): ie for ie in _CLASS_LOOKUP.values()}
+        if _URL_INDEX:
+            _INDEX = ExtractorIndex.from_data(_URL_INDEX, classes)
+        elif build:
+            _INDEX = ExtractorIndex.build(classes.values())
+    return _INDEX
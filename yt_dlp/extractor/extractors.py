@@ -4,7 +4,7 @@
 from ..globals import LAZY_EXTRACTORS
 from ..globals import extractors as _extractors_context
 
-_CLASS_LOOKUP = None
+_CLASS_LOOKUP = _URL_INDEX = None
 if os.environ.get('YTDLP_NO_LAZY_EXTRACTORS'):
     LAZY_EXTRACTORS.value = False
 else:
@@ -13,6 +13,11 @@
         LAZY_EXTRACTORS.value = True
     except ImportError:
         LAZY_EXTRACTORS.value = None
+    else:
+        from . import lazy_extractors
+
+        # Not present in lazy extractors generated by older versions
+        _URL_INDEX = getattr(lazy_extractors, '_URL_INDEX', None)
 
 if not _CLASS_LOOKUP:
     from . import _extractors
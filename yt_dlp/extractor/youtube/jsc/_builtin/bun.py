@@ -47,6 +47,11 @@ class BunJCP(EJSBaseJCP, BuiltinIEContentProvider):
     SUPPORTED_PROXY_SCHEMES = ['http', 'https']
     _BUN_MAX_SUPPORTED_VERSION = (1, 3, 14)
     _BUN_DEPRECATION_URL = 'https://github.com/yt-dlp/yt-dlp/issues/16766'
+    _WORKER_LOOP_SCRIPT = '''
+        for await (const line of console) {
+          process.stdout.write(`${_handle(line)}\\n`);
+        }
+    '''
 
     def _iter_script_sources(self):
         yield from super()._iter_script_sources()
@@ -113,7 +118,7 @@ def _get_env_options(self) -> dict[str, str]:
 
         return options
 
-    def _run_js_runtime(self, stdin: str, /) -> str:
+    def _bun_options(self):
         is_unsupported_version = self.runtime_info.version_tuple > self._BUN_MAX_SUPPORTED_VERSION
         if is_unsupported_version:
             self.logger.warning(
@@ -134,7 +139,11 @@ def _run_js_runtime(self, stdin: str, /) -> str:
             options.append('--install=fallback')
         else:
             options.append('--no-install')
-        cmd = [self.runtime_info.path, '--bun', 'run', *options, '-']
+        return options
+
+    def _run_js_runtime(self, stdin: str, /) -> str:
+        is_unsupported_version = self.runtime_info.version_tuple > self._BUN_MAX_SUPPORTED_VERSION
+        cmd = [self.runtime_info.path, '--bun', 'run', *self._bun_options(), '-']
         self.logger.debug(f'Running bun: {shlex.join(cmd)}')
 
         with Popen(
@@ -154,6 +163,9 @@ def _run_js_runtime(self, stdin: str, /) -> str:
                 raise JsChallengeProviderError(msg, expected=is_unsupported_version)
         return stdout
 
+    def _worker_command(self, script_path: str, /):
+        return [self.runtime_info.path, '--bun', 'run', *self._bun_options(), script_path], self._get_env_options()
+
     def _clean_stderr(self, stderr):
         return '\n'.join(
             line for line in stderr.splitlines()
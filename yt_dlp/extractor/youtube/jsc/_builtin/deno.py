@@ -39,6 +39,17 @@ class DenoJCP(EJSBaseJCP, BuiltinIEContentProvider):
         '--no-lock', '--node-modules-dir=none', '--no-config',
     ]
     DENO_NPM_LIB_FILENAME = 'yt.solver.deno.lib.js'
+    _WORKER_LOOP_SCRIPT = '''
+        const encoder = new TextEncoder();
+        let buffer = '';
+        for await (const chunk of Deno.stdin.readable.pipeThrough(new TextDecoderStream())) {
+          const lines = (buffer + chunk).split('\\n');
+          buffer = lines.pop();
+          for (const line of lines) {
+            await Deno.stdout.write(encoder.encode(`${_handle(line)}\\n`));
+          }
+        }
+    '''
     _NPM_PACKAGES_CACHED = False
 
     def _iter_script_sources(self):
@@ -72,7 +83,7 @@ def _npm_packages_cached(self, stdin: str) -> bool:
             return False
         return True
 
-    def _run_js_runtime(self, stdin: str, /) -> str:
+    def _deno_options(self):
         options = [*self._DENO_BASE_OPTIONS]
         if self._lib_script.variant == ScriptVariant.DENO_NPM and self._NPM_PACKAGES_CACHED:
             options.append('--cached-only')
@@ -84,7 +95,13 @@ def _run_js_runtime(self, stdin: str, /) -> str:
         # XXX: Convert this extractor-arg into a general option if/when a JSI framework is implemented
         if self.ejs_setting('jitless', ['false']) != ['false']:
             options.append('--v8-flags=--jitless')
-        return self._run_deno(stdin, options)
+        return options
+
+    def _run_js_runtime(self, stdin: str, /) -> str:
+        return self._run_deno(stdin, self._deno_options())
+
+    def _worker_command(self, script_path: str, /):
+        return [self.runtime_info.path, 'run', *self._deno_options(), script_path], self._get_env_options()
 
     def _get_env_options(self) -> dict[str, str]:
         options = os.environ.copy()  # pass through existing deno env vars
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import collections
+import contextlib
 import dataclasses
 import enum
 import functools
 import hashlib
 import json
+import pathlib
+import shlex
+import subprocess
+import tempfile
+import threading
 
 from yt_dlp.dependencies import yt_dlp_ejs as _has_ejs
 from yt_dlp.extractor.youtube.jsc._builtin import vendor
@@ -21,7 +27,7 @@
 )
 from yt_dlp.extractor.youtube.pot._provider import configuration_arg
 from yt_dlp.extractor.youtube.pot.provider import provider_bug_report_message
-from yt_dlp.utils import version_tuple
+from yt_dlp.utils import Popen, version_tuple
 from yt_dlp.utils._jsruntime import JsRuntimeInfo
 
 if _has_ejs:
@@ -106,10 +112,24 @@ class EJSBaseJCP(JsChallengeProvider):
     # currently disabled as files are large and we do not support rotation
     _ENABLE_PREPROCESSED_PLAYER_CACHE = False
 
+    # JS that reads newline-delimited JSON from stdin and writes `_handle(line)` for each line.
+    # Runtimes that do not define this do not support the persistent worker
+    _WORKER_LOOP_SCRIPT: str | None = None
+    _WORKER_SCRIPT_SUFFIX = '.js'
+    # Number of preprocessed players that are kept loaded in the worker
+    _WORKER_MAX_PLAYERS = 8
+    _WORKER_TIMEOUT = 120
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._available = True
         self.ejs_settings = self.ie.get_param('extractor_args', {}).get('youtube-ejs', {})
+        self._worker = None
+        if self.ejs_setting('persistent', ['false']) != ['false']:
+            if self._WORKER_LOOP_SCRIPT:
+                self._worker = _JsRuntimeWorker(self)
+            else:
+                self.logger.debug(f'{self.JS_RUNTIME_NAME} does not support running a persistent worker')
 
         # Note: The following 3 args are for developer use only & intentionally not documented.
         # - dev: bypasses verification of script hashes and versions.
@@ -145,29 +165,47 @@ def _run_js_runtime(self, stdin: str, /) -> str:
         """To be implemented by subclasses"""
         raise NotImplementedError
 
+    def _worker_command(self, script_path: str, /) -> tuple[list[str], dict[str, str] | None]:
+        """
+        To be implemented by subclasses that define _WORKER_LOOP_SCRIPT
+        @returns    The command that runs the script at script_path, and its environment
+        """
+        raise NotImplementedError
+
+    def _clean_stderr(self, stderr: str, /) -> str:
+        return stderr
+
+    def close(self):
+        if self._worker:
+            self._worker.close()
+        super().close()
+
+    def _load_grouped_player(self, player_url: str, requests: list[JsChallengeRequest], /) -> tuple[str, bool]:
+        player = None
+        if self._ENABLE_PREPROCESSED_PLAYER_CACHE:
+            player = self.ie.cache.load(self._CACHE_SECTION, f'player:{player_url}')
+        if player:
+            return player, True
+        video_id = next((request.video_id for request in requests), None)
+        return self._get_player(video_id, player_url), False
+
     def _real_bulk_solve(self, /, requests: list[JsChallengeRequest]):
         grouped: dict[str, list[JsChallengeRequest]] = collections.defaultdict(list)
         for request in requests:
             grouped[request.input.player_url].append(request)
 
         for player_url, grouped_requests in grouped.items():
-            player = None
-            if self._ENABLE_PREPROCESSED_PLAYER_CACHE:
-                player = self.ie.cache.load(self._CACHE_SECTION, f'player:{player_url}')
-
-            if player:
-                cached = True
+            if self._worker:
+                output = self._worker.solve(player_url, grouped_requests)
             else:
-                cached = False
-                video_id = next((request.video_id for request in grouped_requests), None)
-                player = self._get_player(video_id, player_url)
+                player, cached = self._load_grouped_player(player_url, grouped_requests)
+                # NB: This output belongs after the player request
+                self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME}')
 
-            # NB: This output belongs after the player request
-            self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME}')
+                stdin = self._construct_stdin(player, cached, grouped_requests)
+                stdout = self._run_js_runtime(stdin)
+                output = json.loads(stdout)
 
-            stdin = self._construct_stdin(player, cached, grouped_requests)
-            stdout = self._run_js_runtime(stdin)
-            output = json.loads(stdout)
             if output['type'] == 'error':
                 raise JsChallengeProviderError(output['error'])
 
@@ -182,21 +220,27 @@ def _real_bulk_solve(self, /, requests: list[JsChallengeRequest]):
                         NChallengeOutput(response_data['data']) if request.type is JsChallengeType.N
                         else SigChallengeOutput(response_data['data']))))
 
-    def _construct_stdin(self, player: str, preprocessed: bool, requests: list[JsChallengeRequest], /) -> str:
-        json_requests = [{
+    @staticmethod
+    def _construct_requests(requests: list[JsChallengeRequest], /) -> list[dict]:
+        return [{
             'type': request.type.value,
             'challenges': request.input.challenges,
         } for request in requests]
-        data = {
+
+    def _construct_input(self, player: str, preprocessed: bool, requests: list[JsChallengeRequest], /) -> dict:
+        return {
             'type': 'preprocessed',
             'preprocessed_player': player,
-            'requests': json_requests,
+            'requests': self._construct_requests(requests),
         } if preprocessed else {
             'type': 'player',
             'player': player,
-            'requests': json_requests,
+            'requests': self._construct_requests(requests),
             'output_preprocessed': True,
         }
+
+    def _construct_stdin(self, player: str, preprocessed: bool, requests: list[JsChallengeRequest], /) -> str:
+        data = self._construct_input(player, preprocessed, requests)
         return f'''\
         {self._lib_script.code}
         Object.assign(globalThis, lib);
@@ -204,6 +248,16 @@ def _construct_stdin(self, player: str, preprocessed: bool, requests: list[JsCha
         console.log(JSON.stringify(jsc({json.dumps(data)})));
         '''
 
+    def _construct_worker_script(self, /) -> str:
+        return f'''\
+        {self._lib_script.code}
+        Object.assign(globalThis, lib);
+        {self._core_script.code}
+        const _MAX_PLAYERS = {self._WORKER_MAX_PLAYERS};
+        {_WORKER_HANDLER_SCRIPT}
+        {self._WORKER_LOOP_SCRIPT}
+        '''
+
     # region: challenge solver script
 
     @functools.cached_property
@@ -326,3 +380,184 @@ def _skip_component(self, component: str, /):
 class _SkippedComponent:
     component: str
     runtime: str
+
+
+# Solves one line of input of the persistent worker. Players are preprocessed once and kept
+# loaded by URL, so that subsequent requests for the same player only send the challenges
+_WORKER_HANDLER_SCRIPT = '''
+const _players = new Map();
+function _solve(input) {
+  if (input.type === 'ping') {
+    return { type: 'pong' };
+  }
+  const { player_url: playerUrl, output_preprocessed: outputPreprocessed } = input;
+  if (input.type === 'loaded') {
+    if (!_players.has(playerUrl)) {
+      return { type: 'error', error: `Player is not loaded: ${playerUrl}` };
+    }
+    input = { type: 'preprocessed', preprocessed_player: _players.get(playerUrl), requests: input.requests };
+  } else if (input.type === 'player') {
+    input = { ...input, output_preprocessed: true };
+  }
+  const output = jsc(input);
+  if (output.type === 'result') {
+    const preprocessedPlayer = output.preprocessed_player ?? input.preprocessed_player;
+    _players.delete(playerUrl);
+    _players.set(playerUrl, preprocessedPlayer);
+    while (_players.size > _MAX_PLAYERS) {
+      _players.delete(_players.keys().next().value);
+    }
+    if (outputPreprocessed) {
+      output.preprocessed_player = preprocessedPlayer;
+    } else {
+      delete output.preprocessed_player;
+    }
+  }
+  return output;
+}
+function _handle(line) {
+  let output;
+  try {
+    output = _solve(JSON.parse(line));
+  } catch (error) {
+    output = {
+      type: 'error',
+      error: error instanceof Error ? `${error.message}\\n${error.stack}` : `${error}`,
+    };
+  }
+  return JSON.stringify(output);
+}
+'''
+
+
+class _WorkerExitedError(JsChallengeProviderError):
+    pass
+
+
+class _JsRuntimeWorker:
+    """
+    A JS runtime process that is kept running for the lifetime of an EJS provider.
+
+    The solver scripts are loaded once when the process starts, after which each
+    batch of challenges is sent as one line of JSON on stdin and answered with one
+    line of JSON on stdout. The process is restarted if it exits unexpectedly.
+    """
+
+    def __init__(self, provider: EJSBaseJCP, /):
+        self._provider = provider
+        self._lock = threading.Lock()
+        self._proc = None
+        self._script_path = None
+        self._stderr = None
+        # Mirrors the players that are loaded in the process, in least recently used order
+        self._players = collections.OrderedDict()
+
+    def _start(self):
+        provider = self._provider
+        with tempfile.NamedTemporaryFile(
+                mode='w', suffix=provider._WORKER_SCRIPT_SUFFIX, delete=False, encoding='utf-8') as temp_file:
+            temp_file.write(provider._construct_worker_script())
+        self._script_path = temp_file.name
+        cmd, env = provider._worker_command(self._script_path)
+        provider.logger.debug(f'Starting {provider.JS_RUNTIME_NAME} worker: {shlex.join(cmd)}')
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = Popen(
+            cmd,
+            text=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self._stderr,
+            env=env,
+        )
+        self._players.clear()
+        # Health check: the worker only answers once the scripts have been loaded
+        if self._communicate({'type': 'ping'}) != {'type': 'pong'}:
+            raise JsChallengeProviderError(f'Unexpected response from {provider.JS_RUNTIME_NAME} worker')
+
+    def _communicate(self, data: dict, /) -> dict:
+        timed_out = threading.Event()
+        proc = self._proc
+
+        def kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(self._provider._WORKER_TIMEOUT, kill)
+        timer.start()
+        try:
+            self._proc.stdin.write(f'{json.dumps(data)}\n')
+            self._proc.stdin.flush()
+            line = self._proc.stdout.readline()
+        except OSError:
+            line = ''
+        finally:
+            timer.cancel()
+        if line:
+            return json.loads(line)
+
+        self._proc.wait()
+        self._stderr.seek(0)
+        stderr = self._provider._clean_stderr(self._stderr.read().decode(errors='replace'))
+        msg = f'{self._provider.JS_RUNTIME_NAME} worker exited (returncode: {self._proc.returncode})'
+        if stderr:
+            msg = f'{msg}: {stderr.strip()}'
+        if timed_out.is_set():
+            raise JsChallengeProviderError(f'{msg}; timed out after {self._provider._WORKER_TIMEOUT} seconds')
+        raise _WorkerExitedError(msg)
+
+    def solve(self, player_url: str, requests: list[JsChallengeRequest], /) -> dict:
+        provider = self._provider
+        player = None
+        with self._lock:
+            for restart in (True, False):
+                if self._proc and self._proc.poll() is not None:
+                    provider.logger.debug(
+                        f'{provider.JS_RUNTIME_NAME} worker has exited (returncode: {self._proc.returncode})')
+                    self.close()
+                try:
+                    if not self._proc:
+                        self._start()
+                    if player_url in self._players:
+                        data = {'type': 'loaded', 'requests': provider._construct_requests(requests)}
+                    else:
+                        if player is None:
+                            player = provider._load_grouped_player(player_url, requests)
+                        data = provider._construct_input(*player, requests)
+                        data['output_preprocessed'] = provider._ENABLE_PREPROCESSED_PLAYER_CACHE
+                    # NB: This output belongs after the player request
+                    provider.logger.info(f'Solving JS challenges using {provider.JS_RUNTIME_NAME}')
+                    output = self._communicate({**data, 'player_url': player_url})
+                except _WorkerExitedError as e:
+                    self.close()
+                    if not restart:
+                        raise
+                    provider.logger.warning(f'{e}. Restarting')
+                    continue
+                except BaseException:
+                    self.close()
+                    raise
+                if output['type'] == 'result':
+                    self._players.pop(player_url, None)
+                    self._players[player_url] = None
+                    while len(self._players) > provider._WORKER_MAX_PLAYERS:
+                        self._players.popitem(last=False)
+                return output
+
+    def close(self):
+        if self._proc:
+            with contextlib.suppress(OSError):
+                self._proc.stdin.close()
+            try:
+                # The worker exits once its stdin is closed
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+            self._proc.stdout.close()
+            self._proc = None
+        if self._stderr:
+            self._stderr.close()
+            self._stderr = None
+        if self._script_path:
+            pathlib.Path(self._script_path).unlink(missing_ok=True)
+            self._script_path = None
@@ -22,8 +22,14 @@ class NodeJCP(EJSBaseJCP, BuiltinIEContentProvider):
     JS_RUNTIME_NAME = 'node'
 
     _ARGS = ['-']
+    _WORKER_LOOP_SCRIPT = '''
+        require('readline').createInterface({ input: process.stdin })
+          .on('line', (line) => process.stdout.write(`${_handle(line)}\\n`));
+    '''
+    # Avoid the script being loaded as an ES module due to a package.json in a parent directory
+    _WORKER_SCRIPT_SUFFIX = '.cjs'
 
-    def _run_js_runtime(self, stdin: str, /) -> str:
+    def _node_args(self):
         args = []
 
         if self.ejs_setting('jitless', ['false']) != ['false']:
@@ -35,8 +41,10 @@ def _run_js_runtime(self, stdin: str, /) -> str:
             args.append('--no-warnings=ExperimentalWarning')
         else:
             args.append('--permission')
+        return args
 
-        cmd = [self.runtime_info.path, *args, *self._ARGS]
+    def _run_js_runtime(self, stdin: str, /) -> str:
+        cmd = [self.runtime_info.path, *self._node_args(), *self._ARGS]
         self.logger.debug(f'Running node: {shlex.join(cmd)}')
         with Popen(
             cmd,
@@ -55,6 +63,9 @@ def _run_js_runtime(self, stdin: str, /) -> str:
 
         return stdout
 
+    def _worker_command(self, script_path: str, /):
+        return [self.runtime_info.path, *self._node_args(), f'--allow-fs-read={script_path}', script_path], None
+
     def _clean_stderr(self, stderr):
         return '\n'.join(
             line for line in stderr.splitlines()
@@ -2,6 +2,7 @@
 
 import collections
 import dataclasses
+import hashlib
 import typing
 
 from yt_dlp.extractor.youtube.jsc._builtin.ejs import _EJS_WIKI_URL
@@ -33,16 +34,27 @@
 if typing.TYPE_CHECKING:
     from collections.abc import Iterable
 
+    from yt_dlp.cache import Cache
     from yt_dlp.extractor.youtube.jsc._builtin.ejs import _SkippedComponent
     from yt_dlp.extractor.youtube.jsc.provider import Preference as JsChallengePreference
 
 
 class JsChallengeRequestDirector:
+    _CACHE_SECTION = 'youtube-jsc'
 
-    def __init__(self, logger: IEContentProviderLogger):
+    def __init__(self, logger: IEContentProviderLogger, cache: Cache | None = None, use_results_cache: bool = True):
+        """
+        @param cache                If given, solved challenges are also stored in and loaded from this cache
+        @param use_results_cache    Whether to reuse the results of solved challenges
+        """
         self.providers: dict[str, JsChallengeProvider] = {}
         self.preferences: list[JsChallengePreference] = []
         self.logger = logger
+        self.cache = cache
+        self.use_results_cache = use_results_cache
+        # The result of a challenge only depends on the player and the challenge itself
+        self._results: dict[tuple[JsChallengeType, str, str], str] = {}
+        self.cache_hits = self.cache_misses = 0
 
     def register_provider(self, provider: JsChallengeProvider):
         self.providers[provider.PROVIDER_KEY] = provider
@@ -92,8 +104,75 @@ def _handle_error(self, e: Exception, provider: JsChallengeProvider, requests: l
                 f'         requests = {requests}\n'
                 f'         {provider_bug_report_message(provider, before="")}', cause=e)
 
+    def _disk_cache_key(self, challenge_type: JsChallengeType, player_url: str, challenge: str, /) -> str:
+        digest = hashlib.sha256(f'{player_url}\0{challenge}'.encode()).hexdigest()
+        return f'{challenge_type.value}-{digest}'
+
+    def _load_result(self, challenge_type: JsChallengeType, player_url: str, challenge: str, /) -> str | None:
+        result_key = (challenge_type, player_url, challenge)
+        result = self._results.get(result_key)
+        if result is None and self.cache:
+            result = self.cache.load(
+                self._CACHE_SECTION, self._disk_cache_key(challenge_type, player_url, challenge))
+            if isinstance(result, str):
+                self._results[result_key] = result
+            else:
+                result = None
+        return result
+
+    def _store_result(self, challenge_type: JsChallengeType, player_url: str, challenge: str, result: str, /):
+        result_key = (challenge_type, player_url, challenge)
+        if result_key in self._results:
+            return
+        self._results[result_key] = result
+        if self.cache:
+            self.cache.store(
+                self._CACHE_SECTION, self._disk_cache_key(challenge_type, player_url, challenge), result)
+
     def bulk_solve(self, requests: list[JsChallengeRequest]) -> list[tuple[JsChallengeRequest, JsChallengeResponse]]:
         """Solves multiple JS Challenges in bulk, returning a list of responses"""
+        if not self.use_results_cache:
+            return self._bulk_solve(requests)
+
+        results = []
+        # Only the challenges that have not been solved before are passed on to the providers
+        pending: list[tuple[JsChallengeRequest, JsChallengeRequest, dict[str, str]]] = []
+        hits = misses = 0
+        for request in requests:
+            cached, missing = {}, []
+            for challenge in request.input.challenges:
+                result = self._load_result(request.type, request.input.player_url, challenge)
+                if result is None:
+                    missing.append(challenge)
+                else:
+                    cached[challenge] = result
+            hits += len(cached)
+            misses += len(missing)
+            if missing:
+                pending.append((request, dataclasses.replace(
+                    request, input=dataclasses.replace(request.input, challenges=missing)), cached))
+            else:
+                results.append((request, JsChallengeResponse(request.type, _OUTPUT_TYPES[request.type](cached))))
+
+        self.cache_hits += hits
+        self.cache_misses += misses
+        if hits:
+            self.logger.debug(
+                f'Using {hits} of {hits + misses} JS Challenge results from cache '
+                f'(total: {self.cache_hits} hits, {self.cache_misses} misses)')
+
+        if not pending:
+            return results
+
+        for solved_request, response in self._bulk_solve([uncached for _, uncached, _ in pending]):
+            request, _, cached = next(item for item in pending if item[1] == solved_request)
+            for challenge, result in response.output.results.items():
+                self._store_result(request.type, request.input.player_url, challenge, result)
+            results.append((request, JsChallengeResponse(request.type, _OUTPUT_TYPES[request.type](
+                {**cached, **response.output.results}))))
+        return results
+
+    def _bulk_solve(self, requests: list[JsChallengeRequest]) -> list[tuple[JsChallengeRequest, JsChallengeResponse]]:
         if not self.providers:
             self.logger.trace('No JS Challenge providers registered')
             return []
@@ -222,8 +301,11 @@ def get_provider_logger_and_settings(provider, logger_key):
             YoutubeIEContentProviderLogger(ie, logger_prefix, log_level=log_level),
             ie.get_param('extractor_args', {}).get(extractor_key, {}))
 
+    results_cache = ie._configuration_arg('jsc_cache', ['memory'], ie_key='youtube')[0]
     director = JsChallengeRequestDirector(
         logger=YoutubeIEContentProviderLogger(ie, 'jsc', log_level=log_level),
+        cache=ie.cache if results_cache == 'disk' else None,
+        use_results_cache=results_cache != 'none',
     )
 
     ie._downloader.add_close_hook(director.close)
@@ -243,6 +325,12 @@ def get_provider_logger_and_settings(provider, logger_key):
     return director
 
 
+_OUTPUT_TYPES = {
+    JsChallengeType.N: NChallengeOutput,
+    JsChallengeType.SIG: SigChallengeOutput,
+}
+
+
 def validate_provider_response(response: JsChallengeProviderResponse) -> bool:
     return (
         isinstance(response, JsChallengeProviderResponse)
@@ -0,0 +1,180 @@
+"""
+A single-pass parser for M3U8 playlists, as used by HLS.
+
+The playlist is read line by line into a compact model that is shared by
+the extractors (which need the variant streams and renditions of master
+playlists) and the HLS downloader (which needs the segments of media
+playlists). Only the tags that are used by either of them are interpreted.
+
+See RFC 8216 <https://tools.ietf.org/html/rfc8216> for the specification.
+"""
+
+from __future__ import annotations
+
+import binascii
+import dataclasses
+import typing
+
+from .utils import float_or_none, parse_m3u8_attributes
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Key:
+    """The EXT-X-KEY that is used to decrypt the segments that follow it"""
+    method: str
+    uri: str | None = None
+    iv: bytes | None = None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class InitSection:
+    """The EXT-X-MAP that is needed to parse the segments that follow it"""
+    uri: str | None
+    byte_range: tuple[int, int] | None = None
+    key: Key | None = None
+
+
+@dataclasses.dataclass(slots=True)
+class Segment:
+    """A media segment of a media playlist"""
+    uri: str
+    media_sequence: int
+    duration: float | None = None
+    # (start, end) of the sub-range of the resource, with the end being exclusive
+    byte_range: tuple[int, int] | None = None
+    key: Key | None = None
+    init_section: InitSection | None = None
+    # The number of EXT-X-DISCONTINUITY tags before the segment
+    discontinuity: int = 0
+    # Whether the segment is part of an ad break that was marked by the server
+    is_ad: bool = False
+
+
+@dataclasses.dataclass(slots=True)
+class Variant:
+    """A variant stream of a master playlist"""
+    uri: str
+    attributes: dict[str, str]
+
+
+@dataclasses.dataclass(slots=True)
+class Playlist:
+    """A master playlist or a media playlist"""
+    # The tags of master playlists and media playlists must not be mixed [RFC 8216, 4.3]
+    is_media_playlist: bool = False
+    # Media playlists
+    target_duration: float | None = None
+    media_sequence: int = 0
+    discontinuity_count: int = 0
+    playlist_type: str | None = None
+    end_list: bool = False
+    segments: list[Segment] = dataclasses.field(default_factory=list)
+    # Master playlists
+    variants: list[Variant] = dataclasses.field(default_factory=list)
+    media: list[dict[str, str]] = dataclasses.field(default_factory=list)
+
+
+def _parse_byte_range(value, default_offset):
+    length, _, offset = value.partition('@')
+    start = int(offset) if offset else default_offset
+    return start, start + int(length)
+
+
+def _is_ad_start(line):
+    return ((line.startswith('#ANVATO-SEGMENT-INFO') and 'type=ad' in line)
+            or (line.startswith('#UPLYNK-SEGMENT') and line.endswith(',ad')))
+
+
+def _is_ad_end(line):
+    return ((line.startswith('#ANVATO-SEGMENT-INFO') and 'type=master' in line)
+            or (line.startswith('#UPLYNK-SEGMENT') and line.endswith(',segment')))
+
+
+def parse_m3u8(doc: str | Iterable[str], parse_segments: bool = True) -> Playlist:
+    """
+    Parse a M3U8 playlist
+
+    @param doc              The playlist, or an iterable of its lines (e.g. a file object)
+    @param parse_segments   Whether to build the segments of media playlists. Without them,
+                            only the tags of the playlist itself and its discontinuities are read
+    """
+    playlist = Playlist()
+    segments, variants = playlist.segments, playlist.variants
+    media_sequence = 0
+    key = init_section = None
+    duration = byte_range = stream_inf = None
+    # The offset of a byte range defaults to the end of the previous one
+    byte_range_end = 0
+    discontinuity = 0
+    is_ad = False
+
+    for line in doc.splitlines() if isinstance(doc, str) else doc:
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] != '#':
+            if stream_inf is not None or variants:
+                variants.append(Variant(line, stream_inf or {}))
+                stream_inf = None
+                continue
+            if parse_segments or not playlist.is_media_playlist:
+                segments.append(Segment(
+                    line, media_sequence, duration, byte_range, key, init_section, discontinuity, is_ad))
+            media_sequence += 1
+            if byte_range:
+                byte_range_end = byte_range[1]
+            duration = byte_range = None
+        elif line.startswith('#EXTINF:'):
+            if not parse_segments:
+                continue
+            try:
+                duration = float(line[8:].partition(',')[0])
+            except ValueError:
+                duration = None
+        elif line.startswith('#EXT-X-BYTERANGE:'):
+            if parse_segments:
+                byte_range = _parse_byte_range(line[17:], byte_range_end)
+        elif line.startswith('#EXT-X-KEY:'):
+            attributes = parse_m3u8_attributes(line[11:])
+            method = attributes.get('METHOD')
+            if method == 'NONE':
+                key = None
+                continue
+            iv = attributes.get('IV')
+            if iv and method == 'AES-128':
+                iv = binascii.unhexlify(iv[2:].zfill(32))
+            key = Key(method, attributes.get('URI'), iv)
+        elif line == '#EXT-X-DISCONTINUITY':
+            discontinuity += 1
+            playlist.discontinuity_count = discontinuity
+        elif line.startswith('#EXT-X-MAP:'):
+            attributes = parse_m3u8_attributes(line[11:])
+            map_byte_range = attributes.get('BYTERANGE')
+            init_section = InitSection(
+                attributes.get('URI'), map_byte_range and _parse_byte_range(map_byte_range, 0), key)
+        elif line.startswith('#EXT-X-MEDIA-SEQUENCE:'):
+            media_sequence = playlist.media_sequence = int(line[22:])
+        elif line.startswith('#EXT-X-TARGETDURATION'):
+            playlist.is_media_playlist = True
+            playlist.target_duration = float_or_none(line[22:])
+        elif line == '#EXT-X-ENDLIST':
+            playlist.end_list = True
+        elif line.startswith('#EXT-X-PLAYLIST-TYPE:'):
+            playlist.playlist_type = line[21:]
+        elif line.startswith('#EXT-X-STREAM-INF:'):
+            stream_inf = parse_m3u8_attributes(line[18:])
+        elif line.startswith('#EXT-X-MEDIA:'):
+            playlist.media.append(parse_m3u8_attributes(line[13:]))
+        elif _is_ad_start(line):
+            is_ad = True
+        elif _is_ad_end(line):
+            is_ad = False
+
+    if not playlist.is_media_playlist and segments:
+        # URIs without an EXT-X-STREAM-INF in a master playlist are still variant streams.
+        # They are also kept as segments, since some media playlists lack EXT-X-TARGETDURATION
+        variants[:0] = (Variant(segment.uri, {}) for segment in segments)
+    return playlist
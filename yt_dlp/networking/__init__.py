@@ -36,3 +36,10 @@
     pass
 except Exception as e:
     warnings.warn(f'Failed to import "curl_cffi" request handler: {e}' + bug_reports_message())
+
+try:
+    from . import _httpx
+except ImportError:
+    pass
+except Exception as e:
+    warnings.warn(f'Failed to import "httpx" request handler: {e}' + bug_reports_message())
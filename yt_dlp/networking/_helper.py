@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import collections
 import contextlib
 import functools
+import itertools
 import os
+import queue
 import socket
 import ssl
 import sys
+import threading
+import time
 import typing
 import urllib.parse
 import urllib.request
@@ -176,6 +181,9 @@ def _close_instance(self, instance):
         if callable(getattr(instance, 'close', None)):
             instance.close()
 
+    def _get_instances(self):
+        return [instance for _, instance in self.__instances]
+
     def _clear_instances(self):
         for _, instance in self.__instances:
             self._close_instance(instance)
@@ -232,18 +240,146 @@ def create_socks_proxy_socket(dest_addr, proxy_args, proxy_ip_addr, timeout, sou
         raise
 
 
+DEFAULT_DNS_CACHE_TTL = 60
+# The recommended "Connection Attempt Delay" of RFC 8305
+HAPPY_EYEBALLS_DELAY = 0.25
+
+
+class DNSCache:
+    """
+    Cache of the addresses of hosts, shared by all the connections of the process
+
+    The system resolver does not expose the TTL of the DNS records, so the
+    addresses are reused for at most the `ttl` given by the caller and are
+    dropped as soon as none of them can be connected to.
+    @param resolver: Function with the signature of socket.getaddrinfo() used to resolve hosts
+    @param max_size: Maximum number of hosts to keep
+    """
+
+    def __init__(self, resolver=socket.getaddrinfo, max_size=256):
+        self._resolver = resolver
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def getaddrinfo(self, host, port, ttl=0):
+        """Resolve host for a TCP connection, reusing the addresses resolved less than `ttl` seconds ago"""
+        key = host, port
+        with self._lock:
+            resolved_at, ip_addrs = self._cache.get(key, (None, None))
+        if ip_addrs is not None and ttl and time.monotonic() - resolved_at < ttl:
+            return ip_addrs
+
+        ip_addrs = self._resolver(host, port, 0, socket.SOCK_STREAM)
+        if ttl and ip_addrs:
+            with self._lock:
+                self._cache.pop(key, None)
+                if len(self._cache) >= self._max_size:
+                    # Dicts are ordered, so this is the least recently resolved host
+                    del self._cache[next(iter(self._cache))]
+                self._cache[key] = time.monotonic(), ip_addrs
+        return ip_addrs
+
+    def invalidate(self, host, port):
+        with self._lock:
+            self._cache.pop((host, port), None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+dns_cache = DNSCache()
+
+
+def _interleave_address_families(ip_addrs):
+    # Alternate between the address families, starting with the one preferred by getaddrinfo()
+    # See: https://datatracker.ietf.org/doc/html/rfc8305#section-4
+    by_family = collections.defaultdict(list)
+    for ip_addr in ip_addrs:
+        by_family[ip_addr[0]].append(ip_addr)
+    return [
+        ip_addr for ip_addrs in itertools.zip_longest(*by_family.values())
+        for ip_addr in ip_addrs if ip_addr is not None]
+
+
+def _happy_eyeballs_connect(ip_addrs, timeout, source_address, create_socket_func, delay=HAPPY_EYEBALLS_DELAY):
+    """
+    Connect to the first address that accepts a connection, as described in RFC 8305.
+    The next connection attempt is started when the previous ones have failed
+    or have not succeeded after `delay` seconds.
+    """
+    results = queue.Queue()
+    lock = threading.Lock()
+    connected = False
+
+    def attempt(ip_addr):
+        try:
+            sock = create_socket_func(ip_addr, timeout, source_address)
+        except OSError as e:
+            results.put((None, e))
+            return
+        with lock:
+            if not connected:
+                results.put((sock, None))
+                return
+        # Another attempt has already succeeded
+        sock.close()
+
+    remaining = collections.deque(ip_addrs)
+    pending = 0
+
+    def start_attempt():
+        nonlocal pending
+        threading.Thread(target=attempt, args=(remaining.popleft(),), daemon=True).start()
+        pending += 1
+
+    start_attempt()
+    err = None
+    while pending:
+        try:
+            sock, error = results.get(timeout=delay if remaining else None)
+        except queue.Empty:
+            start_attempt()
+            continue
+        pending -= 1
+        if sock is None:
+            err = error
+            # Do not wait for the delay when an attempt has failed
+            if remaining:
+                start_attempt()
+            continue
+        with lock:
+            connected = True
+        # Close the sockets of the attempts that have succeeded in the meantime
+        while not results.empty():
+            other_sock, _ = results.get()
+            if other_sock is not None:
+                other_sock.close()
+        return sock
+
+    try:
+        raise err
+    finally:
+        # Explicitly break __traceback__ reference cycle
+        # https://bugs.python.org/issue36820
+        err = None
+
+
 def create_connection(
     address,
     timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
     source_address=None,
     *,
     _create_socket_func=_socket_connect,
+    dns_cache_ttl=0,
+    happy_eyeballs=False,
 ):
     # Work around socket.create_connection() which tries all addresses from getaddrinfo() including IPv6.
     # This filters the addresses based on the given source_address.
     # Based on: https://github.com/python/cpython/blob/main/Lib/socket.py#L810
     host, port = address
-    ip_addrs = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    ip_addrs = dns_cache.getaddrinfo(host, port, ttl=dns_cache_ttl)
     if not ip_addrs:
         raise OSError('getaddrinfo returns an empty list')
     if source_address is not None:
@@ -254,6 +390,15 @@ def create_connection(
                 f'No remote IPv{4 if af == socket.AF_INET else 6} addresses available for connect. '
                 f'Can\'t use "{source_address[0]}" as source address')
 
+    if happy_eyeballs and len(ip_addrs) > 1:
+        try:
+            return _happy_eyeballs_connect(
+                _interleave_address_families(ip_addrs), timeout, source_address, _create_socket_func)
+        except OSError:
+            # The host may have moved to other addresses
+            dns_cache.invalidate(host, port)
+            raise
+
     err = None
     for ip_addr in ip_addrs:
         try:
@@ -265,6 +410,7 @@ def create_connection(
         except OSError as e:
             err = e
 
+    dns_cache.invalidate(host, port)
     try:
         raise err
     finally:
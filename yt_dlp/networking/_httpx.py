@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import functools
+import io
+import socket
+import ssl
+
+from ..dependencies import brotli, h2, httpx
+from ..utils import int_or_none, version_tuple
+
+if httpx is None:
+    raise ImportError('httpx module is not installed')
+
+if h2 is None:
+    raise ImportError('h2 module is not installed')
+
+if version_tuple(httpx.__version__) < (0, 26):
+    httpx._yt_dlp__version = f'{httpx.__version__} (unsupported)'
+    raise ImportError('Only httpx >= 0.26 is supported')
+
+import httpcore
+from httpcore._backends.sync import SyncStream
+
+from ._helper import (
+    InstanceStoreMixin,
+    add_accept_encoding_header,
+    create_connection,
+    get_redirect_method,
+)
+from .common import (
+    Features,
+    RequestHandler,
+    Response,
+    register_preference,
+    register_rh,
+)
+from .exceptions import (
+    CertificateVerifyError,
+    HTTPError,
+    IncompleteRead,
+    ProxyError,
+    RequestError,
+    SSLError,
+    TransportError,
+)
+from ..utils.networking import select_proxy
+
+SUPPORTED_ENCODINGS = [
+    'gzip', 'deflate',
+]
+
+if brotli is not None:
+    SUPPORTED_ENCODINGS.append('br')
+
+
+class HttpxResponseReader(io.IOBase):
+    def __init__(self, response: httpx.Response):
+        self._response = response
+        self._iterator = response.iter_bytes()
+        self._buffer = b''
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=None):
+        exception_raised = True
+        try:
+            while self._iterator and (size is None or len(self._buffer) < size):
+                chunk = next(self._iterator, None)
+                if chunk is None:
+                    self._iterator = None
+                    break
+                self._buffer += chunk
+                self.bytes_read += len(chunk)
+
+            if size is None:
+                size = len(self._buffer)
+            data = self._buffer[:size]
+            self._buffer = self._buffer[size:]
+
+            # Return the connection (or the HTTP/2 stream) to the pool as soon as possible
+            if not self._iterator and not self._buffer:
+                self.close()
+            exception_raised = False
+            return data
+        finally:
+            if exception_raised:
+                self.close()
+
+    def close(self):
+        if not self.closed:
+            self._response.close()
+            self._buffer = b''
+        super().close()
+
+
+class HttpxResponseAdapter(Response):
+    fp: HttpxResponseReader
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(
+            fp=HttpxResponseReader(response),
+            headers={},
+            url=str(response.url),
+            status=response.status_code,
+            reason=response.reason_phrase)
+        # Response headers may be repeated
+        for name, value in response.headers.multi_items():
+            self.headers.add_header(name, value)
+        self.extensions['http_version'] = response.http_version
+
+    def read(self, amt=None):
+        try:
+            res = self.fp.read(amt)
+            if self.fp.closed:
+                self.close()
+            return res
+        except httpx.RemoteProtocolError as e:
+            content_length = int_or_none(self.get_header('Content-Length'))
+            if content_length is not None and self.fp.bytes_read < content_length:
+                raise IncompleteRead(
+                    partial=self.fp.bytes_read, expected=content_length - self.fp.bytes_read, cause=e) from e
+            raise TransportError(cause=e) from e
+        except httpx.HTTPError as e:
+            # catch-all for any other httpx response exceptions
+            raise TransportError(cause=e) from e
+
+
+def _iter_causes(err):
+    while err is not None:
+        yield err
+        err = err.__cause__ or err.__context__
+
+
+class HttpxNetworkBackend(httpcore.SyncBackend):
+    """Connect with our create_connection, which can reuse the resolved addresses and use happy eyeballs"""
+
+    def __init__(self, create_connection=create_connection):
+        self._create_connection = create_connection
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            sock = self._create_connection(
+                (host, port), timeout, source_address=None if local_address is None else (local_address, 0))
+        except TimeoutError as e:
+            raise httpcore.ConnectTimeout(e) from e
+        except OSError as e:
+            raise httpcore.ConnectError(e) from e
+        for option in socket_options or ():
+            sock.setsockopt(*option)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return SyncStream(sock)
+
+
+class HttpxClient(httpx.Client):
+    """Ensure unified redirect method handling with our urllib redirect handler"""
+
+    def _redirect_method(self, request, response):
+        return get_redirect_method(request.method, response.status_code)
+
+
+@register_rh
+class HttpxRH(RequestHandler, InstanceStoreMixin):
+
+    """Httpx RequestHandler
+    https://github.com/encode/httpx
+
+    HTTP/2 is negotiated with the servers that support it, so that concurrent
+    requests to the same host are multiplexed over a single connection
+    """
+    _SUPPORTED_URL_SCHEMES = ('http', 'https')
+    _SUPPORTED_ENCODINGS = tuple(SUPPORTED_ENCODINGS)
+    _SUPPORTED_PROXY_SCHEMES = ('http', 'https')
+    _SUPPORTED_FEATURES = (Features.NO_PROXY, Features.ALL_PROXY)
+    RH_NAME = 'httpx'
+
+    _MAX_REDIRECTS = 10
+    _DEFAULT_MAX_IDLE = 5.0
+
+    def close(self):
+        self._clear_instances()
+
+    def _check_extensions(self, extensions):
+        super()._check_extensions(extensions)
+        extensions.pop('cookiejar', None)
+        extensions.pop('timeout', None)
+        extensions.pop('legacy_ssl', None)
+
+    def _create_instance(self, cookiejar, proxy=None, legacy_ssl_support=None):
+        transport = httpx.HTTPTransport(
+            verify=self._make_sslcontext(legacy_ssl_support=legacy_ssl_support),
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=None,
+                # Disables keep-alive, since a Connection header would be malformed in HTTP/2
+                max_keepalive_connections=self.pool_size if self.keep_alive else 0,
+                keepalive_expiry=self.max_idle if self.max_idle is not None else self._DEFAULT_MAX_IDLE),
+            proxy=proxy,
+            local_address=self.source_address,
+        )
+        # HTTPTransport does not accept a network backend
+        transport._pool._network_backend = HttpxNetworkBackend(functools.partial(
+            create_connection, dns_cache_ttl=self.dns_cache_ttl, happy_eyeballs=self.happy_eyeballs))
+        return HttpxClient(transport=transport, cookies=cookiejar, trust_env=False)
+
+    def _prepare_headers(self, _, headers):
+        add_accept_encoding_header(headers, SUPPORTED_ENCODINGS)
+
+    def _send(self, request):
+        headers = self._get_headers(request)
+        client = self._get_instance(
+            cookiejar=self._get_cookiejar(request),
+            proxy=select_proxy(request.url, self._get_proxies(request)),
+            legacy_ssl_support=request.extensions.get('legacy_ssl'),
+        )
+        # Build the request directly to not send the default headers of the client
+        httpx_request = httpx.Request(
+            request.method, request.url, headers=headers, content=request.data,
+            # A specified Cookie header overrides the cookiejar
+            cookies=None if 'cookie' in map(str.lower, headers) else client.cookies,
+            extensions={'timeout': httpx.Timeout(self._calculate_timeout(request)).as_dict()})
+
+        max_redirects_exceeded = False
+        try:
+            response = client.send(httpx_request, stream=True)
+            for _ in range(self._MAX_REDIRECTS):
+                if response.next_request is None:
+                    break
+                response.close()
+                response = client.send(response.next_request, stream=True)
+            else:
+                max_redirects_exceeded = response.next_request is not None
+
+        except httpx.ProxyError as e:
+            raise ProxyError(cause=e) from e
+
+        except httpx.ConnectError as e:
+            if 'CERTIFICATE_VERIFY_FAILED' in str(e):
+                raise CertificateVerifyError(cause=e) from e
+            if any(isinstance(cause, ssl.SSLError) for cause in _iter_causes(e)):
+                raise SSLError(cause=e) from e
+            raise TransportError(cause=e) from e
+
+        except httpx.TransportError as e:
+            raise TransportError(cause=e) from e
+
+        except (httpx.HTTPError, httpx.InvalidURL, httpx.StreamError) as e:
+            # Miscellaneous httpx exceptions. May not necessarily be network related e.g. UnsupportedProtocol
+            raise RequestError(cause=e) from e
+
+        res = HttpxResponseAdapter(response)
+
+        if not 200 <= res.status < 300 or max_redirects_exceeded:
+            raise HTTPError(res, redirect_loop=max_redirects_exceeded)
+
+        return res
+
+
+@register_preference(HttpxRH)
+def httpx_preference(rh, request):
+    # Only used when it is preferred explicitly, e.g. with the http2 option
+    return -100
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import collections
 import functools
 import http.client
 import logging
 import re
+import socket
+import threading
+import time
 import warnings
 
 from ..dependencies import brotli, requests, urllib3
@@ -157,24 +161,128 @@ def read(self, amt: int | None = None):
             raise TransportError(cause=e) from e
 
 
+class ConnectionStats:
+    """Number of connections opened and requests sent, by host"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = collections.defaultdict(collections.Counter)
+
+    def record(self, host, port, key):
+        with self._lock:
+            self._stats[f'{host}:{port}'][key] += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {host: {'connections': stats['connections'], 'requests': stats['requests']}
+                    for host, stats in self._stats.items()}
+
+
+class _ConnectionPoolMixin:
+    """
+    Record the connections and requests of the pool in `stats`,
+    and close connections that have been idle for longer than `max_idle` instead of reusing them
+    """
+
+    def __init__(self, *args, stats=None, max_idle=None, **kwargs):
+        self._stats = stats
+        self._max_idle = max_idle
+        super().__init__(*args, **kwargs)
+
+    def _make_request(self, conn, *args, **kwargs):
+        if self._stats:
+            # Pooled connections that have been closed are connected again by the request
+            if conn.is_closed:
+                self._stats.record(self.host, self.port, 'connections')
+            self._stats.record(self.host, self.port, 'requests')
+        return super()._make_request(conn, *args, **kwargs)
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        idle_since = getattr(conn, '_yt_dlp_idle_since', None)
+        if self._max_idle is not None and idle_since is not None and time.monotonic() - idle_since > self._max_idle:
+            # The connection is opened again when it is used
+            conn.close()
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn._yt_dlp_idle_since = time.monotonic()
+        super()._put_conn(conn)
+
+
+class RequestsHTTPConnection(urllib3.connection.HTTPConnection):
+    """Connect with our create_connection, which can reuse the resolved addresses and use happy eyeballs"""
+
+    def __init__(self, *args, create_connection=create_connection, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Overrides the socket.create_connection set by http.client
+        self._create_connection = create_connection
+
+    def _new_conn(self):
+        try:
+            sock = self._create_connection(
+                (self._dns_host, self.port),
+                timeout=self.timeout,
+                source_address=self.source_address)
+        except socket.gaierror as e:
+            raise urllib3.exceptions.NameResolutionError(self.host, self, e) from e
+        except TimeoutError as e:
+            raise urllib3.exceptions.ConnectTimeoutError(
+                self, f'Connection to {self.host} timed out. (connect timeout={self.timeout})') from e
+        except OSError as e:
+            raise urllib3.exceptions.NewConnectionError(
+                self, f'Failed to establish a new connection: {e}') from e
+        for option in self.socket_options or ():
+            sock.setsockopt(*option)
+        return sock
+
+
+class RequestsHTTPSConnection(RequestsHTTPConnection, urllib3.connection.HTTPSConnection):
+    pass
+
+
+class RequestsHTTPConnectionPool(_ConnectionPoolMixin, urllib3.HTTPConnectionPool):
+    ConnectionCls = RequestsHTTPConnection
+
+
+class RequestsHTTPSConnectionPool(_ConnectionPoolMixin, urllib3.HTTPSConnectionPool):
+    ConnectionCls = RequestsHTTPSConnection
+
+
 class RequestsHTTPAdapter(requests.adapters.HTTPAdapter):
-    def __init__(self, ssl_context=None, proxy_ssl_context=None, source_address=None, **kwargs):
+    def __init__(self, ssl_context=None, proxy_ssl_context=None, source_address=None,
+                 stats=None, max_idle=None, create_connection=create_connection, **kwargs):
         self._pm_args = {}
         if ssl_context:
             self._pm_args['ssl_context'] = ssl_context
         if source_address:
             self._pm_args['source_address'] = (source_address, 0)
         self._proxy_ssl_context = proxy_ssl_context or ssl_context
+        pool_kwargs = {'stats': stats, 'max_idle': max_idle, 'create_connection': create_connection}
+        self._pool_classes_by_scheme = {
+            'http': functools.partial(RequestsHTTPConnectionPool, **pool_kwargs),
+            'https': functools.partial(RequestsHTTPSConnectionPool, **pool_kwargs),
+        }
+        self._socks_pool_classes_by_scheme = {
+            'http': functools.partial(SocksHTTPConnectionPool, **pool_kwargs),
+            'https': functools.partial(SocksHTTPSConnectionPool, **pool_kwargs),
+        }
         super().__init__(**kwargs)
 
     def init_poolmanager(self, *args, **kwargs):
-        return super().init_poolmanager(*args, **kwargs, **self._pm_args)
+        super().init_poolmanager(*args, **kwargs, **self._pm_args)
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes_by_scheme
 
     def proxy_manager_for(self, proxy, **proxy_kwargs):
         extra_kwargs = {}
         if not proxy.lower().startswith('socks') and self._proxy_ssl_context:
             extra_kwargs['proxy_ssl_context'] = self._proxy_ssl_context
-        return super().proxy_manager_for(proxy, **proxy_kwargs, **self._pm_args, **extra_kwargs)
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs, **self._pm_args, **extra_kwargs)
+        manager.pool_classes_by_scheme = (
+            self._socks_pool_classes_by_scheme if isinstance(manager, SocksProxyManager)
+            else self._pool_classes_by_scheme)
+        return manager
 
     # Skip `requests` internal verification; we use our own SSLContext
     def cert_verify(*args, **kwargs):
@@ -259,6 +367,7 @@ class RequestsRH(RequestHandler, InstanceStoreMixin):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._connection_stats = ConnectionStats()
 
         # Forward urllib3 debug messages to our logger
         logger = logging.getLogger('urllib3')
@@ -297,6 +406,13 @@ def _create_instance(self, cookiejar, legacy_ssl_support=None):
             ssl_context=self._make_sslcontext(legacy_ssl_support=legacy_ssl_support),
             source_address=self.source_address,
             max_retries=urllib3.util.retry.Retry(False),
+            # Enough for all the threads of concurrent downloads to the same host
+            pool_maxsize=self.pool_size,
+            stats=self._connection_stats,
+            # Do not reuse connections that the server may not have closed yet
+            max_idle=self.max_idle if self.keep_alive else 0,
+            create_connection=functools.partial(
+                create_connection, dns_cache_ttl=self.dns_cache_ttl, happy_eyeballs=self.happy_eyeballs),
         )
         session.adapters.clear()
         session.headers = requests.models.CaseInsensitiveDict()
@@ -308,7 +424,10 @@ def _create_instance(self, cookiejar, legacy_ssl_support=None):
 
     def _prepare_headers(self, _, headers):
         add_accept_encoding_header(headers, SUPPORTED_ENCODINGS)
-        headers.setdefault('Connection', 'keep-alive')
+        headers.setdefault('Connection', 'keep-alive' if self.keep_alive else 'close')
+
+    def connection_stats(self):
+        return self._connection_stats.to_dict()
 
     def _send(self, request):
 
@@ -369,14 +488,14 @@ def requests_preference(rh, request):
 
 
 # Use our socks proxy implementation with requests to avoid an extra dependency.
-class SocksHTTPConnection(urllib3.connection.HTTPConnection):
+class SocksHTTPConnection(RequestsHTTPConnection):
     def __init__(self, _socks_options, *args, **kwargs):  # must use _socks_options to pass PoolKey checks
         self._proxy_args = _socks_options
         super().__init__(*args, **kwargs)
 
     def _new_conn(self):
         try:
-            return create_connection(
+            return self._create_connection(
                 address=(self._proxy_args['addr'], self._proxy_args['port']),
                 timeout=self.timeout,
                 source_address=self.source_address,
@@ -396,11 +515,11 @@ class SocksHTTPSConnection(SocksHTTPConnection, urllib3.connection.HTTPSConnecti
     pass
 
 
-class SocksHTTPConnectionPool(urllib3.HTTPConnectionPool):
+class SocksHTTPConnectionPool(_ConnectionPoolMixin, urllib3.HTTPConnectionPool):
     ConnectionCls = SocksHTTPConnection
 
 
-class SocksHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+class SocksHTTPSConnectionPool(_ConnectionPoolMixin, urllib3.HTTPSConnectionPool):
     ConnectionCls = SocksHTTPSConnection
 
 
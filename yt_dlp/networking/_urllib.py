@@ -50,7 +50,7 @@
     CONTENT_DECODE_ERRORS.append(brotli.error)
 
 
-def _create_http_connection(http_class, source_address, *args, **kwargs):
+def _create_http_connection(http_class, source_address, create_connection, *args, **kwargs):
     hc = http_class(*args, **kwargs)
 
     if hasattr(hc, '_create_connection'):
@@ -77,29 +77,29 @@ class HTTPHandler(urllib.request.AbstractHTTPHandler):
     public domain.
     """
 
-    def __init__(self, context=None, source_address=None, *args, **kwargs):
+    def __init__(self, context=None, source_address=None, create_connection=create_connection, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._source_address = source_address
         self._context = context
+        self._create_connection = create_connection
 
-    @staticmethod
-    def _make_conn_class(base, req):
+    def _make_conn_class(self, base, req):
         conn_class = base
         socks_proxy = req.headers.pop('Ytdl-socks-proxy', None)
         if socks_proxy:
-            conn_class = make_socks_conn_class(conn_class, socks_proxy)
+            conn_class = make_socks_conn_class(conn_class, socks_proxy, self._create_connection)
         return conn_class
 
     def http_open(self, req):
         conn_class = self._make_conn_class(http.client.HTTPConnection, req)
         return self.do_open(functools.partial(
-            _create_http_connection, conn_class, self._source_address), req)
+            _create_http_connection, conn_class, self._source_address, self._create_connection), req)
 
     def https_open(self, req):
         conn_class = self._make_conn_class(http.client.HTTPSConnection, req)
         return self.do_open(
             functools.partial(
-                _create_http_connection, conn_class, self._source_address),
+                _create_http_connection, conn_class, self._source_address, self._create_connection),
             req, context=self._context)
 
     @staticmethod
@@ -178,7 +178,7 @@ def http_response(self, req, resp):
     https_response = http_response
 
 
-def make_socks_conn_class(base_class, socks_proxy):
+def make_socks_conn_class(base_class, socks_proxy, create_connection=create_connection):
     assert issubclass(base_class, (
         http.client.HTTPConnection, http.client.HTTPSConnection))
 
@@ -331,6 +331,21 @@ def read(self, amt=None):
             handle_response_read_exceptions(e)
             raise e
 
+    def readinto(self, buffer):
+        if not isinstance(self.fp, http.client.HTTPResponse):
+            return super().readinto(buffer)
+        if self.closed:
+            return 0
+        try:
+            size = self.fp.readinto(buffer)
+            if self.fp.fp is None:
+                # http.client.HTTPResponse automatically closes itself when fully read
+                self.close()
+            return size
+        except Exception as e:
+            handle_response_read_exceptions(e)
+            raise e
+
 
 def handle_sslerror(e: ssl.SSLError):
     if not isinstance(e, ssl.SSLError):
@@ -376,7 +391,9 @@ def _create_instance(self, proxies, cookiejar, legacy_ssl_support=None):
             HTTPHandler(
                 debuglevel=int(bool(self.verbose)),
                 context=self._make_sslcontext(legacy_ssl_support=legacy_ssl_support),
-                source_address=self.source_address),
+                source_address=self.source_address,
+                create_connection=functools.partial(
+                    create_connection, dns_cache_ttl=self.dns_cache_ttl, happy_eyeballs=self.happy_eyeballs)),
             HTTPCookieProcessor(cookiejar),
             DataHandler(),
             UnknownHandler(),
@@ -139,6 +139,8 @@ def _send(self, request):
         create_conn_kwargs = {
             'source_address': (self.source_address, 0) if self.source_address else None,
             'timeout': timeout,
+            'dns_cache_ttl': self.dns_cache_ttl,
+            'happy_eyeballs': self.happy_eyeballs,
         }
         proxy = select_proxy(request.url, self._get_proxies(request))
         try:
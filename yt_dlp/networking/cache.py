@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import time
+import typing
+from email.message import Message
+
+from .common import Response
+from .exceptions import HTTPError
+from ..utils import int_or_none, unified_timestamp
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .common import Request
+    from ..cookies import YoutubeDLCookieJar
+
+
+class HTTPCache:
+    """
+    Private cache of HTTP responses, stored on disk
+
+    Responses are keyed by the method, URL, body, cookies and credentials of their request,
+    and are only reused for requests with the same values of the headers named by Vary.
+    As described in RFC 9111, fresh responses are served from the cache,
+    and stale responses are revalidated with a conditional request when they have a validator.
+
+    GET requests are cached according to the Cache-Control, Expires and Last-Modified headers of the response.
+    A `ttl` may be given for a request to consider its response fresh for that many seconds regardless
+    of these headers. Requests with other methods are only cached when a `ttl` is given.
+
+    Set-Cookie headers are not stored, so cookies are only set by the response that was cached.
+
+    @param root_dir: Directory to store the responses in.
+    @param cookiejar: Cookiejar that is used for requests which do not have the `cookiejar` extension.
+    @param logger: Logger instance.
+    """
+
+    MAX_BODY_SIZE = 10 * 1024 * 1024
+    # The fraction of the time since the last modification for which a response is fresh when it has no expiry
+    # See: https://www.rfc-editor.org/rfc/rfc9111#section-4.2.2
+    _HEURISTIC_FRACTION = 0.1
+    _MAX_HEURISTIC_LIFETIME = 24 * 60 * 60
+    _UNSTORED_HEADERS = frozenset((
+        'connection', 'keep-alive', 'content-encoding', 'content-length', 'transfer-encoding', 'set-cookie'))
+
+    def __init__(self, root_dir: str, cookiejar: YoutubeDLCookieJar | None = None, logger=None):
+        self.root_dir = root_dir
+        self._cookiejar = cookiejar
+        self._logger = logger
+
+    def send(self, request: Request, send: Callable[[Request], Response], ttl: float | None = None) -> Response:
+        """Send the request with `send`, unless a fresh response to it is cached"""
+        if not self._is_cacheable(request, ttl):
+            return send(request)
+
+        key = self._get_key(request)
+        entry = self._load(key, request)
+        if entry and self._is_fresh(entry, ttl):
+            return self._make_response(entry, 'hit')
+
+        conditional_request = self._make_conditional_request(request, entry) if entry else None
+        try:
+            response = send(conditional_request or request)
+        except HTTPError as e:
+            if not conditional_request or e.status != 304:
+                raise
+            e.response.close()
+            self._update_headers(entry, e.response.headers)
+            entry['stored_at'] = time.time()
+            self._save(key, entry)
+            return self._make_response(entry, 'revalidated')
+
+        return self._store(key, request, response)
+
+    @staticmethod
+    def _is_cacheable(request, ttl):
+        if request.method != 'GET' and ttl is None:
+            return False
+        if request.data is not None and not isinstance(request.data, bytes):
+            return False
+        if 'range' in map(str.lower, request.headers):
+            return False
+        return 'no-store' not in _parse_cache_control(request.headers.get('Cache-Control'))
+
+    def _get_key(self, request):
+        cookiejar = request.extensions.get('cookiejar') or self._cookiejar
+        key = hashlib.sha256('\0'.join((
+            request.method, request.url,
+            (cookiejar.get_cookie_header(request.url) if cookiejar is not None else None) or '',
+            request.headers.get('Cookie') or '', request.headers.get('Authorization') or '',
+        )).encode() + b'\0')
+        key.update(request.data or b'')
+        return key.hexdigest()
+
+    def _get_filename(self, key):
+        return os.path.join(self.root_dir, key[:2], key)
+
+    def _load(self, key, request):
+        try:
+            with open(self._get_filename(key), 'rb') as f:
+                entry = json.loads(f.readline())
+                entry['body'] = f.read()
+        except (OSError, ValueError):
+            return None
+        if len(entry['body']) != entry['size']:
+            return None
+        for name, value in entry['vary'].items():
+            if request.headers.get(name) != value:
+                return None
+        return entry
+
+    def _save(self, key, entry):
+        filename = self._get_filename(key)
+        metadata = {k: v for k, v in entry.items() if k != 'body'}
+        try:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            # Write to a temporary file first, so that concurrent readers never see a partial entry
+            fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(filename), prefix=f'{key}.', suffix='.tmp')
+            try:
+                with open(fd, 'wb') as f:
+                    f.write(json.dumps(metadata).encode() + b'\n')
+                    f.write(entry['body'])
+                os.replace(tmp_filename, filename)
+            except OSError:
+                os.remove(tmp_filename)
+                raise
+        except OSError as e:
+            if self._logger:
+                self._logger.warning(f'Unable to write the HTTP cache: {e}')
+
+    def _store(self, key, request, response):
+        headers = response.headers
+        cache_control = _parse_cache_control(headers.get('Cache-Control'))
+        vary = [name.strip() for name in ', '.join(headers.get_all('Vary') or ()).split(',') if name.strip()]
+        content_length = headers.get('Content-Length')
+        # Serving a response that sets cookies from the cache would not set them again
+        if (response.status != 200 or 'no-store' in cache_control or '*' in vary or 'Set-Cookie' in headers
+                or (content_length and content_length.isdigit() and int(content_length) > self.MAX_BODY_SIZE)):
+            return response
+
+        body = response.read()
+        response.close()
+        if len(body) <= self.MAX_BODY_SIZE:
+            entry = {
+                'url': response.url,
+                'status': response.status,
+                'reason': response.reason,
+                'headers': [],
+                'vary': {name: request.headers.get(name) for name in vary},
+                'stored_at': time.time(),
+                'size': len(body),
+                'body': body,
+            }
+            self._update_headers(entry, headers)
+            self._save(key, entry)
+
+        return Response(
+            io.BytesIO(body), url=response.url, headers=headers,
+            status=response.status, reason=response.reason, extensions=response.extensions)
+
+    def _update_headers(self, entry, headers):
+        names = {name.lower() for name in headers}
+        entry['headers'] = [
+            [name, value] for name, value in entry['headers'] if name.lower() not in names]
+        entry['headers'].extend(
+            [name, value] for name, value in headers.items() if name.lower() not in self._UNSTORED_HEADERS)
+
+    @staticmethod
+    def _get_headers(entry):
+        headers = Message()
+        for name, value in entry['headers']:
+            headers[name] = value
+        return headers
+
+    def _is_fresh(self, entry, ttl):
+        headers = self._get_headers(entry)
+        age = max(time.time() - entry['stored_at'], 0) + int_or_none(headers.get('Age'), default=0)
+        if ttl is not None:
+            return age < ttl
+
+        cache_control = _parse_cache_control(headers.get('Cache-Control'))
+        if 'no-cache' in cache_control:
+            return False
+        max_age = cache_control.get('max-age')
+        if max_age is not None:
+            return age < int_or_none(max_age, default=0)
+
+        date = unified_timestamp(headers.get('Date')) or entry['stored_at']
+        if headers.get('Expires') is not None:
+            # Invalid dates such as "0" are in the past
+            expires = unified_timestamp(headers.get('Expires'))
+            return expires is not None and age < expires - date
+        last_modified = unified_timestamp(headers.get('Last-Modified'))
+        if last_modified is not None:
+            return age < min((date - last_modified) * self._HEURISTIC_FRACTION, self._MAX_HEURISTIC_LIFETIME)
+        return False
+
+    def _make_conditional_request(self, request, entry):
+        if {'if-none-match', 'if-modified-since'} & set(map(str.lower, request.headers)):
+            # The caller handles the validation itself
+            return None
+        headers = self._get_headers(entry)
+        validators = {}
+        if headers.get('ETag'):
+            validators['If-None-Match'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = headers['Last-Modified']
+        if not validators:
+            return None
+        request = request.copy()
+        request.headers.update(validators)
+        return request
+
+    def _make_response(self, entry, status):
+        return Response(
+            io.BytesIO(entry['body']), url=entry['url'], headers=self._get_headers(entry),
+            status=entry['status'], reason=entry['reason'], extensions={'cache': status})
+
+
+def _parse_cache_control(value):
+    directives = {}
+    for directive in re.split(r'\s*,\s*', (value or '').strip()):
+        name, _, arg = directive.partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
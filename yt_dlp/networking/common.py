@@ -14,7 +14,7 @@
 from http import HTTPStatus
 from types import NoneType
 
-from ._helper import make_ssl_context, wrap_request_errors
+from ._helper import DEFAULT_DNS_CACHE_TTL, make_ssl_context, wrap_request_errors
 from .exceptions import (
     NoSupportingHandlers,
     RequestError,
@@ -32,6 +32,7 @@
 from ..utils.networking import HTTPHeaderDict, normalize_url
 
 DEFAULT_TIMEOUT = 20
+DEFAULT_POOL_SIZE = 10
 
 
 def register_preference(*handlers: type[RequestHandler]):
@@ -57,15 +58,21 @@ class RequestDirector:
     can be registered into the `preferences` set. These are used to sort handlers
     in order of preference.
 
+    Requests with the `cache` extension may be answered from `cache`.
+    The extension is a dict with an optional `ttl`: the number of seconds for which
+    the response is reused regardless of its caching headers. See HTTPCache.
+
     @param logger: Logger instance.
     @param verbose: Print debug request information to stdout.
+    @param cache: HTTPCache instance.
     """
 
-    def __init__(self, logger, verbose=False):
+    def __init__(self, logger, verbose=False, cache: HTTPCache | None = None):
         self.handlers: dict[str, RequestHandler] = {}
         self.preferences: set[Preference] = set()
         self.logger = logger  # TODO(Grub4k): default logger
         self.verbose = verbose
+        self.cache = cache
 
     def close(self):
         for handler in self.handlers.values():
@@ -100,6 +107,16 @@ def send(self, request: Request) -> Response:
 
         assert isinstance(request, Request)
 
+        if 'cache' in request.extensions:
+            # The extension is handled here and not by the request handlers
+            request = request.copy()
+            cache_options = request.extensions.pop('cache')
+            if self.cache is not None and cache_options is not None:
+                return self.cache.send(request, self._send, ttl=cache_options.get('ttl'))
+
+        return self._send(request)
+
+    def _send(self, request: Request) -> Response:
         unexpected_errors = []
         unsupported_errors = []
         for handler in self._get_handlers(request):
@@ -191,6 +208,14 @@ class RequestHandler(abc.ABC):
             dict with {client_certificate, client_certificate_key, client_certificate_password}
     @param verify: Verify SSL certificates
     @param legacy_ssl_support: Enable legacy SSL options such as legacy server connect and older cipher support.
+    @param pool_size: Maximum number of idle connections to keep open to each host.
+    @param keep_alive: Whether to keep connections open to be reused by later requests.
+    @param max_idle: Seconds after which an idle connection is closed instead of being reused.
+    Handlers that do not pool connections ignore the last three.
+    @param dns_cache_ttl: Seconds for which the resolved addresses of a host are reused by new connections.
+            0 to resolve the host for every connection.
+    @param happy_eyeballs: Connect to the IPv6 and IPv4 addresses of a host concurrently (RFC 8305).
+    Handlers that do not open their own sockets ignore the last two.
 
     Some configuration options may be available for individual Requests too. In this case,
     either the Request configuration option takes precedence or they are merged.
@@ -233,6 +258,11 @@ def __init__(
         client_cert: dict[str, str | None] | None = None,
         verify: bool = True,
         legacy_ssl_support: bool = False,
+        pool_size: int | None = None,
+        keep_alive: bool = True,
+        max_idle: float | None = None,
+        dns_cache_ttl: float | None = None,
+        happy_eyeballs: bool = True,
         **_,
     ):
 
@@ -247,6 +277,11 @@ def __init__(
         self._client_cert = client_cert or {}
         self.verify = verify
         self.legacy_ssl_support = legacy_ssl_support
+        self.pool_size = pool_size or DEFAULT_POOL_SIZE
+        self.keep_alive = keep_alive
+        self.max_idle = max_idle
+        self.dns_cache_ttl = DEFAULT_DNS_CACHE_TTL if dns_cache_ttl is None else dns_cache_ttl
+        self.happy_eyeballs = happy_eyeballs
         super().__init__()
 
     def _make_sslcontext(self, legacy_ssl_support=None):
@@ -366,6 +401,15 @@ def _send(self, request: Request):
     def close(self):  # noqa: B027
         pass
 
+    def connection_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Statistics of the connections that have been opened, by host.
+        Redefine in subclasses that pool connections.
+
+        @returns {'host:port': {'connections': <opened>, 'requests': <sent>}}
+        """
+        return {}
+
     @classproperty
     def RH_NAME(cls):
         return cls.__name__[:-2]
@@ -561,6 +605,13 @@ def read(self, amt: int | None = None) -> bytes:
         except Exception as e:
             raise TransportError(cause=e) from e
 
+    def readinto(self, buffer) -> int:
+        """Read into a pre-allocated, writable bytes-like object and return the number of bytes read.
+        Subclasses may redefine this method to avoid copying the data."""
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
     def close(self):
         if not self.fp.closed:
             self.fp.close()
@@ -602,6 +653,8 @@ def getheader(self, name, default=None):
 
 
 if typing.TYPE_CHECKING:
+    from .cache import HTTPCache
+
     RequestData = bytes | Iterable[bytes] | typing.IO | None
     Preference = typing.Callable[[RequestHandler, Request], int]
 
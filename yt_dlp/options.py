@@ -780,7 +780,9 @@ def _preset_alias_callback(option, opt_str, value, parser):
     selection.add_option(
         '--download-archive', metavar='FILE',
         dest='download_archive',
-        help='Download only videos not listed in the archive file. Record the IDs of all downloaded videos in it')
+        help=(
+            'Download only videos not listed in the archive file. Record the IDs of all downloaded videos in it. '
+            'Files ending in .sqlite or .sqlite3 are created as indexed SQLite archives'))
     selection.add_option(
         '--no-download-archive',
         dest='download_archive', action='store_const', const=None,
@@ -940,6 +942,10 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-check-formats',
         action='store_false', dest='check_formats',
         help='Do not check that the formats are actually downloadable')
+    video_format.add_option(
+        '--concurrent-format-checks',
+        dest='concurrent_format_checks', metavar='N', default=4, type=int,
+        help='Number of formats to check in parallel with --check-formats (default is %default)')
     video_format.add_option(
         '-F', '--list-formats',
         action='store_true', dest='listformats',
@@ -1079,6 +1085,12 @@ def _preset_alias_callback(option, opt_str, value, parser):
         help=(
             'Size of a chunk for chunk-based HTTP downloading, e.g. 10485760 or 10M (default is disabled). '
             'May be useful for bypassing bandwidth throttling imposed by a webserver (experimental)'))
+    downloader.add_option(
+        '--http-connections',
+        dest='http_connections', metavar='N', default=1, type=int,
+        help=(
+            'Number of connections over which different ranges of a file are downloaded in parallel '
+            'by the native HTTP downloader (default is %default)'))
     downloader.add_option(
         '--test',
         action='store_true', dest='test', default=False,
@@ -1103,6 +1115,24 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-lazy-playlist',
         action='store_false', dest='lazy_playlist',
         help='Process videos in the playlist only after the entire playlist is parsed (default)')
+    downloader.add_option(
+        '--incremental-playlist',
+        action='store_true', dest='incremental_playlist',
+        help=(
+            'Stop fetching the pages of a playlist after the first page whose videos are all in the --download-archive, '
+            'or were all processed the last time the playlist was downloaded if there is no archive. '
+            'Only useful for playlists that are fetched page by page and list their newest videos first'))
+    downloader.add_option(
+        '--no-incremental-playlist',
+        action='store_false', dest='incremental_playlist',
+        help='Fetch all the pages of a playlist (default)')
+    downloader.add_option(
+        '--concurrent-extractions',
+        dest='concurrent_extractions', metavar='N', default=1, type=int,
+        help=(
+            'Number of playlist entries to extract in parallel. '
+            'Upcoming entries are extracted while the current one is being downloaded (default is %default). '
+            'The extractors log in only once, but do not share the state they build up later, e.g. rate limits'))
     downloader.add_option(
         '--hls-prefer-native',
         dest='hls_prefer_native', action='store_true', default=None,
@@ -1314,6 +1344,16 @@ def _preset_alias_callback(option, opt_str, value, parser):
         help=(
             'Quiet, but print JSON information for each URL or infojson passed. Simulate unless --no-simulate is used. '
             'If the URL refers to a playlist, the whole playlist information is dumped in a single line'))
+    verbosity.add_option(
+        '--stream-json',
+        action='store_true', dest='stream_json', default=False,
+        help=(
+            'Write the playlist JSON of --dump-single-json and --no-clean-info-json incrementally, '
+            'as each entry is processed, instead of holding all the entries in memory'))
+    verbosity.add_option(
+        '--no-stream-json',
+        action='store_false', dest='stream_json',
+        help='Write the playlist JSON only after the whole playlist is processed (default)')
     verbosity.add_option(
         '--print-json',
         action='store_true', dest='print_json', default=False,
@@ -215,6 +215,53 @@ def write_json_file(obj, fn):
         raise
 
 
+class JSONStreamWriter:
+    """Incrementally write JSON objects whose list of entries may be too large to hold in memory
+
+    start() writes the items of an object (as an entry of the current object, if any)
+    and opens its list of entries, to which add() appends. end() closes the list and
+    the object, after writing the items that were not known when it was started
+    """
+
+    def __init__(self, write, key='entries', ensure_ascii=True):
+        self._write = write
+        self._key = key
+        self._dumps = functools.partial(json.dumps, ensure_ascii=ensure_ascii)
+        self._stack = []  # [keys written by start(), number of entries] of each open object
+
+    @property
+    def depth(self):
+        """The number of objects that have been started but not ended"""
+        return len(self._stack)
+
+    @property
+    def count(self):
+        """The number of entries of the innermost object"""
+        return self._stack[-1][1] if self._stack else 0
+
+    def _separate(self):
+        if self._stack:
+            if self._stack[-1][1]:
+                self._write(', ')
+            self._stack[-1][1] += 1
+
+    def start(self, obj):
+        obj = {k: v for k, v in obj.items() if k != self._key}
+        self._separate()
+        self._write(f'{self._dumps(obj)[:-1]}{", " if obj else ""}{self._dumps(self._key)}: [')
+        self._stack.append([set(obj), 0])
+
+    def add(self, entry):
+        assert self._stack, 'No object has been started'
+        self._separate()
+        self._write(self._dumps(entry))
+
+    def end(self, obj=None):
+        written, _ = self._stack.pop()
+        obj = {k: v for k, v in (obj or {}).items() if k != self._key and k not in written}
+        self._write(f']{", " if obj else ""}{self._dumps(obj)[1:]}')
+
+
 def partial_application(func):
     sig = inspect.signature(func)
     required_args = [
@@ -2328,11 +2375,25 @@ def __init__(self, pagefunc, pagesize, use_cache=True):
         self._pagecount = float('inf')
         self._use_cache = use_cache
         self._cache = {}
+        self._is_known = None
+        self._last_known_page = float('inf')
+
+    def stop_after_known_page(self, is_known):
+        """Do not fetch the pages after the first page whose entries are all known
+
+        @param is_known  Function that tells whether an entry is already known
+        """
+        self._is_known = is_known
 
     def getpage(self, pagenum):
         page_results = self._cache.get(pagenum)
         if page_results is None:
-            page_results = [] if pagenum > self._pagecount else list(self._pagefunc(pagenum))
+            if pagenum > self._pagecount or pagenum > self._last_known_page:
+                page_results = []
+            else:
+                page_results = list(self._pagefunc(pagenum))
+                if self._is_known and page_results and all(map(self._is_known, page_results)):
+                    self._last_known_page = min(self._last_known_page, pagenum)
         if self._use_cache:
             self._cache[pagenum] = page_results
         return page_results
@@ -3236,86 +3297,113 @@ def filter_using_list(row, filter_array):
     return '\n'.join(''.join(row).rstrip() for row in table)
 
 
-def _match_one(filter_part, dct, incomplete):
-    # TODO: Generalize code with YoutubeDL._build_format_filter
-    STRING_OPERATORS = {
-        '*=': operator.contains,
-        '^=': lambda attr, value: attr.startswith(value),
-        '$=': lambda attr, value: attr.endswith(value),
-        '~=': lambda attr, value: re.search(value, attr),
-    }
-    COMPARISON_OPERATORS = {
-        **STRING_OPERATORS,
-        '<=': operator.le,  # "<=" must be defined above "<"
-        '<': operator.lt,
-        '>=': operator.ge,
-        '>': operator.gt,
-        '=': operator.eq,
-    }
+_STRING_OPERATORS = {
+    '*=': operator.contains,
+    '^=': lambda attr, value: attr.startswith(value),
+    '$=': lambda attr, value: attr.endswith(value),
+    '~=': lambda attr, value: value.search(attr),  # value is a compiled regex
+}
+_NUMERIC_OPERATORS = {
+    '<=': operator.le,  # "<=" must be defined above "<"
+    '<': operator.lt,
+    '>=': operator.ge,
+    '>': operator.gt,
+    '=': operator.eq,
+}
+_MATCH_COMPARISON_OPERATORS = {**_STRING_OPERATORS, **_NUMERIC_OPERATORS}
+_MATCH_COMPARISON_RE = re.compile(r'''(?x)
+    (?P<key>[a-z_]+)
+    \s*(?P<negation>!\s*)?(?P<op>{})(?P<none_inclusive>\s*\?)?\s*
+    (?:
+        (?P<quote>["\'])(?P<quotedstrval>.+?)(?P=quote)|
+        (?P<strval>.+?)
+    )
+    '''.format('|'.join(map(re.escape, _MATCH_COMPARISON_OPERATORS.keys()))))
+_MATCH_UNARY_OPERATORS = {
+    '': lambda v: (v is True) if isinstance(v, bool) else (v is not None),
+    '!': lambda v: (v is False) if isinstance(v, bool) else (v is None),
+}
+_MATCH_UNARY_RE = re.compile(r'''(?x)
+    (?P<op>{})\s*(?P<key>[a-z_]+)
+    '''.format('|'.join(map(re.escape, _MATCH_UNARY_OPERATORS.keys()))))
 
-    if isinstance(incomplete, bool):
-        is_incomplete = lambda _: incomplete
-    else:
-        is_incomplete = lambda k: k in incomplete
 
-    operator_rex = re.compile(r'''(?x)
-        (?P<key>[a-z_]+)
-        \s*(?P<negation>!\s*)?(?P<op>{})(?P<none_inclusive>\s*\?)?\s*
-        (?:
-            (?P<quote>["\'])(?P<quotedstrval>.+?)(?P=quote)|
-            (?P<strval>.+?)
-        )
-        '''.format('|'.join(map(re.escape, COMPARISON_OPERATORS.keys()))))
-    m = operator_rex.fullmatch(filter_part.strip())
+def _compile_match_one(filter_part):
+    # TODO: Generalize code with YoutubeDL._build_format_filter
+    m = _MATCH_COMPARISON_RE.fullmatch(filter_part.strip())
     if m:
-        m = m.groupdict()
-        unnegated_op = COMPARISON_OPERATORS[m['op']]
-        if m['negation']:
-            op = lambda attr, value: not unnegated_op(attr, value)
-        else:
-            op = unnegated_op
-        comparison_value = m['quotedstrval'] or m['strval']
-        if m['quote']:
-            comparison_value = comparison_value.replace(r'\{}'.format(m['quote']), m['quote'])
-        actual_value = dct.get(m['key'])
-        numeric_comparison = None
-        if isinstance(actual_value, (int, float)):
-            # If the original field is a string and matching comparisonvalue is
-            # a number we should respect the origin of the original field
-            # and process comparison value as a string (see
-            # https://github.com/ytdl-org/youtube-dl/issues/11082)
+        key, op_name, negation = m.group('key', 'op', 'negation')
+        none_inclusive = bool(m.group('none_inclusive'))
+        op = _MATCH_COMPARISON_OPERATORS[op_name]
+        comparison_value = m.group('quotedstrval') or m.group('strval')
+        if m.group('quote'):
+            comparison_value = comparison_value.replace(r'\{}'.format(m.group('quote')), m.group('quote'))
+        # If the original field is a string and matching comparisonvalue is
+        # a number we should respect the origin of the original field
+        # and process comparison value as a string (see
+        # https://github.com/ytdl-org/youtube-dl/issues/11082)
+        try:
+            numeric_value = int(comparison_value)
+        except ValueError:
+            numeric_value = parse_filesize(comparison_value)
+            if numeric_value is None:
+                numeric_value = parse_filesize(f'{comparison_value}B')
+            if numeric_value is None:
+                numeric_value = parse_duration(comparison_value)
+        is_string_op = op_name in _STRING_OPERATORS
+        if op_name == '~=':
             try:
-                numeric_comparison = int(comparison_value)
-            except ValueError:
-                numeric_comparison = parse_filesize(comparison_value)
-                if numeric_comparison is None:
-                    numeric_comparison = parse_filesize(f'{comparison_value}B')
-                if numeric_comparison is None:
-                    numeric_comparison = parse_duration(comparison_value)
-        if numeric_comparison is not None and m['op'] in STRING_OPERATORS:
-            raise ValueError('Operator {} only supports string values!'.format(m['op']))
-        if actual_value is None:
-            return is_incomplete(m['key']) or m['none_inclusive']
-        return op(actual_value, comparison_value if numeric_comparison is None else numeric_comparison)
-
-    UNARY_OPERATORS = {
-        '': lambda v: (v is True) if isinstance(v, bool) else (v is not None),
-        '!': lambda v: (v is False) if isinstance(v, bool) else (v is None),
-    }
-    operator_rex = re.compile(r'''(?x)
-        (?P<op>{})\s*(?P<key>[a-z_]+)
-        '''.format('|'.join(map(re.escape, UNARY_OPERATORS.keys()))))
-    m = operator_rex.fullmatch(filter_part.strip())
+                comparison_value = re.compile(comparison_value)
+            except re.error as e:
+                raise ValueError(f'Invalid regex in filter part {filter_part!r}: {e}')
+
+        def match_comparison(dct, is_incomplete):
+            actual_value = dct.get(key)
+            if actual_value is None:
+                return is_incomplete(key) or none_inclusive
+            if numeric_value is not None and isinstance(actual_value, (int, float)):
+                if is_string_op:
+                    raise ValueError(f'Operator {op_name} only supports string values!')
+                result = op(actual_value, numeric_value)
+            else:
+                result = op(actual_value, comparison_value)
+            return not result if negation else result
+        return match_comparison
+
+    m = _MATCH_UNARY_RE.fullmatch(filter_part.strip())
     if m:
-        op = UNARY_OPERATORS[m.group('op')]
-        actual_value = dct.get(m.group('key'))
-        if is_incomplete(m.group('key')) and actual_value is None:
-            return True
-        return op(actual_value)
+        key = m.group('key')
+        op = _MATCH_UNARY_OPERATORS[m.group('op')]
+
+        def match_unary(dct, is_incomplete):
+            actual_value = dct.get(key)
+            if actual_value is None and is_incomplete(key):
+                return True
+            return op(actual_value)
+        return match_unary
 
     raise ValueError(f'Invalid filter part {filter_part!r}')
 
 
+@functools.cache
+def compile_match_filter(filter_str):
+    """ Compile a filter with the syntax of match_str, so that it is only parsed once
+    @returns           A function that takes the dictionary and `incomplete` of match_str,
+                       and returns whether the filter passes
+    """
+    filter_parts = tuple(
+        _compile_match_one(filter_part.replace(r'\&', '&'))
+        for filter_part in re.split(r'(?<!\\)&', filter_str))
+
+    def match(dct, incomplete=False):
+        if isinstance(incomplete, bool):
+            is_incomplete = lambda _: incomplete
+        else:
+            is_incomplete = lambda k: k in incomplete
+        return all(match_part(dct, is_incomplete) for match_part in filter_parts)
+    return match
+
+
 def match_str(filter_str, dct, incomplete=False):
     """ Filter a dictionary with a simple string syntax.
     @returns           Whether the filter passes
@@ -3323,9 +3411,7 @@ def match_str(filter_str, dct, incomplete=False):
                        Can be True/False to indicate all/none of the keys may be missing.
                        All conditions on incomplete keys pass if the key is missing
     """
-    return all(
-        _match_one(filter_part.replace(r'\&', '&'), dct, incomplete)
-        for filter_part in re.split(r'(?<!\\)&', filter_str))
+    return compile_match_filter(filter_str)(dct, incomplete)
 
 
 def match_filter_func(filters, breaking_filters=None):
@@ -3339,6 +3425,7 @@ def match_filter_func(filters, breaking_filters=None):
     interactive = '-' in filters
     if interactive:
         filters.remove('-')
+    compiled_filters = [compile_match_filter(f) for f in filters]
 
     @function_with_repr.set_repr(repr_)
     def _match_func(info_dict, incomplete=False):
@@ -3346,7 +3433,7 @@ def _match_func(info_dict, incomplete=False):
         if ret is not None:
             raise RejectedVideoReached(ret)
 
-        if not filters or any(match_str(f, info_dict, incomplete) for f in filters):
+        if not filters or any(match(info_dict, incomplete) for match in compiled_filters):
             return NO_DEFAULT if interactive and not incomplete else None
         else:
             video_title = info_dict.get('title') or info_dict.get('id') or 'entry'
@@ -5560,6 +5647,9 @@ def add_item(field, reverse, closest, limit_text):
                          else limits[0] if has_limit and not has_multiple_limits
                          else None)
 
+        # The settings are shared by all the instances, so they are resolved now
+        self._calculators = tuple(map(self._compile_field, self._order))
+
     def print_verbose_info(self, write_debug):
         if self._sort_user:
             write_debug('Sort order given by user: {}'.format(', '.join(self._sort_user)))
@@ -5573,46 +5663,88 @@ def print_verbose_info(self, write_debug):
             if self._get_field_setting(field, 'limit_text') is not None else '')
             for field in self._order if self._get_field_setting(field, 'visible')])))
 
-    def _calculate_field_preference_from_value(self, format_, field, type_, value):
+    def _compile_order(self, field):
+        """Return a function that gives the position of a value in the order of an ordered field"""
+        if self._get_field_setting(field, 'convert') != 'order':
+            return functools.partial(self._resolve_field_value, field, convert_none=True)
+
+        order_list = (self._use_free_order and self._get_field_setting(field, 'order_free')) or self._get_field_setting(field, 'order')
+        list_length = len(order_list)
+        not_in_list = list_length - (order_list.index('') if '' in order_list else list_length + 1)
+        positions = {}
+        for i, value in enumerate(order_list):
+            positions.setdefault(value, list_length - i)
+        matchers = tuple(
+            (list_length - i, re.compile(regex).match)
+            for i, regex in enumerate(order_list) if regex) if self._get_field_setting(field, 'regex') else None
+
+        resolved = {None: positions.get(None, not_in_list)}
+
+        def resolve(value):
+            try:
+                return resolved[value]
+            except KeyError:
+                pass
+            lowered = value.lower()
+            if matchers is None:
+                position = positions.get(lowered, not_in_list)
+            else:
+                position = next((pos for pos, match in matchers if match(lowered)), not_in_list)
+            resolved[value] = position
+            return position
+        return resolve
+
+    def _compile_field(self, field):
+        """Return a function that calculates the preference of a format for a field of the sort order"""
         reverse = self._get_field_setting(field, 'reverse')
         closest = self._get_field_setting(field, 'closest')
         limit = self._get_field_setting(field, 'limit')
+        default = self._get_field_setting(field, 'default')
+        is_string = self._get_field_setting(field, 'convert') == 'string'
+        type_ = self._get_field_setting(field, 'type')  # extractor, boolean, ordered, field, multiple
+
+        if type_ == 'multiple':
+            keys = tuple(self._get_field_setting(f, 'field') for f in self._get_field_setting(field, 'field'))
+            function = self._get_field_setting(field, 'function')
+            get_value = lambda format_: function(format_.get(key) for key in keys)
+        else:
+            key = self._get_field_setting(field, 'field')
+            get_value = lambda format_: format_.get(key)
 
         if type_ == 'extractor':
             maximum = self._get_field_setting(field, 'max')
-            if value is None or (maximum is not None and value >= maximum):
-                value = -1
+            transform = lambda value: -1 if value is None or (maximum is not None and value >= maximum) else value
         elif type_ == 'boolean':
             in_list = self._get_field_setting(field, 'in_list')
             not_in_list = self._get_field_setting(field, 'not_in_list')
-            value = 0 if ((in_list is None or value in in_list) and (not_in_list is None or value not in not_in_list)) else -1
+            transform = lambda value: 0 if (
+                (in_list is None or value in in_list) and (not_in_list is None or value not in not_in_list)) else -1
         elif type_ == 'ordered':
-            value = self._resolve_field_value(field, value, True)
-
-        # try to convert to number
-        val_num = float_or_none(value, default=self._get_field_setting(field, 'default'))
-        is_num = self._get_field_setting(field, 'convert') != 'string' and val_num is not None
-        if is_num:
-            value = val_num
-
-        return ((-10, 0) if value is None
-                else (1, value, 0) if not is_num  # if a field has mixed strings and numbers, strings are sorted higher
-                else (0, -abs(value - limit), value - limit if reverse else limit - value) if closest
-                else (0, value, 0) if not reverse and (limit is None or value <= limit)
-                else (0, -value, 0) if limit is None or (reverse and value == limit) or value > limit
-                else (-1, value, 0))
-
-    def _calculate_field_preference(self, format_, field):
-        type_ = self._get_field_setting(field, 'type')  # extractor, boolean, ordered, field, multiple
-        get_value = lambda f: format_.get(self._get_field_setting(f, 'field'))
-        if type_ == 'multiple':
-            type_ = 'field'  # Only 'field' is allowed in multiple for now
-            actual_fields = self._get_field_setting(field, 'field')
-
-            value = self._get_field_setting(field, 'function')(get_value(f) for f in actual_fields)
+            transform = self._compile_order(field)
+        else:
+            transform = None
+
+        if closest:
+            number_preference = lambda value: (0, -abs(value - limit), value - limit if reverse else limit - value)
+        elif limit is None:
+            number_preference = (lambda value: (0, -value, 0)) if reverse else (lambda value: (0, value, 0))
+        elif reverse:
+            number_preference = lambda value: (0, -value, 0) if value >= limit else (-1, value, 0)
         else:
-            value = get_value(field)
-        return self._calculate_field_preference_from_value(format_, field, type_, value)
+            number_preference = lambda value: (0, value, 0) if value <= limit else (0, -value, 0)
+
+        def calculate_preference(format_):
+            value = get_value(format_)
+            if transform is not None:
+                value = transform(value)
+            # try to convert to number
+            if not is_string:
+                val_num = float_or_none(value, default=default)
+                if val_num is not None:
+                    return number_preference(val_num)
+            # if a field has mixed strings and numbers, strings are sorted higher
+            return (-10, 0) if value is None else (1, value, 0)
+        return calculate_preference
 
     @staticmethod
     def _fill_sorting_fields(format):
@@ -5652,7 +5784,7 @@ def _fill_sorting_fields(format):
 
     def calculate_preference(self, format):
         self._fill_sorting_fields(format)
-        return tuple(self._calculate_field_preference(format, field) for field in self._order)
+        return tuple(calculate(format) for calculate in self._calculators)
 
 
 def filesize_from_tbr(tbr, duration):
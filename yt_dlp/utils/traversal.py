@@ -8,14 +8,13 @@
 import inspect
 import itertools
 import re
+import types
 import typing
 import xml.etree.ElementTree
 
 from ._utils import (
-    IDENTITY,
     NO_DEFAULT,
     ExtractorError,
-    LazyList,
     deprecation_warning,
     get_elements_html_by_class,
     get_elements_html_by_attribute,
@@ -105,212 +104,389 @@ def traverse_obj(
     if is_user_input is not NO_DEFAULT:
         deprecation_warning('The is_user_input parameter is deprecated and no longer works')
 
+    try:
+        key = (tuple(map(_freeze_path, paths)), _freeze_path(expected_type), get_all, casesense, traverse_string)
+    except TypeError:
+        # The paths use functions that may be created anew for every call, so they are not worth caching
+        key = None
+
+    traverse = _COMPILED_TRAVERSALS.get(key) if key else None
+    if traverse is None:
+        traverse = _compile_traversal(paths, expected_type, get_all, casesense, traverse_string)
+        if key:
+            if len(_COMPILED_TRAVERSALS) >= _MAX_COMPILED_TRAVERSALS:
+                _COMPILED_TRAVERSALS.clear()
+            _COMPILED_TRAVERSALS[key] = traverse
+    return traverse(obj, default)
+
+
+def compile_traversal(
+        *paths, default=NO_DEFAULT, expected_type=None, get_all=True,
+        casesense=True, traverse_string=False):
+    """
+    Compile the paths of a traversal into a function that applies them to an object
+
+    >>> get_title = compile_traversal(('videoDetails', 'title', {str}))
+    >>> get_title({'videoDetails': {'title': 'Example'}})
+    'Example'
+
+    `compile_traversal(*paths, **kwargs)(obj)` is the same as `traverse_obj(obj, *paths, **kwargs)`,
+    but the keys of the paths are only resolved once.
+    `traverse_obj` already caches the compiled paths when all of their functions are defined at
+    module level, so this is only needed for paths with other functions that are used repeatedly.
+    """
+    traverse = _compile_traversal(paths, expected_type, get_all, casesense, traverse_string)
+    return lambda obj: traverse(obj, default)
+
+
+_MAX_COMPILED_TRAVERSALS = 4096
+_COMPILED_TRAVERSALS = {}
+_SET_KEY, _DICT_KEY, _SLICE_KEY, _OTHER_KEY = (object() for _ in range(4))
+
+
+def _freeze_path(path):
+    """
+    Return a hashable value that identifies a path, or a key of a path
+
+    Raises `TypeError` for unhashable keys and for functions that are not defined at module level,
+    such as lambdas, closures, partials and bound methods
+    """
+    if type(path) is str or type(path) is int or path is None or path is ...:
+        return path
+    elif isinstance(path, (list, tuple)):
+        return tuple(map(_freeze_path, path))
+    elif isinstance(path, set):
+        return _SET_KEY, frozenset(map(_freeze_path, path))
+    elif isinstance(path, dict):
+        return _DICT_KEY, tuple((type(k), k, _freeze_path(v)) for k, v in path.items())
+    elif isinstance(path, slice):
+        return _SLICE_KEY, _freeze_path(path.start), _freeze_path(path.stop), _freeze_path(path.step)
+    elif isinstance(path, (type, types.MethodDescriptorType)):
+        return path
+    elif isinstance(path, types.BuiltinFunctionType):
+        if not isinstance(path.__self__, types.ModuleType):
+            raise TypeError('Bound methods are not cached')
+        return path
+    elif isinstance(path, types.FunctionType):
+        if '<' in path.__qualname__:
+            raise TypeError('Local functions are not cached')
+        return path
+    elif callable(path) or is_iterable_like(path):
+        raise TypeError(f'{type(path).__name__} objects are not cached')
+    hash(path)
+    return _OTHER_KEY, type(path), path
+
+
+def _compile_traversal(paths, expected_type, get_all, casesense, traverse_string):
+    """Compile the paths of `traverse_obj` into a function of the object and the default"""
     casefold = lambda k: k.casefold() if isinstance(k, str) else k
 
-    if isinstance(expected_type, type):
+    if expected_type is None:
+        type_test = None
+    elif isinstance(expected_type, type):
         type_test = lambda val: val if isinstance(val, expected_type) else None
     else:
-        type_test = lambda val: try_call(expected_type or IDENTITY, args=(val,))
-
-    def apply_key(key, obj, is_last):
-        branching = False
-        result = None
+        type_test = lambda val: try_call(expected_type, args=(val,))
 
-        if obj is None and traverse_string:
-            if key is ... or callable(key) or isinstance(key, slice):
-                branching = True
-                result = ()
-
-        elif key is None:
-            result = obj
+    def compile_getter(key, is_last):
+        """Return a function of the object and the default that returns the only result of the key,
+        or None if the key can branch"""
+        if key is None:
+            return lambda obj, default: obj
 
         elif isinstance(key, set):
             item = next(iter(key))
             if len(key) > 1 or isinstance(item, type):
                 assert all(isinstance(item, type) for item in key)
-                if isinstance(obj, tuple(key)):
-                    result = obj
-            else:
-                result = try_call(item, args=(obj,))
+                types_ = tuple(key)
+                return lambda obj, default: obj if isinstance(obj, types_) else None
+            return lambda obj, default: try_call(item, args=(obj,))
 
-        elif isinstance(key, (list, tuple)):
-            branching = True
-            result = itertools.chain.from_iterable(
-                apply_path(obj, branch, is_last)[0] for branch in key)
+        elif isinstance(key, dict):
+            traversals = [(k, compile_traverse(v, False, is_last)) for k, v in key.items()]
+
+            def get_dict(obj, default):
+                result = {}
+                for k, traverse in traversals:
+                    v = traverse(obj, default)
+                    if v is not None:
+                        result[k] = v
+                    elif default is not NO_DEFAULT:
+                        result[k] = default
+                return result or None
+            return get_dict
+
+        elif key is ... or callable(key) or isinstance(key, (list, tuple, slice)):
+            return None
 
-        elif key is ...:
-            branching = True
-            if isinstance(obj, http.cookies.Morsel):
-                obj = dict(obj, key=obj.key, value=obj.value)
-            if isinstance(obj, collections.abc.Mapping):
-                result = obj.values()
-            elif is_iterable_like(obj) or isinstance(obj, xml.etree.ElementTree.Element):
-                result = obj
+        match_by_group = isinstance(key, int) or casesense
+        match_by_name = not match_by_group and isinstance(key, str)
+        is_index = isinstance(key, int)
+        is_xpath = isinstance(key, str)
+        # The value of a str or int key can be looked up directly in a dict
+        is_hashable = casesense and isinstance(key, (str, int))
+
+        def get_item(obj, default):
+            if is_hashable and type(obj) is dict:
+                return obj.get(key)
+            elif isinstance(obj, collections.abc.Mapping):
+                if isinstance(obj, http.cookies.Morsel):
+                    obj = dict(obj, key=obj.key, value=obj.value)
+                return (try_call(obj.get, args=(key,)) if casesense or try_call(obj.__contains__, args=(key,)) else
+                        next((v for k, v in obj.items() if casefold(k) == key), None))
             elif isinstance(obj, re.Match):
-                result = obj.groups()
-            elif traverse_string:
-                branching = False
-                result = str(obj)
-            else:
-                result = ()
+                if match_by_group:
+                    with contextlib.suppress(IndexError):
+                        return obj.group(key)
+                elif match_by_name:
+                    return next((v for k, v in obj.groupdict().items() if casefold(k) == key), None)
+            elif is_index:
+                if is_iterable_like(obj, (collections.abc.Sequence, xml.etree.ElementTree.Element)):
+                    with contextlib.suppress(IndexError):
+                        return obj[key]
+                elif traverse_string:
+                    with contextlib.suppress(IndexError):
+                        return str(obj)[key]
+            elif is_xpath and isinstance(obj, xml.etree.ElementTree.Element):
+                return _apply_xpath(obj, key)
+            return None
+        return get_item
+
+    def compile_branching_key(key, is_last):
+        """Return a function of the object and the default that returns whether it branched and the results"""
+        if isinstance(key, (list, tuple)):
+            branches = [_make_apply_path(*compile_path(branch, is_last)[:3]) for branch in key]
+            return lambda obj, default: (True, itertools.chain.from_iterable(
+                apply_branch(obj, default)[0] for apply_branch in branches))
+
+        elif key is ...:
+            def apply_ellipsis(obj, default):
+                if isinstance(obj, http.cookies.Morsel):
+                    obj = dict(obj, key=obj.key, value=obj.value)
+                if isinstance(obj, collections.abc.Mapping):
+                    return True, obj.values()
+                elif is_iterable_like(obj) or isinstance(obj, xml.etree.ElementTree.Element):
+                    return True, obj
+                elif isinstance(obj, re.Match):
+                    return True, obj.groups()
+                elif traverse_string:
+                    return False, (str(obj),)
+                return True, ()
+            return apply_ellipsis
 
         elif callable(key):
-            branching = True
-            if isinstance(obj, http.cookies.Morsel):
-                obj = dict(obj, key=obj.key, value=obj.value)
+            def apply_function(obj, default):
+                if isinstance(obj, http.cookies.Morsel):
+                    obj = dict(obj, key=obj.key, value=obj.value)
+                if isinstance(obj, collections.abc.Mapping):
+                    iter_obj = obj.items()
+                elif is_iterable_like(obj) or isinstance(obj, xml.etree.ElementTree.Element):
+                    iter_obj = enumerate(obj)
+                elif isinstance(obj, re.Match):
+                    iter_obj = itertools.chain(
+                        enumerate((obj.group(), *obj.groups())),
+                        obj.groupdict().items())
+                elif traverse_string:
+                    return False, (''.join(v for k, v in enumerate(str(obj)) if try_call(key, args=(k, v))),)
+                else:
+                    iter_obj = ()
+                return True, (v for k, v in iter_obj if try_call(key, args=(k, v)))
+            return apply_function
+
+        def apply_slice(obj, default):
             if isinstance(obj, collections.abc.Mapping):
-                iter_obj = obj.items()
-            elif is_iterable_like(obj) or isinstance(obj, xml.etree.ElementTree.Element):
-                iter_obj = enumerate(obj)
+                if isinstance(obj, http.cookies.Morsel):
+                    obj = dict(obj, key=obj.key, value=obj.value)
+                return False, (try_call(obj.get, args=(key,)) if casesense or try_call(obj.__contains__, args=(key,)) else
+                               next((v for k, v in obj.items() if casefold(k) == key), None),)
             elif isinstance(obj, re.Match):
-                iter_obj = itertools.chain(
-                    enumerate((obj.group(), *obj.groups())),
-                    obj.groupdict().items())
+                if casesense:
+                    with contextlib.suppress(IndexError):
+                        return False, (obj.group(key),)
+            elif is_iterable_like(obj, (collections.abc.Sequence, xml.etree.ElementTree.Element)):
+                return True, obj[key]
             elif traverse_string:
-                branching = False
-                iter_obj = enumerate(str(obj))
-            else:
-                iter_obj = ()
-
-            result = (v for k, v in iter_obj if try_call(key, args=(k, v)))
-            if not branching:  # string traversal
-                result = ''.join(result)
-
-        elif isinstance(key, dict):
-            iter_obj = ((k, _traverse_obj(obj, v, False, is_last)) for k, v in key.items())
-            result = {
-                k: v if v is not None else default for k, v in iter_obj
-                if v is not None or default is not NO_DEFAULT
-            } or None
-
-        elif isinstance(obj, collections.abc.Mapping):
-            if isinstance(obj, http.cookies.Morsel):
-                obj = dict(obj, key=obj.key, value=obj.value)
-            result = (try_call(obj.get, args=(key,)) if casesense or try_call(obj.__contains__, args=(key,)) else
-                      next((v for k, v in obj.items() if casefold(k) == key), None))
-
-        elif isinstance(obj, re.Match):
-            if isinstance(key, int) or casesense:
-                with contextlib.suppress(IndexError):
-                    result = obj.group(key)
-
-            elif isinstance(key, str):
-                result = next((v for k, v in obj.groupdict().items() if casefold(k) == key), None)
-
-        elif isinstance(key, (int, slice)):
-            if is_iterable_like(obj, (collections.abc.Sequence, xml.etree.ElementTree.Element)):
-                branching = isinstance(key, slice)
-                with contextlib.suppress(IndexError):
-                    result = obj[key]
-            elif traverse_string:
-                with contextlib.suppress(IndexError):
-                    result = str(obj)[key]
-
-        elif isinstance(obj, xml.etree.ElementTree.Element) and isinstance(key, str):
-            xpath, _, special = key.rpartition('/')
-            if not special.startswith('@') and not special.endswith('()'):
-                xpath = key
-                special = None
-
-            # Allow abbreviations of relative paths, absolute paths error
-            if xpath.startswith('/'):
-                xpath = f'.{xpath}'
-            elif xpath and not xpath.startswith('./'):
-                xpath = f'./{xpath}'
-
-            def apply_specials(element):
-                if special is None:
-                    return element
-                if special == '@':
-                    return element.attrib
-                if special.startswith('@'):
-                    return try_call(element.attrib.get, args=(special[1:],))
-                if special == 'text()':
-                    return element.text
-                raise SyntaxError(f'apply_specials is missing case for {special!r}')
-
-            if xpath:
-                result = list(map(apply_specials, obj.iterfind(xpath)))
-            else:
-                result = apply_specials(obj)
-
-        return branching, result if branching else (result,)
-
-    def lazy_last(iterable):
-        iterator = iter(iterable)
-        prev = next(iterator, NO_DEFAULT)
-        if prev is NO_DEFAULT:
-            return
-
-        for item in iterator:
-            yield False, prev
-            prev = item
-
-        yield True, prev
-
-    def apply_path(start_obj, path, test_type):
-        objs = (start_obj,)
-        has_branched = False
+                return False, (str(obj)[key],)
+            return False, (None,)
+        return apply_slice
+
+    def compile_key(key, is_last):
+        """Return a function of the object and the default that returns the only result of the key,
+        or a step that applies the key to each of the objects if the key can branch"""
+        get = compile_getter(key, is_last)
+        if get:
+            if traverse_string:
+                get_value = get
+                get = lambda obj, default: None if obj is None else get_value(obj, default)
+            return get, None
+
+        apply_key = compile_branching_key(key, is_last)
+        if traverse_string:
+            apply_value = apply_key
+            none_result = (False, (None,)) if isinstance(key, (list, tuple)) else (True, ())
+            apply_key = lambda obj, default: none_result if obj is None else apply_value(obj, default)
+
+        def step(objs, has_branched, default):
+            new_objs = []
+            for obj in objs:
+                branching, results = apply_key(obj, default)
+                has_branched |= branching
+                new_objs.append(results)
+            return itertools.chain.from_iterable(new_objs), has_branched
+        return None, step
 
+    def compile_path(path, test_type):
+        """Return the functions that apply the keys of the path, the type test and whether the path ends with a dict"""
+        # Until the path first branches, there is a single object that the keys are applied to in turn
+        getters, steps = [], []
         key = None
-        for last, key in lazy_last(variadic(path, (str, bytes, dict, set))):
+        keys = variadic(path, (str, bytes, dict, set))
+        if not isinstance(keys, (list, tuple)):
+            keys = list(keys)
+        last_index = len(keys) - 1
+        for index, key in enumerate(keys):
             if not casesense and isinstance(key, str):
                 key = key.casefold()
 
             if key in (any, all):
-                has_branched = False
-                filtered_objs = (obj for obj in objs if obj not in (None, {}))
-                if key is any:
-                    objs = (next(filtered_objs, None),)
+                if steps:
+                    steps.append(_any_step if key is any else _all_step)
                 else:
-                    objs = (list(filtered_objs),)
+                    getters.append(_get_any if key is any else _get_all)
                 continue
 
             if key is filter:
-                objs = filter(None, objs)
+                steps.append(_filter_step)
                 continue
 
             if __debug__ and callable(key):
                 # Verify function signature
                 inspect.signature(key).bind(None, None)
 
-            new_objs = []
-            for obj in objs:
-                branching, results = apply_key(key, obj, last)
-                has_branched |= branching
-                new_objs.append(results)
+            get, step = compile_key(key, index == last_index)
+            if not get:
+                steps.append(step)
+            elif steps:
+                steps.append(_make_getter_step(get))
+            else:
+                getters.append(get)
+
+        result_test = type_test if test_type and not isinstance(key, (dict, list, tuple)) else None
+        return getters, steps, result_test, isinstance(key, dict)
+
+    def compile_traverse(path, allow_empty, test_type):
+        getters, steps, result_test, is_dict = compile_path(path, test_type)
+        empty_result = {} if allow_empty and is_dict else None
+
+        if not steps:
+            def traverse_getters(obj, default):
+                for get in getters:
+                    obj = get(obj, default)
+                if result_test:
+                    obj = result_test(obj)
+                return obj if obj not in (None, {}) else empty_result
+            return traverse_getters
 
-            objs = itertools.chain.from_iterable(new_objs)
+        apply_path = _make_apply_path(getters, steps, result_test)
 
-        if test_type and not isinstance(key, (dict, list, tuple)):
-            objs = map(type_test, objs)
+        def traverse(obj, default):
+            results, has_branched = apply_path(obj, default)
+            results = (item for item in results if item not in (None, {}))
+            if get_all and has_branched:
+                results = list(results)
+                if results:
+                    return results
+                if allow_empty:
+                    return [] if default is NO_DEFAULT else default
+                return None
 
-        return objs, has_branched, isinstance(key, dict)
+            result = next(results, None)
+            return result if result is not None else empty_result
+
+        return traverse
+
+    traversals = [compile_traverse(path, index == len(paths), True) for index, path in enumerate(paths, 1)]
+
+    def traverse(obj, default):
+        for index, traverse_path in enumerate(traversals, 1):
+            try:
+                result = traverse_path(obj, default)
+                if result is not None:
+                    return result
+            except _RequiredError as e:
+                if index == len(traversals):
+                    # Reraise to get cleaner stack trace
+                    raise ExtractorError(e.orig_msg, expected=e.expected) from None
+
+        return None if default is NO_DEFAULT else default
+
+    return traverse
+
+
+def _apply_xpath(element, key):
+    xpath, _, special = key.rpartition('/')
+    if not special.startswith('@') and not special.endswith('()'):
+        xpath = key
+        special = None
+
+    # Allow abbreviations of relative paths, absolute paths error
+    if xpath.startswith('/'):
+        xpath = f'.{xpath}'
+    elif xpath and not xpath.startswith('./'):
+        xpath = f'./{xpath}'
+
+    def apply_specials(element):
+        if special is None:
+            return element
+        if special == '@':
+            return element.attrib
+        if special.startswith('@'):
+            return try_call(element.attrib.get, args=(special[1:],))
+        if special == 'text()':
+            return element.text
+        raise SyntaxError(f'apply_specials is missing case for {special!r}')
+
+    if xpath:
+        return list(map(apply_specials, element.iterfind(xpath)))
+    return apply_specials(element)
+
+
+def _make_apply_path(getters, steps, result_test):
+    """Return a function of the object and the default that returns the results and whether the path branched"""
+    def apply_path(obj, default):
+        for get in getters:
+            obj = get(obj, default)
+        objs, has_branched = (obj,), False
+        for step in steps:
+            objs, has_branched = step(objs, has_branched, default)
+        if result_test:
+            objs = map(result_test, objs)
+        return objs, has_branched
+    return apply_path
+
+
+def _make_getter_step(get):
+    return lambda objs, has_branched, default: ([get(obj, default) for obj in objs], has_branched)
+
+
+def _get_any(obj, default):
+    return obj if obj not in (None, {}) else None
+
+
+def _get_all(obj, default):
+    return [obj] if obj not in (None, {}) else []
+
+
+def _any_step(objs, has_branched, default):
+    return (next((obj for obj in objs if obj not in (None, {})), None),), False
 
-    def _traverse_obj(obj, path, allow_empty, test_type):
-        results, has_branched, is_dict = apply_path(obj, path, test_type)
-        results = LazyList(item for item in results if item not in (None, {}))
-        if get_all and has_branched:
-            if results:
-                return results.exhaust()
-            if allow_empty:
-                return [] if default is NO_DEFAULT else default
-            return None
 
-        return results[0] if results else {} if allow_empty and is_dict else None
+def _all_step(objs, has_branched, default):
+    return ([obj for obj in objs if obj not in (None, {})],), False
 
-    for index, path in enumerate(paths, 1):
-        is_last = index == len(paths)
-        try:
-            result = _traverse_obj(obj, path, is_last, True)
-            if result is not None:
-                return result
-        except _RequiredError as e:
-            if is_last:
-                # Reraise to get cleaner stack trace
-                raise ExtractorError(e.orig_msg, expected=e.expected) from None
 
-    return None if default is NO_DEFAULT else default
+def _filter_step(objs, has_branched, default):
+    return filter(None, objs), has_branched
 
 
 def value(value, /):